@@ -0,0 +1,8 @@
+"""
+Agent Package - RoomiAI Voice Pipeline Support
+
+This package contains the voice-pipeline pieces used by the LiveKit worker in app.py:
+worker prewarm, pipeline metrics and other per-process helpers. Business logic for
+the agent's tools lives in backend/tools/; this package only deals with how the
+worker runs sessions (loading models, measuring latency, managing resources).
+"""
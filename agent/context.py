@@ -0,0 +1,180 @@
+"""
+Conversation Context Manager - Bounded Prompt for the Hotel Agent
+
+This file keeps the prompt sent to the LLM within a token budget, however long the
+call runs. The system instructions and the last few turns are kept word for word;
+older turns are dropped and replaced by a compact summary of the booking details
+collected so far (dates, guests, room type, name, phone, email). Tool results from
+older turns are reduced to their spoken 'message'.
+
+Tool outputs are read whether they reach the chat context as JSON (shaped results) or
+as the str() of a dict (what LiveKit makes of a tool returning a plain dict).
+"""
+
+import ast
+import json
+import os
+from typing import Optional
+
+from livekit.agents import llm
+
+# Context settings
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "4"))
+
+# Booking slots picked up from tool call arguments, in the order they are summarized
+SLOT_LABELS = {
+    "check_in": "check-in",
+    "check_out": "check-out",
+    "guests": "guests",
+    "room_type": "room type",
+    "guest_name": "name",
+    "phone": "phone",
+    "email": "email",
+    "confirmation_number": "confirmation number",
+    "grand_total": "quoted total",
+}
+
+# Slots read from successful tool results, under their raw and shaped (agent/shaping.py) keys
+RESULT_SLOT_KEYS = {
+    "confirmation_number": ("confirmation_number", "conf"),
+    "grand_total": ("grand_total", "total"),
+}
+
+# Placeholder values the LLM passes when it does not know a slot yet
+EMPTY_VALUES = {"", "null", "none", "any", "unknown"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about 4 characters per token for English/JSON)."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def item_tokens(item) -> int:
+    """Estimate the prompt tokens of a single chat item."""
+    if item.type == "message":
+        return estimate_tokens(item.text_content or "") + 4
+    if item.type == "function_call":
+        return estimate_tokens(item.name + item.arguments) + 4
+    if item.type == "function_call_output":
+        return estimate_tokens(item.output) + 4
+    return 0
+
+
+def parse_output(output: str):
+    """The data of a tool output: JSON, or a Python literal such as str(dict); None if neither."""
+    try:
+        return json.loads(output)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return ast.literal_eval(output)
+    except (TypeError, ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+def _compact_output(output: str) -> str:
+    """Reduce a tool result to its spoken message."""
+    data = parse_output(output)
+    if isinstance(data, dict):
+        message = data.get("message") or data.get("msg")
+        if message:
+            return json.dumps({"message": message})
+    return output
+
+
+class ConversationContextManager:
+    """Builds a budget-bounded copy of the chat context for each LLM call."""
+
+    def __init__(self, token_budget: int = CONTEXT_TOKEN_BUDGET, keep_turns: int = CONTEXT_KEEP_TURNS):
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.slots: dict[str, str] = {}
+        self._seen_ids: set[str] = set()
+        self.last_prompt_tokens = 0
+
+    def update_slots(self, items: list):
+        """Record booking details from tool calls and results not seen yet."""
+        for item in items:
+            if item.id in self._seen_ids:
+                continue
+            self._seen_ids.add(item.id)
+
+            if item.type == "function_call":
+                try:
+                    arguments = json.loads(item.arguments or "{}")
+                except ValueError:
+                    continue
+                for key, value in arguments.items():
+                    if key in SLOT_LABELS and str(value).strip().lower() not in EMPTY_VALUES:
+                        self.slots[key] = str(value).strip()
+
+            elif item.type == "function_call_output" and not item.is_error:
+                result = parse_output(item.output)
+                if isinstance(result, dict) and result.get("success"):
+                    for slot, keys in RESULT_SLOT_KEYS.items():
+                        value = next((result[key] for key in keys if result.get(key)), None)
+                        if value:
+                            self.slots[slot] = str(value)
+
+    def summary(self) -> Optional[str]:
+        """Compact summary of the collected slots."""
+        if not self.slots:
+            return None
+        parts = [f"{label}: {self.slots[key]}" for key, label in SLOT_LABELS.items() if key in self.slots]
+        return "Booking details collected so far - " + "; ".join(parts) + "."
+
+    def build(self, chat_ctx: llm.ChatContext) -> llm.ChatContext:
+        """Return a trimmed copy of chat_ctx that fits the token budget."""
+        items = list(chat_ctx.items)
+        self.update_slots(items)
+
+        # Leading system instructions are always kept
+        head = 0
+        while head < len(items) and items[head].type == "message" and items[head].role in ("system", "developer"):
+            head += 1
+        instructions, history = items[:head], items[head:]
+
+        # Turn boundaries are the user messages
+        turn_starts = [i for i, item in enumerate(history) if item.type == "message" and item.role == "user"]
+        if len(turn_starts) > self.keep_turns:
+            keep_from = turn_starts[-self.keep_turns]
+        else:
+            keep_from = 0
+        recent = history[keep_from:]
+
+        # Older tool results inside the kept turns are reduced to their message
+        last_turn_start = turn_starts[-1] - keep_from if turn_starts and turn_starts[-1] >= keep_from else 0
+        recent = [
+            item.model_copy(update={"output": _compact_output(item.output)})
+            if item.type == "function_call_output" and i < last_turn_start
+            else item
+            for i, item in enumerate(recent)
+        ]
+
+        def total_tokens(kept: list) -> int:
+            summary = self.summary()
+            return (
+                sum(item_tokens(item) for item in instructions)
+                + sum(item_tokens(item) for item in kept)
+                + (estimate_tokens(summary) if summary else 0)
+            )
+
+        # Drop whole turns from the front until the prompt fits (the latest turn always stays)
+        while total_tokens(recent) > self.token_budget:
+            next_turn = next(
+                (i for i, item in enumerate(recent) if i > 0 and item.type == "message" and item.role == "user"),
+                None,
+            )
+            if next_turn is None:
+                break
+            recent = recent[next_turn:]
+
+        new_items = list(instructions)
+        summary = self.summary()
+        if summary and len(recent) < len(history):
+            new_items.append(llm.ChatMessage(role="system", content=[summary]))
+        new_items.extend(recent)
+
+        self.last_prompt_tokens = total_tokens(recent)
+        return llm.ChatContext(new_items)
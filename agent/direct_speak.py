@@ -0,0 +1,97 @@
+"""
+Direct Speak - Speaking Tool Messages Without a Second LLM Pass
+
+Every tool result carries a ready-to-speak 'message' (availability, room rates, hotel
+policies, cancellation references). For tools that opt in, HotelAssistant speaks that
+message straight through TTS and records it as the assistant turn, so the LLM is not
+called again just to rephrase it. Results that need reasoning (failures, lookups that
+return data without a message) still go back to the LLM as before.
+"""
+
+import os
+import re
+import string
+from collections import Counter
+from typing import Any, Optional
+
+from agent.tts_cache import TTSAudioCache, say_cached, say_template
+
+# Tools whose message is spoken directly (comma-separated, empty to disable)
+DIRECT_SPEAK_TOOLS = {
+    name.strip()
+    for name in os.getenv(
+        "DIRECT_SPEAK_TOOLS", "check_availability,get_room_types,get_hotel_info,cancel_booking"
+    ).split(",")
+    if name.strip()
+}
+
+# Result flags that mean the guest needs more than the message read back
+_FAILURE_FLAGS = ("success", "found", "available")
+
+# Tools whose results are data for the LLM to read, even when they carry a message
+_REASONING_TOOLS = {"get_booking"}
+
+# Messages with per-call values; the fixed text around them is served from the TTS cache
+MESSAGE_TEMPLATES = [
+    "We have rooms available from {check_in} to {check_out}.",
+    "Booking cancelled. Reference: {reference}. Full refund in 5-7 business days.",
+]
+
+# Tools whose messages have no per-call values and can be cached whole
+FIXED_MESSAGE_TOOLS = {"get_room_types", "get_hotel_info"}
+
+_spoken: Counter = Counter()
+_deferred: Counter = Counter()
+
+
+def wants_direct_speak(tool: str) -> bool:
+    """Whether this tool has opted in to direct speak."""
+    return tool in DIRECT_SPEAK_TOOLS
+
+
+def needs_reasoning(tool: str, result: Any) -> bool:
+    """Whether a tool result has to go back to the LLM instead of being spoken as-is."""
+    if tool in _REASONING_TOOLS or not isinstance(result, dict):
+        return True
+    if not result.get("message"):
+        return True
+    return any(result.get(flag) is False for flag in _FAILURE_FLAGS)
+
+
+def match_template(template: str, text: str) -> Optional[dict]:
+    """Extract the template values from text, or None if the text doesn't follow the template."""
+    pattern = ""
+    for literal, field, _, _ in string.Formatter().parse(template):
+        pattern += re.escape(literal)
+        if field is not None:
+            pattern += f"(?P<{field}>.+?)"
+    match = re.fullmatch(pattern, text)
+    return match.groupdict() if match else None
+
+
+def speak_message(session, cache: Optional[TTSAudioCache], tool: str, message: str):
+    """Speak a tool message as the assistant turn, using the TTS cache where it helps."""
+    _spoken[tool] += 1
+    if cache is not None:
+        for template in MESSAGE_TEMPLATES:
+            values = match_template(template, message)
+            if values is not None:
+                return say_template(session, cache, template, values, add_to_chat_ctx=True)
+        if tool in FIXED_MESSAGE_TOOLS:
+            return say_cached(session, cache, message, add_to_chat_ctx=True)
+    return session.say(message, add_to_chat_ctx=True)
+
+
+def record_deferred(tool: str):
+    """Record an opted-in tool result that still needed the LLM."""
+    _deferred[tool] += 1
+
+
+def direct_speak_stats() -> dict:
+    """Direct-speak counts per tool; each spoken message is one LLM request saved."""
+    return {
+        "enabled_tools": sorted(DIRECT_SPEAK_TOOLS),
+        "spoken": dict(_spoken),
+        "deferred_to_llm": dict(_deferred),
+        "llm_requests_saved": sum(_spoken.values()),
+    }
@@ -0,0 +1,300 @@
+"""
+LLM Scheduler - Host-Wide Token Bucket for the Shared Groq Key
+
+This file admits LLM requests through token-per-minute and request-per-minute
+buckets, so concurrent calls stay under the Groq quota instead of all stalling on
+429 retries together. LiveKit runs every call in its own job process, so the buckets
+the worker uses live in a small state file (LLM_QUOTA_FILE) that every job process on
+the host reads and updates under a file lock; an in-process scheduler (the load-test
+harness) keeps them in memory.
+
+Turns of an in-progress booking go before the first turns of new calls: within a
+process waiting requests are served by priority, and across processes a new call's
+request is only admitted while LLM_BOOKING_RESERVE of the token quota stays free for
+bookings. Prompt and completion tokens are recorded per session and per turn; when a
+call ends its totals are added to a Prometheus text file (LLM_METRICS_FILE) shared by
+every call on the host.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    # No POSIX file locks (Windows, where LiveKit runs jobs as threads of one process)
+    fcntl = None
+
+# Groq quota for llama-3.3-70b-versatile
+LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "12000"))
+LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "30"))
+
+# Completion tokens reserved per request before the real count is known
+LLM_COMPLETION_RESERVE = int(os.getenv("LLM_COMPLETION_RESERVE", "150"))
+
+# Prompt tokens taken by the tool schemas sent with every request
+LLM_TOOLS_TOKENS = int(os.getenv("LLM_TOOLS_TOKENS", "700"))
+
+# Share of the token quota new calls can't take, kept for turns of bookings in progress
+LLM_BOOKING_RESERVE = float(os.getenv("LLM_BOOKING_RESERVE", "0.2"))
+
+# State file holding the buckets shared by every job process on the host
+LLM_QUOTA_FILE = os.getenv("LLM_QUOTA_FILE", os.path.join(tempfile.gettempdir(), "roomiai-llm-quota.json"))
+
+# Prometheus text file with the host-wide token and admission counters of all calls
+LLM_METRICS_FILE = os.getenv("LLM_METRICS_FILE", os.path.join(tempfile.gettempdir(), "roomiai-llm.prom"))
+
+# Request priorities (lower is served first)
+PRIORITY_BOOKING = 0
+PRIORITY_NEW_CALL = 1
+
+
+def estimate_request_tokens(prompt_tokens: int) -> int:
+    """Estimate the quota a request will use: prompt, tool schemas and completion."""
+    return prompt_tokens + LLM_TOOLS_TOKENS + LLM_COMPLETION_RESERVE
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to one minute of quota."""
+
+    def __init__(self, per_minute: int, clock=time.monotonic):
+        self.capacity = float(per_minute)
+        self.refill_rate = per_minute / 60.0
+        self.clock = clock
+        self.tokens = float(per_minute)
+        self.updated_at = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+    def give_back(self, amount: float):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class LLMScheduler:
+    """
+    Admits LLM requests by priority. With quota_file, the buckets are shared with every
+    other scheduler using the same file (one per job process); without, they are this
+    scheduler's own.
+    """
+
+    def __init__(self, tpm_limit: int = LLM_TPM_LIMIT, rpm_limit: int = LLM_RPM_LIMIT,
+                 quota_file: Optional[str] = None):
+        if quota_file is not None and fcntl is None:
+            quota_file = None
+        self.quota_file = quota_file
+        # Wall-clock time when shared, so every process refills the buckets the same way
+        clock = time.time if quota_file else time.monotonic
+        self.tokens = TokenBucket(tpm_limit, clock)
+        self.requests = TokenBucket(rpm_limit, clock)
+        # Within one process the priority queue already puts bookings first
+        self.booking_reserve = self.tokens.capacity * LLM_BOOKING_RESERVE if quota_file else 0.0
+        self._waiters: list = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        # Usage accounting
+        self.sessions: dict[str, list[dict]] = {}
+        self.admitted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @contextmanager
+    def _shared_quota(self):
+        """Load the shared buckets under an exclusive lock and save them back afterwards."""
+        fd = os.open(self.quota_file, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 4096)
+            state = json.loads(raw) if raw else {}
+            for name, bucket in (("tokens", self.tokens), ("requests", self.requests)):
+                saved = state.get(name)
+                # A new file, or one written with other limits, starts full
+                if saved and saved["capacity"] == bucket.capacity:
+                    bucket.tokens, bucket.updated_at = saved["tokens"], saved["updated_at"]
+                else:
+                    bucket.tokens, bucket.updated_at = bucket.capacity, bucket.clock()
+            yield
+            state = {
+                name: {"capacity": bucket.capacity, "tokens": bucket.tokens, "updated_at": bucket.updated_at}
+                for name, bucket in (("tokens", self.tokens), ("requests", self.requests))
+            }
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps(state).encode())
+        finally:
+            os.close(fd)
+
+    def _quota(self):
+        return self._shared_quota() if self.quota_file else nullcontext()
+
+    def _dispatch(self):
+        """Admit waiters from the head of the queue while the buckets allow it."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        while self._waiters:
+            priority, _, estimate, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+
+            # New calls leave the booking reserve free for calls in other processes
+            needed = estimate if priority == PRIORITY_BOOKING else estimate + self.booking_reserve
+            with self._quota():
+                delay = max(self.tokens.wait_time(needed), self.requests.wait_time(1))
+                if delay <= 0:
+                    self.tokens.take(estimate)
+                    self.requests.take(1)
+            if delay > 0:
+                # Head of the queue blocks lower priorities until quota refills; another
+                # process may take it first, in which case this runs again
+                self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+
+    async def acquire(self, estimated_tokens: int, priority: int = PRIORITY_NEW_CALL):
+        """Wait until the request may be sent."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), estimated_tokens, future))
+        start = time.monotonic()
+        self._dispatch()
+        try:
+            await future
+        finally:
+            if not future.done():
+                future.cancel()
+        waited = time.monotonic() - start
+        self.admitted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def record_usage(self, session_id: str, estimated_tokens: int, prompt_tokens: int, completion_tokens: int, waited: float):
+        """Record real usage for a turn and correct the bucket by the estimation error."""
+        actual = prompt_tokens + completion_tokens
+        with self._quota():
+            if actual > estimated_tokens:
+                self.tokens.take(actual - estimated_tokens)
+            elif actual < estimated_tokens:
+                self.tokens.give_back(estimated_tokens - actual)
+
+        turns = self.sessions.setdefault(session_id, [])
+        turns.append({
+            "turn": len(turns) + 1,
+            "estimated_tokens": estimated_tokens,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "queue_wait_ms": round(waited * 1000, 1),
+        })
+
+    @asynccontextmanager
+    async def turn(self, session_id: str, estimated_tokens: int, priority: int = PRIORITY_NEW_CALL):
+        """
+        Admit one LLM request and account for its usage.
+
+        The body should set `usage["prompt_tokens"]` / `usage["completion_tokens"]`
+        from the provider's usage chunk; the estimate is used if it does not.
+        """
+        waited = await self.acquire(estimated_tokens, priority)
+        usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        try:
+            yield usage
+        finally:
+            prompt_tokens = usage["prompt_tokens"] or max(estimated_tokens - LLM_COMPLETION_RESERVE, 0)
+            self.record_usage(session_id, estimated_tokens, prompt_tokens, usage["completion_tokens"], waited)
+
+    def session_usage(self, session_id: str) -> dict:
+        """Get token totals and per-turn usage for one session."""
+        turns = self.sessions.get(session_id, [])
+        return {
+            "turns": len(turns),
+            "prompt_tokens": sum(t["prompt_tokens"] for t in turns),
+            "completion_tokens": sum(t["completion_tokens"] for t in turns),
+            "per_turn": turns,
+        }
+
+    def metrics(self) -> dict:
+        """Get scheduler metrics; the quota figures are the shared ones when quota_file is set."""
+        with self._quota():
+            self.tokens._refill()
+            tokens_available = int(self.tokens.tokens)
+        return {
+            "tpm_limit": int(self.tokens.capacity),
+            "rpm_limit": int(self.requests.capacity),
+            "shared_quota": self.quota_file,
+            "tokens_available": tokens_available,
+            "queued": sum(1 for *_, f in self._waiters if not f.done()),
+            "admitted": self.admitted,
+            "avg_queue_wait_ms": round(self.total_wait / self.admitted * 1000, 1) if self.admitted else 0.0,
+            "max_queue_wait_ms": round(self.max_wait * 1000, 1),
+            "sessions": {
+                session_id: {
+                    "prompt_tokens": sum(t["prompt_tokens"] for t in turns),
+                    "completion_tokens": sum(t["completion_tokens"] for t in turns),
+                    "turns": len(turns),
+                }
+                for session_id, turns in self.sessions.items()
+            },
+        }
+
+    def write_prometheus(self, path: str = LLM_METRICS_FILE) -> str:
+        """
+        Add this process's token and admission counters to the host-wide totals in a
+        Prometheus text file (for the node_exporter textfile collector); returns the path.
+        """
+        turns = [turn for session_turns in self.sessions.values() for turn in session_turns]
+        counts = {
+            "roomi_llm_sessions_total": len(self.sessions),
+            "roomi_llm_turns_total": len(turns),
+            "roomi_llm_prompt_tokens_total": sum(t["prompt_tokens"] for t in turns),
+            "roomi_llm_completion_tokens_total": sum(t["completion_tokens"] for t in turns),
+            "roomi_llm_admitted_total": self.admitted,
+            "roomi_llm_queue_wait_seconds_total": self.total_wait,
+        }
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = b""
+            while chunk := os.read(fd, 65536):
+                raw += chunk
+            for line in raw.decode().splitlines():
+                name, _, value = line.partition(" ")
+                if name in counts:
+                    counts[name] += float(value)
+            lines = []
+            for name, value in counts.items():
+                lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name} {round(value, 3)}")
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, ("\n".join(lines) + "\n").encode())
+        finally:
+            os.close(fd)
+        return path
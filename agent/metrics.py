@@ -0,0 +1,46 @@
+"""
+Pipeline Metrics - RoomiAI Voice Agent Measurements
+
+This file collects in-process measurements for the voice worker, starting with the
+time-to-first-greeting of each call. LiveKit runs every call in its own job
+process: a call is recorded as 'warm' when its process was prewarmed and idle before
+the job arrived, and as 'cold' when the process was started (and prewarmed) for it.
+"""
+
+import statistics
+
+# Time-to-first-greeting samples in seconds, split by cold/warm start
+_greeting_latencies: dict[str, list[float]] = {"cold": [], "warm": []}
+_prewarm_seconds: list[float] = []
+
+
+def record_prewarm(seconds: float):
+    """Record how long the worker prewarm stage took."""
+    _prewarm_seconds.append(seconds)
+
+
+def record_time_to_first_greeting(seconds: float, cold: bool):
+    """Record the time from job start until the greeting starts playing."""
+    kind = "cold" if cold else "warm"
+    _greeting_latencies[kind].append(seconds)
+    print(f"Time to first greeting ({kind}): {seconds * 1000:.0f} ms")
+
+
+def _summary(samples: list[float]) -> dict:
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "avg_ms": round(statistics.fmean(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def get_greeting_stats() -> dict:
+    """Get time-to-first-greeting statistics for this worker process."""
+    return {
+        "prewarm": _summary(_prewarm_seconds),
+        "cold": _summary(_greeting_latencies["cold"]),
+        "warm": _summary(_greeting_latencies["warm"]),
+    }
@@ -0,0 +1,247 @@
+"""
+Response Shaping - Compact Tool Results for the LLM Prompt
+
+This file turns the backend payloads returned by the tools into the minimal form the
+LLM needs for the current turn before they enter the chat context. Room documents
+lose descriptions, codes and inventory fields, booking documents lose contact and
+audit fields, keys are shortened and amounts rounded. Shaped results are serialized
+as compact JSON. Raw and shaped sizes are counted per tool for the token report.
+
+Run `python -m agent.shaping` for a report on representative payloads.
+"""
+
+import json
+from collections import defaultdict
+from typing import Any, Callable, Optional
+
+from agent.context import estimate_tokens
+
+# Status flags kept under their own names (direct speak and the LLM read them as-is)
+STATUS_KEYS = ("success", "found", "available")
+
+# Short names for booking fields passed to the LLM
+BOOKING_KEYS = {
+    "confirmation_number": "conf",
+    "guest_name": "name",
+    "check_in": "in",
+    "check_out": "out",
+    "nights": "nights",
+    "room_type": "room",
+    "guests": "guests",
+    "grand_total": "total",
+    "status": "status",
+    "special_requests": "req",
+}
+
+# Raw vs shaped token counts per tool: {tool: {"calls", "raw", "shaped"}}
+_token_counts: dict[str, dict[str, int]] = defaultdict(lambda: {"calls": 0, "raw": 0, "shaped": 0})
+
+
+def dumps(data: Any) -> str:
+    """Compact JSON, as sent to the LLM."""
+    return json.dumps(data, separators=(",", ":"), default=str)
+
+
+def round_amount(value: Any) -> Any:
+    """Round a money amount to cents, or to whole dollars when there are no cents."""
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return value
+    value = round(float(value), 2)
+    return int(value) if value.is_integer() else value
+
+
+def _requested_guests(args: dict) -> int:
+    try:
+        return int(str(args.get("guests", "")).strip())
+    except ValueError:
+        return 0
+
+
+def _base(result: dict) -> dict:
+    """Status flags and the spoken message."""
+    shaped = {key: result[key] for key in STATUS_KEYS if key in result}
+    if result.get("message"):
+        shaped["msg"] = result["message"]
+    return shaped
+
+
+def _room(room: dict, amenities: bool = False) -> dict:
+    shaped = {"name": room.get("type"), "rate": round_amount(room.get("rate")), "max": room.get("max_guests")}
+    if "rate_per_night" in room:
+        # Average nightly rate and total with tax for the requested stay
+        shaped["rate"] = round_amount(room["rate_per_night"])
+        shaped["total"] = round_amount(room.get("grand_total"))
+    if "available" in room:
+        shaped["left"] = room["available"]
+    if amenities and room.get("amenities"):
+        shaped["has"] = ", ".join(room["amenities"])
+    return {key: value for key, value in shaped.items() if value is not None}
+
+
+def _booking(booking: dict) -> dict:
+    shaped = {}
+    for key, short in BOOKING_KEYS.items():
+        value = booking.get(key)
+        if value in (None, ""):
+            continue
+        shaped[short] = round_amount(value) if key == "grand_total" else value
+    return shaped
+
+
+def shape_availability(result: dict, args: dict) -> dict:
+    """Rooms that fit the party, with name, nightly rate and capacity only."""
+    shaped = _base(result)
+    guests = _requested_guests(args)
+    rooms = [r for r in result.get("rooms", []) if not guests or r.get("max_guests", guests) >= guests]
+    shaped["rooms"] = [_room(r) for r in rooms]
+    return shaped
+
+
+def shape_flexible_dates(result: dict, args: dict) -> dict:
+    """The ranked stays, plus the best one per room type for 'what about a suite?'."""
+    shaped = _base(result)
+    shaped["options"] = [
+        {"room": w["room_type"], "in": w["check_in"], "out": w["check_out"], "total": round_amount(w["total"]), "left": w["left"]}
+        for w in result.get("options", [])
+    ]
+    best = {name: windows[0] for name, windows in result.get("by_room_type", {}).items() if windows}
+    if len(best) > 1:
+        shaped["best_by_room"] = {name: [w["check_in"], round_amount(w["total"])] for name, w in best.items()}
+    return shaped
+
+
+def shape_room_types(result: dict, args: dict) -> dict:
+    """Room names, rates and capacity, with amenities for answering 'what's in the room'."""
+    shaped = _base(result)
+    shaped["rooms"] = [_room(r, amenities=True) for r in result.get("room_types", [])]
+    return shaped
+
+
+def shape_booking(result: dict, args: dict) -> dict:
+    """A booking (or search matches) without contact details, audit dates or rate breakdown."""
+    shaped = _base(result)
+    if isinstance(result.get("booking"), dict):
+        shaped["booking"] = _booking(result["booking"])
+    if isinstance(result.get("bookings"), list):
+        shaped["bookings"] = [_booking(b) for b in result["bookings"]]
+    return shaped
+
+
+def shape_create_booking(result: dict, args: dict) -> dict:
+    """Confirmation number, stay length and total; the guest just gave the rest."""
+    shaped = _base(result)
+    shaped.update(_booking({key: result.get(key) for key in ("confirmation_number", "nights", "grand_total")}))
+    return shaped
+
+
+def shape_cancel_booking(result: dict, args: dict) -> dict:
+    shaped = _base(result)
+    if result.get("cancellation_reference"):
+        shaped["ref"] = result["cancellation_reference"]
+    if "refund_eligible" in result:
+        shaped["refund"] = result["refund_eligible"]
+    return shaped
+
+
+def shape_hotel_info(result: dict, args: dict) -> dict:
+    """The facts for the requested info type, amounts rounded."""
+    shaped = _base(result)
+    for key, value in result.items():
+        if key not in shaped and key not in ("message", "hotel_name") and value not in (None, ""):
+            shaped[key] = round_amount(value)
+    return shaped
+
+
+SHAPERS: dict[str, Callable[[dict, dict], dict]] = {
+    "check_availability": shape_availability,
+    "find_available_dates": shape_flexible_dates,
+    "get_room_types": shape_room_types,
+    "get_hotel_info": shape_hotel_info,
+    "get_booking": shape_booking,
+    "create_booking": shape_create_booking,
+    "cancel_booking": shape_cancel_booking,
+}
+
+
+def shape_result(tool: str, result: Any, args: Optional[dict] = None) -> str:
+    """Compact JSON of a tool result for the chat context, counted for the token report."""
+    if not isinstance(result, dict):
+        return dumps(result)
+    shaper = SHAPERS.get(tool)
+    shaped = dumps(shaper(result, args or {}) if shaper else result)
+
+    # The raw size is what the tool output used to cost (livekit sends str(result))
+    counts = _token_counts[tool]
+    counts["calls"] += 1
+    counts["raw"] += estimate_tokens(str(result))
+    counts["shaped"] += estimate_tokens(shaped)
+    return shaped
+
+
+def token_report() -> dict:
+    """Average raw vs shaped prompt tokens per tool call."""
+    report = {}
+    for tool, counts in sorted(_token_counts.items()):
+        calls = counts["calls"] or 1
+        report[tool] = {
+            "calls": counts["calls"],
+            "raw_tokens": round(counts["raw"] / calls, 1),
+            "shaped_tokens": round(counts["shaped"] / calls, 1),
+            "saved_pct": round(100 * (1 - counts["shaped"] / counts["raw"]), 1) if counts["raw"] else 0.0,
+        }
+    return report
+
+
+def _sample_payloads() -> list[tuple[str, dict, dict]]:
+    """Representative backend payloads for each tool, as the routers return them."""
+    from backend.services.catalog_service import DEFAULT_ROOM_TYPES, HOTEL_INFO, hotel_info_payload
+
+    room_types = [dict(r) for r in DEFAULT_ROOM_TYPES]
+    booking = {
+        "confirmation_number": "ROOMI-20260120-4821",
+        "guest_name": "Jane Smith",
+        "email": "jane.smith@example.com",
+        "phone": "+1-555-0100",
+        "check_in": "2026-01-20",
+        "check_out": "2026-01-25",
+        "nights": 5,
+        "room_type": "deluxe",
+        "guests": "2",
+        "rate_per_night": 150,
+        "room_total": 750,
+        "taxes": 93.75,
+        "grand_total": 843.75,
+        "special_requests": "",
+        "status": "confirmed",
+        "created_at": "2026-01-02T10:15:00",
+        "updated_at": "2026-01-02T10:15:00",
+    }
+    created = {key: booking[key] for key in (
+        "confirmation_number", "guest_name", "check_in", "check_out", "nights", "room_type",
+        "rate_per_night", "room_total", "taxes", "grand_total", "status",
+    )}
+    return [
+        ("check_availability", {
+            "available": True, "check_in": "2026-01-20", "check_out": "2026-01-25", "rooms": room_types,
+            "message": "We have rooms available from 2026-01-20 to 2026-01-25.",
+        }, {"guests": "4"}),
+        ("get_room_types", {
+            "room_types": room_types, "count": len(room_types),
+            "message": "We have " + ", ".join(f"{r['type']} at ${r['rate']}" for r in room_types) + " per night.",
+        }, {}),
+        ("get_hotel_info", hotel_info_payload(HOTEL_INFO, "all"), {"info_type": "all"}),
+        ("get_booking", {"found": True, "booking": booking}, {}),
+        ("get_booking", {"found": True, "count": 3, "bookings": [booking] * 3}, {}),
+        ("create_booking", dict(created, success=True, message="Booking confirmed! Confirmation number is ROOMI-20260120-4821"), {}),
+        ("cancel_booking", {
+            "success": True, "confirmation_number": booking["confirmation_number"],
+            "cancellation_reference": "CXL-ROOMI-20260120-4821", "refund_eligible": True,
+            "message": "Booking cancelled. Reference: CXL-ROOMI-20260120-4821. Full refund in 5-7 business days.",
+        }, {}),
+    ]
+
+
+if __name__ == "__main__":
+    for tool, payload, args in _sample_payloads():
+        shape_result(tool, payload, args)
+    print(json.dumps(token_report(), indent=2))
@@ -0,0 +1,264 @@
+"""
+Turn Tracing - Per-Turn Latency Timeline for the Voice Pipeline
+
+This file records a timeline for every conversation turn: end of user speech (VAD),
+final STT transcript, first LLM token, start and end of each tool call with the
+backend request time inside it, first TTS audio and playout start. Each call writes a
+JSON trace file and keeps histograms of its stage durations with p50/p95/p99 for every
+stage and every tool.
+
+LiveKit runs every call in its own job process, so when a call's trace is written its
+samples are also merged, under a file lock, into latency_samples.json in TRACE_DIR;
+latency_summary.json holds the percentiles over all calls on the host.
+"""
+
+import contextvars
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    # No POSIX file locks (Windows, where LiveKit runs jobs as threads of one process)
+    fcntl = None
+
+# Where per-call trace files and the latency summary are written
+TRACE_DIR = os.getenv("TRACE_DIR", ".cache/traces")
+
+# Samples kept per histogram (oldest dropped first)
+HISTOGRAM_MAX_SAMPLES = 10000
+
+# Tool span currently running in this task (used by the backend observer)
+current_span: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("current_span", default=None)
+
+
+# ============================================
+# Histograms
+# ============================================
+# This process's samples (in the agent worker, one call's)
+_histograms: dict[str, list[float]] = {}
+
+# Samples not merged into the host-wide histograms yet
+_unmerged: dict[str, list[float]] = {}
+
+
+def _add_samples(histograms: dict[str, list[float]], stage: str, samples: list[float]):
+    kept = histograms.setdefault(stage, [])
+    kept.extend(samples)
+    if len(kept) > HISTOGRAM_MAX_SAMPLES:
+        del kept[:len(kept) - HISTOGRAM_MAX_SAMPLES]
+
+
+def observe(stage: str, seconds: float):
+    """Add one duration sample to a stage histogram."""
+    _add_samples(_histograms, stage, [seconds])
+    _unmerged.setdefault(stage, []).append(seconds)
+
+
+def _percentile(sorted_samples: list[float], pct: float) -> float:
+    index = min(len(sorted_samples) - 1, max(0, round(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def export_histograms(histograms: Optional[dict[str, list[float]]] = None) -> dict:
+    """Get p50/p95/p99 (in ms) for every stage and tool seen by this process (or in `histograms`)."""
+    summary = {}
+    for stage, samples in sorted((_histograms if histograms is None else histograms).items()):
+        ordered = sorted(samples)
+        summary[stage] = {
+            "count": len(ordered),
+            "p50_ms": round(_percentile(ordered, 50) * 1000, 1),
+            "p95_ms": round(_percentile(ordered, 95) * 1000, 1),
+            "p99_ms": round(_percentile(ordered, 99) * 1000, 1),
+            "max_ms": round(ordered[-1] * 1000, 1),
+        }
+    return summary
+
+
+def merge_histograms(trace_dir: str = TRACE_DIR) -> dict:
+    """
+    Merge this process's new samples into the host-wide histograms in trace_dir, and
+    write their percentiles to latency_summary.json; returns the host-wide summary.
+    """
+    os.makedirs(trace_dir, exist_ok=True)
+    fd = os.open(os.path.join(trace_dir, "latency_samples.json"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        raw = b""
+        while chunk := os.read(fd, 1 << 20):
+            raw += chunk
+        histograms = json.loads(raw) if raw else {}
+        for stage, samples in _unmerged.items():
+            _add_samples(histograms, stage, samples)
+        _unmerged.clear()
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.ftruncate(fd, 0)
+        os.write(fd, json.dumps(histograms).encode())
+
+        summary = export_histograms(histograms)
+        with open(os.path.join(trace_dir, "latency_summary.json"), "w") as f:
+            json.dump(summary, f, indent=2)
+    finally:
+        os.close(fd)
+    return summary
+
+
+# ============================================
+# Per-call Timeline
+# ============================================
+class TurnTimeline:
+    """Timestamps for the stages of one user turn."""
+
+    def __init__(self, turn: int):
+        self.turn = turn
+        self.marks: dict[str, float] = {}
+        self.tools: list[dict] = []
+
+    def mark(self, stage: str, timestamp: Optional[float] = None):
+        """Record the first time a stage is reached in this turn."""
+        if stage not in self.marks:
+            self.marks[stage] = timestamp or time.time()
+
+    def durations(self) -> dict[str, float]:
+        """Stage durations in seconds, measured between consecutive pipeline points."""
+        pairs = {
+            "eos_to_final_transcript": ("end_of_speech", "final_transcript"),
+            "transcript_to_first_llm_token": ("final_transcript", "first_llm_token"),
+            "llm_token_to_first_tts_audio": ("first_llm_token", "first_tts_audio"),
+            "tts_audio_to_playout": ("first_tts_audio", "playout_start"),
+            "eos_to_playout_start": ("end_of_speech", "playout_start"),
+        }
+        return {
+            name: self.marks[end] - self.marks[start]
+            for name, (start, end) in pairs.items()
+            if start in self.marks and end in self.marks and self.marks[end] >= self.marks[start]
+        }
+
+    def to_dict(self) -> dict:
+        origin = min(self.marks.values(), default=0.0)
+        return {
+            "turn": self.turn,
+            "marks_ms": {stage: round((ts - origin) * 1000, 1) for stage, ts in self.marks.items()},
+            "durations_ms": {name: round(value * 1000, 1) for name, value in self.durations().items()},
+            "tools": self.tools,
+        }
+
+
+class CallTrace:
+    """Timeline of every turn in one call."""
+
+    def __init__(self, call_id: str):
+        self.call_id = call_id
+        self.started_at = time.time()
+        self.turns: list[TurnTimeline] = []
+        self.current: Optional[TurnTimeline] = None
+
+    def start_turn(self, timestamp: Optional[float] = None) -> TurnTimeline:
+        """Close the current turn and start a new one at end of user speech."""
+        self.finish_turn()
+        self.current = TurnTimeline(len(self.turns) + 1)
+        self.current.mark("end_of_speech", timestamp)
+        return self.current
+
+    def finish_turn(self):
+        """Add the current turn's stage durations to the histograms."""
+        if self.current is None:
+            return
+        for name, value in self.current.durations().items():
+            observe(name, value)
+        self.turns.append(self.current)
+        self.current = None
+
+    def mark(self, stage: str, timestamp: Optional[float] = None):
+        """Mark a stage on the current turn (starting one if needed)."""
+        if self.current is None:
+            self.current = TurnTimeline(len(self.turns) + 1)
+        self.current.mark(stage, timestamp)
+
+    @contextmanager
+    def tool_span(self, name: str):
+        """Time a @function_tool call and the backend requests made inside it."""
+        if self.current is None:
+            self.current = TurnTimeline(len(self.turns) + 1)
+        turn = self.current
+        span = {"tool": name, "start": time.time(), "backend": []}
+        token = current_span.set(span)
+        try:
+            yield span
+        finally:
+            current_span.reset(token)
+            span["end"] = time.time()
+            duration = span["end"] - span["start"]
+            observe(f"tool:{name}", duration)
+            origin = min(turn.marks.values(), default=span["start"])
+            turn.tools.append({
+                "tool": name,
+                "start_ms": round((span["start"] - origin) * 1000, 1),
+                "duration_ms": round(duration * 1000, 1),
+                "backend": span["backend"],
+            })
+
+    def to_dict(self) -> dict:
+        return {
+            "call_id": self.call_id,
+            "started_at": self.started_at,
+            "turns": [turn.to_dict() for turn in self.turns],
+        }
+
+    def write(self, trace_dir: str = TRACE_DIR) -> str:
+        """Write the call trace as JSON and merge its samples into the host-wide latency summary."""
+        self.finish_turn()
+        os.makedirs(trace_dir, exist_ok=True)
+        path = os.path.join(trace_dir, f"{self.call_id}-{int(self.started_at)}.json")
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        merge_histograms(trace_dir)
+        return path
+
+
+def observe_backend_request(endpoint: str, seconds: float, status_code: Optional[int]):
+    """Backend transport observer: attribute request time to the running tool."""
+    observe(f"backend:{endpoint}", seconds)
+    span = current_span.get()
+    if span is not None:
+        span["backend"].append({
+            "endpoint": endpoint,
+            "duration_ms": round(seconds * 1000, 1),
+            "status": status_code,
+        })
+
+
+def attach_session(session, trace: CallTrace):
+    """Subscribe to AgentSession events that mark pipeline stages."""
+
+    @session.on("user_state_changed")
+    def on_user_state_changed(event):
+        # VAD end of speech starts a new turn
+        if event.old_state == "speaking" and event.new_state == "listening":
+            trace.start_turn(event.created_at)
+
+    @session.on("user_input_transcribed")
+    def on_user_input_transcribed(event):
+        if event.is_final:
+            trace.mark("final_transcript", event.created_at)
+
+    @session.on("agent_state_changed")
+    def on_agent_state_changed(event):
+        if event.new_state == "speaking":
+            trace.mark("playout_start", event.created_at)
+
+    @session.on("metrics_collected")
+    def on_metrics_collected(event):
+        # Provider-reported latencies complement the timeline marks
+        metrics = event.metrics
+        if metrics.type == "llm_metrics":
+            observe("llm_ttft", metrics.ttft)
+        elif metrics.type == "tts_metrics":
+            observe("tts_ttfb", metrics.ttfb)
+        elif metrics.type == "eou_metrics":
+            observe("eou_delay", metrics.end_of_utterance_delay)
+            observe("stt_transcription_delay", metrics.transcription_delay)
@@ -0,0 +1,208 @@
+"""
+TTS Audio Cache - Pre-Synthesized Speech for Fixed Phrases
+
+This file caches synthesized audio for phrases the agent says over and over (the
+greeting, fixed tool messages). Entries are content-addressed by voice model plus
+normalized text, kept in memory with LRU eviction and persisted to local disk so a
+new worker process starts with the phrases already synthesized. Cache hits play
+immediately; only misses are sent to the TTS provider. Templated messages stitch
+cached fixed fragments around freshly synthesized variable parts.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import string
+import struct
+import unicodedata
+from collections import OrderedDict
+from typing import AsyncIterator, Optional
+
+from livekit import rtc
+
+# Cache settings
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", ".cache/tts")
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "64"))
+
+# Cached audio is replayed in 20 ms frames, like the TTS plugins produce
+FRAME_DURATION_MS = 20
+
+# Disk format: magic, sample rate, channel count, then raw 16-bit PCM
+_FILE_MAGIC = b"RTTS"
+_HEADER = struct.Struct("<4sIH")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different spellings share one cache entry."""
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class CachedAudio:
+    """Raw PCM for one synthesized phrase."""
+
+    def __init__(self, pcm: bytes, sample_rate: int, num_channels: int):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.num_channels = num_channels
+
+    def frames(self) -> list[rtc.AudioFrame]:
+        """Split the PCM into fixed-size audio frames for playout."""
+        samples_per_frame = self.sample_rate * FRAME_DURATION_MS // 1000
+        frame_bytes = samples_per_frame * self.num_channels * 2
+        frames = []
+        for offset in range(0, len(self.pcm), frame_bytes):
+            chunk = self.pcm[offset:offset + frame_bytes]
+            frames.append(rtc.AudioFrame(
+                data=chunk,
+                sample_rate=self.sample_rate,
+                num_channels=self.num_channels,
+                samples_per_channel=len(chunk) // (2 * self.num_channels),
+            ))
+        return frames
+
+
+class TTSAudioCache:
+    """Content-addressed audio cache with an in-memory LRU in front of local disk."""
+
+    def __init__(self, tts, cache_dir: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_MB * 1024 * 1024):
+        self.tts = tts
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._memory: OrderedDict[str, CachedAudio] = OrderedDict()
+        self._memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, text: str) -> str:
+        """Cache key for a phrase spoken with this cache's voice model."""
+        voice = getattr(self.tts, "model", "unknown")
+        return hashlib.sha256(f"{voice}\n{normalize_text(text)}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pcm")
+
+    def _remember(self, key: str, audio: CachedAudio):
+        """Insert into the memory LRU, evicting the least recently used entries."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = audio
+        self._memory_bytes += len(audio.pcm)
+        while self._memory_bytes > self.max_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted.pcm)
+
+    def _read_disk(self, key: str) -> Optional[CachedAudio]:
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        magic, sample_rate, num_channels = _HEADER.unpack_from(data)
+        if magic != _FILE_MAGIC:
+            return None
+        return CachedAudio(data[_HEADER.size:], sample_rate, num_channels)
+
+    def _write_disk(self, key: str, audio: CachedAudio):
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_FILE_MAGIC, audio.sample_rate, audio.num_channels))
+            f.write(audio.pcm)
+        os.replace(tmp_path, path)
+
+    async def get(self, text: str) -> Optional[CachedAudio]:
+        """Look up a phrase in memory, then on disk."""
+        key = self.key(text)
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            return audio
+
+        audio = await asyncio.to_thread(self._read_disk, key)
+        if audio is not None:
+            self._remember(key, audio)
+        return audio
+
+    async def put(self, text: str, audio: CachedAudio):
+        """Store a phrase in memory and on disk."""
+        key = self.key(text)
+        self._remember(key, audio)
+        await asyncio.to_thread(self._write_disk, key, audio)
+
+    async def synthesize(self, text: str, cache: bool = True) -> AsyncIterator[rtc.AudioFrame]:
+        """
+        Yield audio frames for a phrase.
+
+        Cached phrases are replayed from memory; misses are streamed from the TTS
+        provider as they arrive and stored for next time (unless cache=False).
+        """
+        if cache:
+            audio = await self.get(text)
+            if audio is not None:
+                self.hits += 1
+                for frame in audio.frames():
+                    yield frame
+                return
+            self.misses += 1
+
+        pcm = bytearray()
+        sample_rate, num_channels = self.tts.sample_rate, self.tts.num_channels
+        async with self.tts.synthesize(text) as stream:
+            async for event in stream:
+                frame = event.frame
+                sample_rate, num_channels = frame.sample_rate, frame.num_channels
+                pcm.extend(frame.data.tobytes())
+                yield frame
+
+        if cache and pcm:
+            await self.put(text, CachedAudio(bytes(pcm), sample_rate, num_channels))
+
+    async def synthesize_template(self, template: str, **values) -> AsyncIterator[rtc.AudioFrame]:
+        """
+        Yield audio for a str.format template, e.g. "Your confirmation number is {number}.".
+
+        Fixed fragments come from the cache; the substituted values are synthesized
+        fresh and never cached.
+        """
+        for literal, field, format_spec, conversion in string.Formatter().parse(template):
+            if literal.strip():
+                async for frame in self.synthesize(literal):
+                    yield frame
+            if field is not None:
+                value = format(values[field], format_spec or "")
+                if value.strip():
+                    async for frame in self.synthesize(value, cache=False):
+                        yield frame
+
+    async def warm(self, phrases: list[str]):
+        """Synthesize any phrases that are not cached yet (run in the background)."""
+        for phrase in phrases:
+            if await self.get(phrase) is None:
+                async for _ in self.synthesize(phrase):
+                    pass
+
+    def stats(self) -> dict:
+        """Get cache hit/miss statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+        }
+
+
+def say_cached(session, cache: TTSAudioCache, text: str, **kwargs):
+    """session.say() that plays cached audio when available."""
+    return session.say(text, audio=cache.synthesize(text), **kwargs)
+
+
+def say_template(session, cache: TTSAudioCache, template: str, values: dict, **kwargs):
+    """session.say() for a templated message, stitching cached fixed fragments."""
+    text = template.format(**values)
+    return session.say(text, audio=cache.synthesize_template(template, **values), **kwargs)
@@ -9,19 +9,24 @@ Note: @function_tool decorated methods MUST be inside the Agent class (LiveKit r
 The business logic is organized in backend/tools/ and called from here.
 """
 
+import asyncio
 import os
-from typing import Any
+import time
+from contextlib import nullcontext
+from typing import Any, AsyncIterable
 
 from dotenv import load_dotenv
 
-from livekit import agents
-from livekit.agents import AgentSession, Agent, RoomInputOptions, RunContext, function_tool
+from livekit import agents, rtc
+from livekit.agents import AgentSession, Agent, RoomInputOptions, RunContext, function_tool, llm, ModelSettings
 from livekit.plugins import silero, deepgram, groq
 
 # Import business logic from tools folder
 from backend.tools.booking_tools import (
     check_room_availability,
+    find_flexible_dates,
     create_room_booking,
+    booking_idempotency_key,
     get_booking_details,
     cancel_room_booking
 )
@@ -29,15 +34,46 @@ from backend.tools.room_tools import (
     get_all_room_types,
     get_hotel_information
 )
+from backend.tools.catalog_replica import get_catalog_replica
+from backend.tools.http_client import get_pool_stats
+from backend.tools.transport import close_transport, add_request_observer
+from backend.tools.circuit_breaker import get_breaker_states
+from agent.metrics import record_prewarm, record_time_to_first_greeting, get_greeting_stats
+from agent.tts_cache import TTSAudioCache, say_cached
+from agent.context import ConversationContextManager
+from agent.llm_scheduler import LLMScheduler, LLM_METRICS_FILE, LLM_QUOTA_FILE, PRIORITY_BOOKING, PRIORITY_NEW_CALL, estimate_request_tokens
+from agent.tracing import CallTrace, attach_session, observe_backend_request, export_histograms
+from agent.shaping import shape_result, token_report
+from agent.direct_speak import wants_direct_speak, needs_reasoning, speak_message, record_deferred, direct_speak_stats
 
 load_dotenv()
 
+GREETING = "Thank you for calling Grand Hotel. This is Roomi, your virtual reservation assistant. How may I help you today?"
+
+# Seconds a prewarmed process must have been idle before its job for the call to count
+# as warm; a process started for the job gets it right after prewarm
+WARM_IDLE_SECONDS = 0.5
+
+# Fixed phrases pre-synthesized into the TTS cache
+CACHED_PHRASES = [
+    GREETING,
+    "Check-in is at 3:00 PM and checkout is at 11:00 AM. Free cancellation up to 24 hours before check-in.",
+    "Check-in is at 3:00 PM and checkout is at 11:00 AM.",
+    "Free cancellation up to 24 hours before check-in",
+]
+
 
 # ============================================
 # Hotel Receptionist Agent with Tools
 # ============================================
 class HotelAssistant(Agent):
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        llm_scheduler: LLMScheduler | None = None,
+        session_id: str = "local",
+        trace: CallTrace | None = None,
+        tts_cache: TTSAudioCache | None = None
+    ) -> None:
         super().__init__(
             instructions="""You are Roomi, a friendly hotel receptionist for Grand Hotel. Help guests book rooms.
 
@@ -45,6 +81,80 @@ Flow: Ask check-in date, check-out date, guests count, then room type, then name
 
 Keep responses SHORT (1-2 sentences). Ask ONE thing at a time. Be warm and helpful.""",
         )
+        # Keeps the prompt under the Groq TPM budget on long calls
+        self.context_manager = ConversationContextManager()
+        # Host-wide admission control for the shared Groq key
+        self.llm_scheduler = llm_scheduler
+        self.session_id = session_id
+        # Per-turn latency timeline for this call
+        self.trace = trace
+        # Cached audio for tool messages spoken directly
+        self.tts_cache = tts_cache
+
+    def _mark(self, stage: str):
+        if self.trace is not None:
+            self.trace.mark(stage)
+
+    def _tool_span(self, name: str):
+        return self.trace.tool_span(name) if self.trace is not None else nullcontext()
+
+    def _reply(self, context: RunContext, tool: str, result: dict[str, Any], args: dict | None = None):
+        """
+        Shape the tool result for the prompt, and speak its message directly when it
+        needs no reasoning instead of handing it to the LLM.
+        """
+        output = shape_result(tool, result, args)
+        if context is None or not wants_direct_speak(tool):
+            return output
+        if needs_reasoning(tool, result):
+            record_deferred(tool)
+            return output
+
+        speak_message(context.session, self.tts_cache, tool, result["message"])
+        # The result stays in the chat history, but no second LLM reply is generated
+        return llm.ToolResult(output, reply_required=False)
+
+    async def llm_node(
+        self,
+        chat_ctx: llm.ChatContext,
+        tools: list[llm.FunctionTool],
+        model_settings: ModelSettings
+    ):
+        """Send a budget-bounded copy of the conversation to the LLM, admitted by the scheduler."""
+        chat_ctx = self.context_manager.build(chat_ctx)
+
+        if self.llm_scheduler is not None:
+            # Turns of a booking already in progress go ahead of new calls
+            priority = PRIORITY_BOOKING if self.context_manager.slots else PRIORITY_NEW_CALL
+            estimate = estimate_request_tokens(self.context_manager.last_prompt_tokens)
+            admission = self.llm_scheduler.turn(self.session_id, estimate, priority)
+        else:
+            admission = nullcontext({})
+
+        async with admission as usage:
+            async for chunk in Agent.default.llm_node(self, chat_ctx, tools, model_settings):
+                if isinstance(chunk, llm.ChatChunk):
+                    if chunk.usage is not None:
+                        usage["prompt_tokens"] = chunk.usage.prompt_tokens
+                        usage["completion_tokens"] = chunk.usage.completion_tokens
+                    if chunk.delta is not None and (chunk.delta.content or chunk.delta.tool_calls):
+                        self._mark("first_llm_token")
+                elif chunk:
+                    self._mark("first_llm_token")
+                yield chunk
+
+    async def tts_node(
+        self,
+        text: AsyncIterable[str],
+        model_settings: ModelSettings
+    ) -> AsyncIterable[rtc.AudioFrame]:
+        """Synthesize speech, marking the first audio frame on the turn timeline."""
+        first_frame = True
+        async for frame in Agent.default.tts_node(self, text, model_settings):
+            if first_frame:
+                self._mark("first_tts_audio")
+                first_frame = False
+            yield frame
 
     # ============================================
     # TOOL: Check Room Availability
@@ -59,7 +169,7 @@ Keep responses SHORT (1-2 sentences). Ask ONE thing at a time. Be warm and helpf
         check_out: str,
         room_type: str = "any",
         guests: str = "2"
-    ) -> dict[str, Any]:
+    ) -> str | llm.ToolResult:
         """
         Check if rooms are available for the specified dates.
         
@@ -70,7 +180,39 @@ Keep responses SHORT (1-2 sentences). Ask ONE thing at a time. Be warm and helpf
             guests: Number of guests staying as text. Default is '2'
         """
         # Call business logic from tools folder
-        return await check_room_availability(check_in, check_out, room_type, guests)
+        with self._tool_span("check_availability"):
+            result = await check_room_availability(check_in, check_out, room_type, guests)
+        return self._reply(context, "check_availability", result, {"guests": guests})
+
+    # ============================================
+    # TOOL: Find Available Dates
+    # ============================================
+    @function_tool(
+        description="Find the cheapest or earliest dates for a stay of a given number of nights over the coming months, for all room types at once. Call this when the guest is flexible on dates, e.g. 'when is the earliest suite for three nights?' or 'what is cheapest next month?'."
+    )
+    async def find_available_dates(
+        self,
+        context: RunContext,
+        nights: str,
+        room_type: str = "any",
+        guests: str = "2",
+        start_date: str = "",
+        sort: str = "price"
+    ) -> str | llm.ToolResult:
+        """
+        Search a date horizon for the best stays of a given length.
+        
+        Args:
+            nights: Number of nights as text (e.g. '3')
+            room_type: Type of room (standard, deluxe, suite, any). Default is 'any'
+            guests: Number of guests staying as text. Default is '2'
+            start_date: Earliest check-in date to consider (e.g. 'next month' start like 'March 1'). Default is today
+            sort: 'price' for the cheapest stays or 'date' for the earliest. Default is 'price'
+        """
+        # Call business logic from tools folder
+        with self._tool_span("find_available_dates"):
+            result = await find_flexible_dates(nights, room_type, guests, start_date, sort)
+        return self._reply(context, "find_available_dates", result, {"guests": guests})
 
     # ============================================
     # TOOL: Create Booking
@@ -89,7 +231,7 @@ Keep responses SHORT (1-2 sentences). Ask ONE thing at a time. Be warm and helpf
         email: str,
         guests: str = "2",
         special_requests: str = ""
-    ) -> dict[str, Any]:
+    ) -> str | llm.ToolResult:
         """
         Create a new hotel room reservation.
         
@@ -105,17 +247,33 @@ Keep responses SHORT (1-2 sentences). Ask ONE thing at a time. Be warm and helpf
         """
         # Handle "null" string that LLM sometimes passes
         if guest_name.lower() in ["null", "none", ""]:
-            return {"success": False, "message": "Please collect the guest's name first before creating a booking."}
+            return self._reply(
+                context, "create_booking",
+                {"success": False, "message": "Please collect the guest's name first before creating a booking."}
+            )
         if phone.lower() in ["null", "none", ""]:
-            return {"success": False, "message": "Please collect the guest's phone number first before creating a booking."}
+            return self._reply(
+                context, "create_booking",
+                {"success": False, "message": "Please collect the guest's phone number first before creating a booking."}
+            )
         if email.lower() in ["null", "none", ""]:
-            return {"success": False, "message": "Please collect the guest's email address first before creating a booking."}
+            return self._reply(
+                context, "create_booking",
+                {"success": False, "message": "Please collect the guest's email address first before creating a booking."}
+            )
         
         # Call business logic from tools folder
-        return await create_room_booking(
-            guest_name, check_in, check_out, room_type,
-            phone, email, guests, special_requests
-        )
+        with self._tool_span("create_booking"):
+            # Same session and booking details, same key: a repeated call can't book twice
+            idempotency_key = await booking_idempotency_key(
+                self.session_id, guest_name, check_in, check_out, room_type,
+                phone, email, guests, special_requests
+            )
+            result = await create_room_booking(
+                guest_name, check_in, check_out, room_type,
+                phone, email, guests, special_requests, idempotency_key
+            )
+        return self._reply(context, "create_booking", result)
 
     # ============================================
     # TOOL: Get Room Types
@@ -127,7 +285,7 @@ Keep responses SHORT (1-2 sentences). Ask ONE thing at a time. Be warm and helpf
         self,
         context: RunContext,
         filter_type: str = "all"
-    ) -> dict[str, Any]:
+    ) -> str | llm.ToolResult:
         """
         Get all available room types with descriptions and base pricing.
         
@@ -135,7 +293,9 @@ Keep responses SHORT (1-2 sentences). Ask ONE thing at a time. Be warm and helpf
             filter_type: Filter by room category - 'all', 'budget', 'premium'. Default is 'all'
         """
         # Call business logic from tools folder
-        return await get_all_room_types(filter_type)
+        with self._tool_span("get_room_types"):
+            result = await get_all_room_types(filter_type)
+        return self._reply(context, "get_room_types", result)
 
     # ============================================
     # TOOL: Get Hotel Info
@@ -147,7 +307,7 @@ Keep responses SHORT (1-2 sentences). Ask ONE thing at a time. Be warm and helpf
         self,
         context: RunContext,
         info_type: str = "all"
-    ) -> dict[str, Any]:
+    ) -> str | llm.ToolResult:
         """
         Get general hotel information and policies.
         
@@ -155,7 +315,9 @@ Keep responses SHORT (1-2 sentences). Ask ONE thing at a time. Be warm and helpf
             info_type: Type of info needed - 'all', 'timings', 'policies', 'location'. Default is 'all'
         """
         # Call business logic from tools folder
-        return await get_hotel_information(info_type)
+        with self._tool_span("get_hotel_info"):
+            result = await get_hotel_information(info_type)
+        return self._reply(context, "get_hotel_info", result)
 
     # ============================================
     # TOOL: Get Booking Details
@@ -168,7 +330,7 @@ Keep responses SHORT (1-2 sentences). Ask ONE thing at a time. Be warm and helpf
         context: RunContext,
         confirmation_number: str = "",
         guest_name: str = ""
-    ) -> dict[str, Any]:
+    ) -> str | llm.ToolResult:
         """
         Retrieve booking details by confirmation number or guest name.
         
@@ -177,7 +339,9 @@ Keep responses SHORT (1-2 sentences). Ask ONE thing at a time. Be warm and helpf
             guest_name: Guest name to search for
         """
         # Call business logic from tools folder
-        return await get_booking_details(confirmation_number, guest_name)
+        with self._tool_span("get_booking"):
+            result = await get_booking_details(confirmation_number, guest_name)
+        return self._reply(context, "get_booking", result)
 
     # ============================================
     # TOOL: Cancel Booking
@@ -189,7 +353,7 @@ Keep responses SHORT (1-2 sentences). Ask ONE thing at a time. Be warm and helpf
         self,
         context: RunContext,
         confirmation_number: str
-    ) -> dict[str, Any]:
+    ) -> str | llm.ToolResult:
         """
         Cancel an existing reservation.
         
@@ -197,13 +361,16 @@ Keep responses SHORT (1-2 sentences). Ask ONE thing at a time. Be warm and helpf
             confirmation_number: The booking confirmation number to cancel
         """
         # Call business logic from tools folder
-        return await cancel_room_booking(confirmation_number)
+        with self._tool_span("cancel_booking"):
+            result = await cancel_room_booking(confirmation_number)
+        return self._reply(context, "cancel_booking", result)
 
 
 # ============================================
-# Main Entrypoint
+# Worker Prewarm
 # ============================================
-async def entrypoint(ctx: agents.JobContext):
+def create_plugins():
+    """Build the STT, LLM and TTS plugin clients shared by every call in this process."""
     # Get API keys
     groq_api_key = os.getenv("GROQ_API_KEY")
     deepgram_api_key = os.getenv("DEEPGRAM_API_KEY")
@@ -213,6 +380,13 @@ async def entrypoint(ctx: agents.JobContext):
     if not deepgram_api_key:
         raise RuntimeError("DEEPGRAM_API_KEY not found in environment variables!")
 
+    # Initialize STT (Deepgram)
+    stt = deepgram.STT(
+        model="nova-2",
+        language="en",
+        api_key=deepgram_api_key
+    )
+
     # Initialize LLM (Groq)
     # Note: llama-3.3-70b-versatile has 12000 TPM limit (higher than 8b's 6000 TPM)
     llm_instance = groq.LLM(
@@ -226,34 +400,125 @@ async def entrypoint(ctx: agents.JobContext):
         model="aura-asteria-en",
         api_key=deepgram_api_key,
     )
+    return stt, llm_instance, tts
+
+
+async def load_catalog_replica():
+    """Load this process's catalog replica, then close the transport opened for it."""
+    try:
+        await get_catalog_replica().refresh()
+    finally:
+        # Its connections belong to the temporary loop; the call opens its own
+        await close_transport()
+
+
+def prewarm(proc: agents.JobProcess):
+    """Load the Silero VAD model and plugin clients once per worker process."""
+    start = time.perf_counter()
+    proc.userdata["vad"] = silero.VAD.load()
+    proc.userdata["stt"], proc.userdata["llm"], proc.userdata["tts"] = create_plugins()
+    proc.userdata["tts_cache"] = TTSAudioCache(proc.userdata["tts"])
+    # Each call runs in its own job process; the Groq quota is shared through a file
+    proc.userdata["llm_scheduler"] = LLMScheduler(quota_file=LLM_QUOTA_FILE)
+    # Load room types and hotel info while the process waits in the idle pool. The job's
+    # event loop doesn't exist yet, so this runs on a temporary one
+    asyncio.run(load_catalog_replica())
+
+    elapsed = time.perf_counter() - start
+    proc.userdata["prewarmed_at"] = time.perf_counter()
+    record_prewarm(elapsed)
+    print(f"Worker prewarmed in {elapsed * 1000:.0f} ms")
+
+
+# ============================================
+# Main Entrypoint
+# ============================================
+async def entrypoint(ctx: agents.JobContext):
+    job_start = time.perf_counter()
+    userdata = ctx.proc.userdata
 
-    # Create agent session
+    # Prewarm should already have run; load inline if the worker was started without it
+    prewarmed = "vad" in userdata
+    if not prewarmed:
+        prewarm(ctx.proc)
+
+    # Every call gets its own job process. The call is 'warm' when that process was
+    # prewarmed and waiting in the idle pool, 'cold' when it was started for this job
+    # (prewarm finished just before the job, or ran inline)
+    idle_seconds = job_start - userdata["prewarmed_at"]
+    cold_start = not prewarmed or idle_seconds < WARM_IDLE_SECONDS
+
+    # Create agent session with the shared plugin clients
     session = AgentSession(
-        stt=deepgram.STT(
-            model="nova-2",
-            language="en",
-            api_key=deepgram_api_key
-        ),
-        llm=llm_instance,
-        tts=tts,
-        vad=silero.VAD.load(),
+        stt=userdata["stt"],
+        llm=userdata["llm"],
+        tts=userdata["tts"],
+        vad=userdata["vad"],
     )
-    
+
+    llm_scheduler = userdata["llm_scheduler"]
+    session_id = ctx.room.name
+
+    # Per-turn latency timeline, with backend request time attributed to tool calls
+    trace = CallTrace(session_id)
+    attach_session(session, trace)
+    add_request_observer(observe_backend_request)
+
+    # Measure time-to-first-greeting (job start until the agent starts speaking)
+    greeting_recorded = False
+
+    @session.on("agent_state_changed")
+    def on_agent_state_changed(event):
+        nonlocal greeting_recorded
+        if event.new_state == "speaking" and not greeting_recorded:
+            greeting_recorded = True
+            record_time_to_first_greeting(time.perf_counter() - job_start, cold_start)
+
+    # Room types and hotel info come from this process's replica, loaded in prewarm; keep
+    # it refreshed in the background (loading it now if prewarm couldn't reach the
+    # backend) without holding up the greeting
+    replica = get_catalog_replica()
+    userdata["replica_task"] = asyncio.create_task(replica.start())
+
+    # Report call metrics and release the backend transport (HTTP pool or Motor client)
+    # when the worker drains this job
+    async def on_shutdown(reason: str):
+        print(f"Backend pool stats: {get_pool_stats()}")
+        print(f"Backend circuit breakers: {get_breaker_states()}")
+        print(f"Greeting latency: {get_greeting_stats()}")
+        print(f"TTS cache: {userdata['tts_cache'].stats()}")
+        print(f"Direct speak: {direct_speak_stats()}")
+        print(f"Tool result tokens (raw vs shaped): {token_report()}")
+        print(f"LLM usage for {session_id}: {llm_scheduler.session_usage(session_id)}")
+        print(f"LLM scheduler: {llm_scheduler.metrics()}")
+        print(f"LLM counters added to {llm_scheduler.write_prometheus(LLM_METRICS_FILE)}")
+        print(f"Call trace written to {trace.write()}")
+        print(f"Latency histograms for this call: {export_histograms()}")
+        print(f"Catalog replica: {replica.stats()}")
+        await replica.stop()
+        await close_transport()
+
+    ctx.add_shutdown_callback(on_shutdown)
+
     # Start the session with the agent
+    tts_cache = userdata["tts_cache"]
     await session.start(
         room=ctx.room,
-        agent=HotelAssistant(),
+        agent=HotelAssistant(
+            llm_scheduler=llm_scheduler, session_id=session_id, trace=trace, tts_cache=tts_cache
+        ),
         room_input_options=RoomInputOptions(),
     )
 
-    # Initial greeting
-    await session.say(
-        "Thank you for calling Grand Hotel. This is Roomi, your virtual reservation assistant. How may I help you today?"
-    )
+    # Initial greeting (played from the TTS cache when already synthesized)
+    await say_cached(session, tts_cache, GREETING)
+
+    # Synthesize any fixed phrases missing from the cache while the guest talks
+    userdata["tts_warm_task"] = asyncio.create_task(tts_cache.warm(CACHED_PHRASES))
 
 
 # ============================================
 # Run the Agent
 # ============================================
 if __name__ == "__main__":
-    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file
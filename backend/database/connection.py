@@ -74,6 +74,21 @@ def get_room_types_collection():
     return db["room_types"]
 
 
+def get_room_inventory_collection():
+    """Get the room_inventory collection (per-night booked counters per room type)."""
+    return db["room_inventory"]
+
+
+def get_room_holds_collection():
+    """Get the room_holds collection (short-lived reservations awaiting a booking)."""
+    return db["room_holds"]
+
+
 def get_service_requests_collection():
     """Get the service_requests collection."""
     return db["service_requests"]
+
+
+def get_idempotency_keys_collection():
+    """Get the idempotency_keys collection (responses to repeat requests, with a TTL)."""
+    return db["idempotency_keys"]
@@ -0,0 +1,504 @@
+"""
+Memory Storage - Repositories in Process Memory
+
+This file implements the storage interface with Python dictionaries and keeps the
+same secondary indexes the MongoDB engine relies on, so lookups stay O(log n) or
+O(matches) instead of scanning:
+
+- bookings: confirmation number -> id, phonetic name key -> ids, and sorted
+  (created_at, id) keys overall and per status for keyset pages and exports,
+  plus sorted (check_in, key) pairs for exports by arrival date
+- room_inventory: (code, night) -> counter, with each code's nights kept sorted
+- room_holds: hold id -> hold, and a heap of expiry times for the sweeper
+- guests: phone and email -> ids; service_requests: status -> sorted ids
+
+No method awaits while it changes data, so every operation is atomic with respect to
+other coroutines. Data lives only as long as the process: meant for tests, benchmarks,
+load tests and demos.
+"""
+
+import asyncio
+import copy
+import heapq
+import itertools
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Optional
+
+from backend.database.storage import (
+    BookingRepository,
+    DuplicateKeyError,
+    GuestRepository,
+    HoldRepository,
+    IdempotencyRepository,
+    InventoryRepository,
+    RoomTypeRepository,
+    ServiceRequestRepository,
+    StorageEngine
+)
+
+# Index names reported by ensure_indexes(), mirroring the MongoDB ones
+MEMORY_INDEXES = {
+    "bookings": ["confirmation_number_unique", "created_at_id", "status_created_at_id", "name_keys", "check_in"],
+    "room_types": ["code_unique"],
+    "room_inventory": ["code_night_unique"],
+    "room_holds": ["hold_id_unique", "expires_at"],
+    "guests": ["phone", "email"],
+    "service_requests": ["status_id"],
+    "idempotency_keys": ["key_unique", "expires_at"],
+}
+
+# Booking fields the indexes are built from
+_INDEXED_BOOKING_FIELDS = {"confirmation_number", "status", "created_at", "check_in", "name_keys"}
+
+
+def _order_key(created_at: Optional[datetime], booking_id: int) -> tuple:
+    """Ascending sort key for (created_at, id); bookings without created_at sort first."""
+    return (1, created_at, booking_id) if created_at is not None else (0, datetime.min, booking_id)
+
+
+def _remove(ordered: list, key):
+    i = bisect_left(ordered, key)
+    if i < len(ordered) and ordered[i] == key:
+        del ordered[i]
+
+
+class MemoryRoomTypes(RoomTypeRepository):
+
+    def __init__(self):
+        self._by_code: dict[str, dict] = {}
+
+    async def list_all(self) -> list[dict]:
+        return [copy.deepcopy(r) for r in self._by_code.values()]
+
+    async def seed(self, room_types: list[dict]) -> int:
+        added = 0
+        for room in room_types:
+            if room["code"] not in self._by_code:
+                self._by_code[room["code"]] = copy.deepcopy(room)
+                added += 1
+        return added
+
+    async def update(self, code: str, changes: dict) -> bool:
+        room = self._by_code.get(code)
+        if room is None:
+            return False
+        room.update(copy.deepcopy(changes))
+        return True
+
+
+class MemoryInventory(InventoryRepository):
+
+    def __init__(self):
+        self._counters: dict[tuple[str, str], dict] = {}
+        self._nights: dict[str, list[str]] = defaultdict(list)
+
+    def _counter(self, code: str, night: str) -> dict:
+        counter = self._counters.get((code, night))
+        if counter is None:
+            counter = self._counters[(code, night)] = {"booked": 0, "holds": set()}
+            insort(self._nights[code], night)
+        return counter
+
+    async def booked_counts(self, codes: list[str], nights: list[str]) -> dict[str, int]:
+        booked = {code: 0 for code in codes}
+        for code in codes:
+            for night in nights:
+                counter = self._counters.get((code, night))
+                if counter is not None:
+                    booked[code] = max(booked[code], counter["booked"])
+        return booked
+
+    async def booked_by_night(self, codes: list[str], first_night: str, last_night: str) -> list[tuple[str, str, int]]:
+        found = []
+        for code in codes:
+            nights = self._nights.get(code, [])
+            for night in nights[bisect_left(nights, first_night):]:
+                if night > last_night:
+                    break
+                found.append((code, night, self._counters[(code, night)]["booked"]))
+        return found
+
+    async def adjust(self, code: str, nights: list[str], delta: int):
+        for night in nights:
+            self._counter(code, night)["booked"] += delta
+
+    async def ensure(self, code: str, nights: list[str]) -> int:
+        missing = [night for night in nights if (code, night) not in self._counters]
+        for night in missing:
+            self._counter(code, night)
+        return len(missing)
+
+    async def take(self, code: str, nights: list[str], total_rooms: int, hold_id: str) -> int:
+        taken = 0
+        for night in nights:
+            counter = self._counters.get((code, night))
+            if counter is not None and counter["booked"] < total_rooms and hold_id not in counter["holds"]:
+                counter["booked"] += 1
+                counter["holds"].add(hold_id)
+                taken += 1
+        return taken
+
+    async def release(self, code: str, nights: list[str], hold_id: str) -> int:
+        released = 0
+        for night in nights:
+            counter = self._counters.get((code, night))
+            if counter is not None and hold_id in counter["holds"]:
+                counter["booked"] -= 1
+                counter["holds"].discard(hold_id)
+                released += 1
+        return released
+
+
+class MemoryHolds(HoldRepository):
+
+    def __init__(self):
+        self._by_id: dict[str, dict] = {}
+        # (expires_at, hold_id) of held holds; entries for holds no longer held are skipped
+        self._expiry: list[tuple[datetime, str]] = []
+
+    async def insert(self, hold: dict):
+        if hold["hold_id"] in self._by_id:
+            raise DuplicateKeyError(f"Hold {hold['hold_id']} already exists")
+        self._by_id[hold["hold_id"]] = copy.deepcopy(hold)
+        if hold.get("status") == "held" and hold.get("expires_at"):
+            heapq.heappush(self._expiry, (hold["expires_at"], hold["hold_id"]))
+
+    async def confirm(self, hold_id: str, now: datetime) -> Optional[dict]:
+        hold = self._by_id.get(hold_id)
+        if hold is None or hold["status"] != "held" or not hold.get("expires_at") or hold["expires_at"] <= now:
+            return None
+        hold["status"] = "confirmed"
+        hold.pop("expires_at")
+        return copy.deepcopy(hold)
+
+    async def release(self, hold_id: str) -> Optional[dict]:
+        hold = self._by_id.get(hold_id)
+        if hold is None or hold["status"] != "held":
+            return None
+        hold["status"] = "released"
+        return copy.deepcopy(hold)
+
+    async def claim_expired(self, now: datetime) -> Optional[dict]:
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, hold_id = heapq.heappop(self._expiry)
+            hold = self._by_id.get(hold_id)
+            if hold is not None and hold["status"] == "held" and hold.get("expires_at") == expires_at:
+                hold["status"] = "expired"
+                return copy.deepcopy(hold)
+        return None
+
+
+class MemoryBookings(BookingRepository):
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._docs: dict[int, dict] = {}
+        self._by_number: dict[str, int] = {}
+        self._by_name_key: dict[str, set[int]] = defaultdict(set)
+        # Sorted _order_key()s of every booking (under None) and per status
+        self._order: dict[Optional[str], list[tuple]] = defaultdict(list)
+        # Sorted (check_in, order key) pairs
+        self._by_check_in: list[tuple[str, tuple]] = []
+
+    def _index(self, booking_id: int):
+        doc = self._docs[booking_id]
+        key = _order_key(doc.get("created_at"), booking_id)
+        self._by_number[doc["confirmation_number"]] = booking_id
+        insort(self._order[None], key)
+        if doc.get("status") is not None:
+            insort(self._order[doc["status"]], key)
+        if doc.get("check_in") is not None:
+            insort(self._by_check_in, (doc["check_in"], key))
+        for name_key in doc.get("name_keys") or []:
+            self._by_name_key[name_key].add(booking_id)
+
+    def _unindex(self, booking_id: int):
+        doc = self._docs[booking_id]
+        key = _order_key(doc.get("created_at"), booking_id)
+        self._by_number.pop(doc["confirmation_number"], None)
+        _remove(self._order[None], key)
+        if doc.get("status") is not None:
+            _remove(self._order[doc["status"]], key)
+        if doc.get("check_in") is not None:
+            _remove(self._by_check_in, (doc["check_in"], key))
+        for name_key in doc.get("name_keys") or []:
+            self._by_name_key[name_key].discard(booking_id)
+
+    def _change(self, booking_id: int, changes: dict):
+        reindex = not _INDEXED_BOOKING_FIELDS.isdisjoint(changes)
+        if reindex:
+            self._unindex(booking_id)
+        self._docs[booking_id].update(copy.deepcopy(changes))
+        if reindex:
+            self._index(booking_id)
+
+    @staticmethod
+    def _public(doc: dict, hidden=("name_tokens", "name_keys", "name_key_version"), fields: Optional[list[str]] = None) -> dict:
+        if fields:
+            return {f: copy.copy(doc[f]) for f in fields if f in doc}
+        return {k: copy.copy(v) for k, v in doc.items() if k not in hidden}
+
+    async def insert(self, booking: dict):
+        if booking["confirmation_number"] in self._by_number:
+            raise DuplicateKeyError(f"Confirmation number {booking['confirmation_number']} already exists")
+        booking_id = next(self._ids)
+        self._docs[booking_id] = {k: copy.deepcopy(v) for k, v in booking.items() if k != "_id"}
+        self._index(booking_id)
+
+    async def get(self, confirmation_number: str, fields: Optional[list[str]] = None) -> Optional[dict]:
+        booking_id = self._by_number.get(confirmation_number)
+        return self._public(self._docs[booking_id], fields=fields) if booking_id is not None else None
+
+    async def update(self, confirmation_number: str, changes: dict) -> bool:
+        booking_id = self._by_number.get(confirmation_number)
+        if booking_id is None:
+            return False
+        self._change(booking_id, changes)
+        return True
+
+    async def transition(
+        self, confirmation_number: str, from_statuses: list[str], changes: dict,
+        fields: Optional[list[str]] = None,
+    ) -> Optional[dict]:
+        booking_id = self._by_number.get(confirmation_number)
+        if booking_id is None or self._docs[booking_id].get("status") not in from_statuses:
+            return None
+        before = self._public(self._docs[booking_id], fields=fields)
+        self._change(booking_id, changes)
+        return before
+
+    async def transition_many(self, confirmation_numbers: list[str], from_statuses: list[str], changes: dict) -> int:
+        changed = 0
+        for number in confirmation_numbers:
+            booking_id = self._by_number.get(number)
+            if booking_id is not None and self._docs[booking_id].get("status") in from_statuses:
+                self._change(booking_id, changes)
+                changed += 1
+        return changed
+
+    def parse_id(self, text: str) -> int:
+        return int(text)
+
+    async def page(
+        self,
+        status: Optional[str],
+        after: Optional[tuple[Optional[datetime], Any]],
+        limit: int,
+        fields: list[str],
+    ) -> list[dict]:
+        order = self._order.get(status, [])
+        end = bisect_left(order, _order_key(*after)) if after else len(order)
+        page = []
+        for key in reversed(order[max(0, end - limit):end]):
+            doc = self._docs[key[2]]
+            page.append({
+                **{f: copy.copy(doc[f]) for f in fields if f in doc},
+                "created_at": doc.get("created_at"),
+                "_id": key[2],
+            })
+        return page
+
+    def _range_keys(self, status: Optional[str], by: str, start: Optional[date], end: Optional[date]) -> list[tuple]:
+        """Order keys of the bookings in an export range, oldest first."""
+        if by == "check_in":
+            lo = bisect_left(self._by_check_in, (start.isoformat(),)) if start else 0
+            hi = bisect_left(self._by_check_in, ((end + timedelta(days=1)).isoformat(),)) if end else len(self._by_check_in)
+            keys = sorted(key for _, key in self._by_check_in[lo:hi])
+            return [key for key in keys if status is None or self._docs[key[2]].get("status") == status]
+
+        order = self._order.get(status, [])
+        lo, hi = 0, len(order)
+        if start or end:
+            # A date bound leaves out bookings without created_at
+            lo = bisect_left(order, (1,))
+        if start:
+            lo = bisect_left(order, (1, datetime.combine(start, datetime.min.time())))
+        if end:
+            hi = bisect_left(order, (1, datetime.combine(end + timedelta(days=1), datetime.min.time())))
+        return order[lo:hi]
+
+    async def stream(
+        self,
+        fields: list[str],
+        status: Optional[str] = None,
+        by: str = "created_at",
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[dict]:
+        for n, key in enumerate(self._range_keys(status, by, start, end), 1):
+            doc = self._docs.get(key[2])
+            if doc is not None:
+                yield {f: copy.copy(doc[f]) for f in fields if f in doc}
+            if n % batch_size == 0:
+                # Let other requests run between batches
+                await asyncio.sleep(0)
+
+    async def find_by_name_keys(
+        self, keys: list[str], match_all: bool, status: Optional[str], limit: int,
+        fields: Optional[list[str]] = None,
+    ) -> list[dict]:
+        if not keys:
+            return []
+        sets = sorted((self._by_name_key.get(k, set()) for k in keys), key=len)
+        ids = set.intersection(*sets) if match_all else set.union(*sets)
+        if status:
+            ids = {i for i in ids if self._docs[i].get("status") == status}
+        newest = heapq.nlargest(limit, (_order_key(self._docs[i].get("created_at"), i) for i in ids))
+        wanted = fields and [*fields, "name_tokens"]
+        return [self._public(self._docs[key[2]], hidden=("name_keys", "name_key_version"), fields=wanted) for key in newest]
+
+    async def missing_name_index(self, version: int) -> AsyncIterator[tuple[Any, str]]:
+        missing = [
+            (i, d.get("guest_name", "")) for i, d in self._docs.items()
+            if "name_keys" not in d or d.get("name_key_version", 1) != version
+        ]
+        for entry in missing:
+            yield entry
+
+    async def set_name_index(self, updates: list[tuple[Any, dict]]):
+        for booking_id, fields in updates:
+            if booking_id in self._docs:
+                self._change(booking_id, fields)
+
+
+class _MemoryCollection:
+    """Documents with int ids and equality indexes on a few fields."""
+
+    def __init__(self, indexed: tuple[str, ...]):
+        self._ids = itertools.count(1)
+        self._docs: dict[int, dict] = {}
+        self._indexes: dict[str, dict[Any, list[int]]] = {field: defaultdict(list) for field in indexed}
+
+    def _id(self, text: str) -> Optional[int]:
+        return int(text) if str(text).isdigit() else None
+
+    def insert(self, doc: dict) -> str:
+        doc_id = next(self._ids)
+        self._docs[doc_id] = copy.deepcopy(doc)
+        for field, index in self._indexes.items():
+            if doc.get(field) is not None:
+                insort(index[doc[field]], doc_id)
+        return str(doc_id)
+
+    def get(self, text: str) -> Optional[dict]:
+        doc_id = self._id(text)
+        if doc_id not in self._docs:
+            return None
+        return dict(copy.deepcopy(self._docs[doc_id]), id=str(doc_id))
+
+    def ids(self, field: str, value) -> list[int]:
+        return self._indexes[field].get(value, [])
+
+    def update(self, text: str, changes: dict) -> bool:
+        doc_id = self._id(text)
+        doc = self._docs.get(doc_id)
+        if doc is None:
+            return False
+        for field, index in self._indexes.items():
+            if field in changes and doc.get(field) is not None:
+                _remove(index[doc[field]], doc_id)
+        doc.update(copy.deepcopy(changes))
+        for field, index in self._indexes.items():
+            if field in changes and doc.get(field) is not None:
+                insort(index[doc[field]], doc_id)
+        return True
+
+
+class MemoryGuests(GuestRepository):
+
+    def __init__(self):
+        self._guests = _MemoryCollection(("phone", "email"))
+
+    async def insert(self, guest: dict) -> str:
+        return self._guests.insert(guest)
+
+    async def get(self, guest_id: str) -> Optional[dict]:
+        return self._guests.get(guest_id)
+
+    async def find(self, phone: Optional[str] = None, email: Optional[str] = None) -> list[dict]:
+        ids = set(self._guests.ids("phone", phone) if phone else []) | set(self._guests.ids("email", email) if email else [])
+        return [self._guests.get(str(i)) for i in sorted(ids)[:20]]
+
+    async def update(self, guest_id: str, changes: dict) -> bool:
+        return self._guests.update(guest_id, changes)
+
+
+class MemoryServiceRequests(ServiceRequestRepository):
+
+    def __init__(self):
+        self._requests = _MemoryCollection(("status",))
+
+    async def insert(self, request: dict) -> str:
+        return self._requests.insert(request)
+
+    async def get(self, request_id: str) -> Optional[dict]:
+        return self._requests.get(request_id)
+
+    async def update(self, request_id: str, changes: dict) -> bool:
+        return self._requests.update(request_id, changes)
+
+    async def list_by_status(self, status: str, limit: int = 50) -> list[dict]:
+        return [self._requests.get(str(i)) for i in self._requests.ids("status", status)[:limit]]
+
+
+class MemoryIdempotency(IdempotencyRepository):
+
+    def __init__(self):
+        self._by_key: dict[str, dict] = {}
+        # (expires_at, key); entries whose record has since moved its expiry are skipped
+        self._expiry: list[tuple[datetime, str]] = []
+
+    def _expire(self, now: datetime):
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            record = self._by_key.get(key)
+            if record is not None and record["expires_at"] == expires_at:
+                del self._by_key[key]
+
+    async def claim(self, key: str, fingerprint: str, now: datetime, expires_at: datetime) -> Optional[dict]:
+        self._expire(now)
+        if key in self._by_key:
+            return copy.deepcopy(self._by_key[key])
+        self._by_key[key] = {
+            "key": key, "fingerprint": fingerprint, "status": "pending", "response": None, "expires_at": expires_at,
+        }
+        heapq.heappush(self._expiry, (expires_at, key))
+        return None
+
+    async def complete(self, key: str, response: dict, expires_at: datetime):
+        record = self._by_key.get(key)
+        if record is not None:
+            record.update(status="done", response=copy.deepcopy(response), expires_at=expires_at)
+            heapq.heappush(self._expiry, (expires_at, key))
+
+    async def release(self, key: str):
+        if self._by_key.get(key, {}).get("status") == "pending":
+            del self._by_key[key]
+
+
+class MemoryStorage(StorageEngine):
+    """Everything in this process's memory; nothing persists."""
+
+    name = "memory"
+
+    def __init__(self):
+        self.bookings = MemoryBookings()
+        self.room_types = MemoryRoomTypes()
+        self.inventory = MemoryInventory()
+        self.holds = MemoryHolds()
+        self.guests = MemoryGuests()
+        self.service_requests = MemoryServiceRequests()
+        self.idempotency = MemoryIdempotency()
+
+    async def ensure_indexes(self) -> dict:
+        # The indexes are maintained on every write, so they always exist
+        return {
+            collection: {
+                "expected": names, "found": names, "missing": [], "unexpected": [],
+                "created": [], "conflicts": [], "failed": {},
+            }
+            for collection, names in MEMORY_INDEXES.items()
+        }
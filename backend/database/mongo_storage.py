@@ -0,0 +1,416 @@
+"""
+Mongo Storage - Repositories on MongoDB through Motor
+
+This file implements the storage interface on the collections from connection.py.
+Reservations use MongoDB's single-document atomicity: conditional update_many on the
+per-night counters, find_one_and_update for hold transitions. The collection getters
+are called on every operation, so code that repoints connection.db (the benchmarks)
+is picked up.
+"""
+
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError as MongoDuplicateKeyError
+
+from backend.database import connection
+from backend.database.schemas import ensure_indexes
+from backend.database.storage import (
+    BookingRepository,
+    DuplicateKeyError,
+    GuestRepository,
+    HoldRepository,
+    IdempotencyRepository,
+    InventoryRepository,
+    RoomTypeRepository,
+    ServiceRequestRepository,
+    StorageEngine
+)
+
+# Leaves out _id and the name index
+BOOKING_PROJECTION = {"_id": 0, "name_tokens": 0, "name_keys": 0, "name_key_version": 0}
+
+
+def _booking_projection(fields: Optional[list[str]], *always: str) -> dict:
+    """Only the fields (and always) when fields are given, else all but the name index."""
+    if not fields:
+        return BOOKING_PROJECTION
+    return {**{f: 1 for f in fields}, **{f: 1 for f in always}, "_id": 0}
+
+
+def _object_id(text: str) -> Optional[ObjectId]:
+    try:
+        return ObjectId(text)
+    except (InvalidId, TypeError):
+        return None
+
+
+def _with_id(document: Optional[dict]) -> Optional[dict]:
+    """A document with its ObjectId as a string 'id'."""
+    if document is None:
+        return None
+    document["id"] = str(document.pop("_id"))
+    return document
+
+
+class MongoRoomTypes(RoomTypeRepository):
+
+    async def list_all(self) -> list[dict]:
+        return await connection.get_room_types_collection().find({}, {"_id": 0}).to_list(length=100)
+
+    async def seed(self, room_types: list[dict]) -> int:
+        result = await connection.get_room_types_collection().bulk_write(
+            [UpdateOne({"code": r["code"]}, {"$setOnInsert": dict(r)}, upsert=True) for r in room_types],
+            ordered=False,
+        )
+        return result.upserted_count
+
+    async def update(self, code: str, changes: dict) -> bool:
+        result = await connection.get_room_types_collection().update_one({"code": code}, {"$set": changes})
+        return result.matched_count > 0
+
+    @asynccontextmanager
+    async def watch(self) -> AsyncIterator[AsyncIterator[str]]:
+        # Raises OperationFailure on servers without change streams (standalone)
+        async with connection.get_room_types_collection().watch() as stream:
+            yield (change.get("operationType", "change") async for change in stream)
+
+
+class MongoInventory(InventoryRepository):
+
+    async def booked_counts(self, codes: list[str], nights: list[str]) -> dict[str, int]:
+        booked = {code: 0 for code in codes}
+        cursor = connection.get_room_inventory_collection().find(
+            {"code": {"$in": codes}, "night": {"$in": nights}},
+            {"_id": 0, "code": 1, "booked": 1},
+        )
+        async for counter in cursor:
+            booked[counter["code"]] = max(booked[counter["code"]], counter.get("booked", 0))
+        return booked
+
+    async def booked_by_night(self, codes: list[str], first_night: str, last_night: str) -> list[tuple[str, str, int]]:
+        cursor = connection.get_room_inventory_collection().find(
+            {"code": {"$in": codes}, "night": {"$gte": first_night, "$lte": last_night}},
+            {"_id": 0, "code": 1, "night": 1, "booked": 1},
+        )
+        return [(c["code"], c["night"], c.get("booked", 0)) async for c in cursor]
+
+    async def adjust(self, code: str, nights: list[str], delta: int):
+        await connection.get_room_inventory_collection().bulk_write(
+            [UpdateOne({"code": code, "night": night}, {"$inc": {"booked": delta}}, upsert=True) for night in nights],
+            ordered=False,
+        )
+
+    async def ensure(self, code: str, nights: list[str]) -> int:
+        result = await connection.get_room_inventory_collection().bulk_write(
+            [
+                UpdateOne({"code": code, "night": night}, {"$setOnInsert": {"booked": 0, "holds": []}}, upsert=True)
+                for night in nights
+            ],
+            ordered=False,
+        )
+        return result.upserted_count
+
+    async def take(self, code: str, nights: list[str], total_rooms: int, hold_id: str) -> int:
+        # One round-trip for the whole stay; each counter only moves while below total_rooms
+        result = await connection.get_room_inventory_collection().update_many(
+            {"code": code, "night": {"$in": nights}, "booked": {"$lt": total_rooms}, "holds": {"$ne": hold_id}},
+            {"$inc": {"booked": 1}, "$push": {"holds": hold_id}},
+        )
+        return result.modified_count
+
+    async def release(self, code: str, nights: list[str], hold_id: str) -> int:
+        result = await connection.get_room_inventory_collection().update_many(
+            {"code": code, "night": {"$in": nights}, "holds": hold_id},
+            {"$inc": {"booked": -1}, "$pull": {"holds": hold_id}},
+        )
+        return result.modified_count
+
+
+class MongoHolds(HoldRepository):
+
+    async def insert(self, hold: dict):
+        await connection.get_room_holds_collection().insert_one(dict(hold))
+
+    async def confirm(self, hold_id: str, now: datetime) -> Optional[dict]:
+        return await connection.get_room_holds_collection().find_one_and_update(
+            {"hold_id": hold_id, "status": "held", "expires_at": {"$gt": now}},
+            {"$set": {"status": "confirmed"}, "$unset": {"expires_at": ""}},
+            projection={"_id": 0},
+        )
+
+    async def release(self, hold_id: str) -> Optional[dict]:
+        return await connection.get_room_holds_collection().find_one_and_update(
+            {"hold_id": hold_id, "status": "held"},
+            {"$set": {"status": "released"}},
+            projection={"_id": 0},
+        )
+
+    async def claim_expired(self, now: datetime) -> Optional[dict]:
+        return await connection.get_room_holds_collection().find_one_and_update(
+            {"status": "held", "expires_at": {"$lte": now}},
+            {"$set": {"status": "expired"}},
+            projection={"_id": 0},
+        )
+
+
+class MongoBookings(BookingRepository):
+
+    async def insert(self, booking: dict):
+        try:
+            await connection.get_bookings_collection().insert_one(dict(booking))
+        except MongoDuplicateKeyError as e:
+            raise DuplicateKeyError(str(e))
+
+    async def get(self, confirmation_number: str, fields: Optional[list[str]] = None) -> Optional[dict]:
+        return await connection.get_bookings_collection().find_one(
+            {"confirmation_number": confirmation_number}, _booking_projection(fields)
+        )
+
+    async def update(self, confirmation_number: str, changes: dict) -> bool:
+        result = await connection.get_bookings_collection().update_one(
+            {"confirmation_number": confirmation_number}, {"$set": changes}
+        )
+        return result.matched_count > 0
+
+    async def transition(
+        self, confirmation_number: str, from_statuses: list[str], changes: dict,
+        fields: Optional[list[str]] = None,
+    ) -> Optional[dict]:
+        # The status guard is part of the filter, so a booking that moved on is not matched
+        return await connection.get_bookings_collection().find_one_and_update(
+            {"confirmation_number": confirmation_number, "status": {"$in": from_statuses}},
+            {"$set": changes},
+            projection=_booking_projection(fields),
+        )
+
+    async def transition_many(self, confirmation_numbers: list[str], from_statuses: list[str], changes: dict) -> int:
+        if not confirmation_numbers:
+            return 0
+        result = await connection.get_bookings_collection().bulk_write(
+            [
+                UpdateOne({"confirmation_number": number, "status": {"$in": from_statuses}}, {"$set": changes})
+                for number in confirmation_numbers
+            ],
+            ordered=False,
+        )
+        return result.modified_count
+
+    def parse_id(self, text: str) -> ObjectId:
+        booking_id = _object_id(text)
+        if booking_id is None:
+            raise ValueError(f"Invalid booking id '{text}'")
+        return booking_id
+
+    @staticmethod
+    def _after(created_at: Optional[datetime], booking_id: ObjectId) -> dict:
+        """Filter for bookings that come after (created_at, _id) in newest-first order."""
+        if created_at is None:
+            # Bookings without created_at sort last; continue among them by _id
+            return {"created_at": None, "_id": {"$lt": booking_id}}
+        return {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": booking_id}},
+            {"created_at": None},
+        ]}
+
+    async def page(
+        self,
+        status: Optional[str],
+        after: Optional[tuple[Optional[datetime], Any]],
+        limit: int,
+        fields: list[str],
+    ) -> list[dict]:
+        query = {"status": status} if status else {}
+        if after:
+            query = {**query, **self._after(*after)}
+        # created_at and _id are always read: they are the keyset
+        projection = {**{f: 1 for f in fields}, "created_at": 1, "_id": 1}
+        return await (
+            connection.get_bookings_collection()
+            .find(query, projection)
+            .sort([("created_at", -1), ("_id", -1)])
+            .limit(limit)
+            .to_list(length=limit)
+        )
+
+    @staticmethod
+    def _range_query(status: Optional[str], by: str, start: Optional[date], end: Optional[date]) -> dict:
+        query = {"status": status} if status else {}
+        bounds = {}
+        if by == "created_at":
+            if start:
+                bounds["$gte"] = datetime.combine(start, datetime.min.time())
+            if end:
+                bounds["$lt"] = datetime.combine(end + timedelta(days=1), datetime.min.time())
+        else:
+            # check_in is stored as an ISO date string, which sorts like the date
+            if start:
+                bounds["$gte"] = start.isoformat()
+            if end:
+                bounds["$lte"] = end.isoformat()
+        if bounds:
+            query[by] = bounds
+        return query
+
+    async def stream(
+        self,
+        fields: list[str],
+        status: Optional[str] = None,
+        by: str = "created_at",
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[dict]:
+        cursor = (
+            connection.get_bookings_collection()
+            .find(self._range_query(status, by, start, end), {**{f: 1 for f in fields}, "_id": 0})
+            .sort([("created_at", 1), ("_id", 1)])
+            .batch_size(batch_size)
+        )
+        try:
+            async for booking in cursor:
+                yield booking
+        finally:
+            # The client may disconnect mid-export
+            await cursor.close()
+
+    async def find_by_name_keys(
+        self, keys: list[str], match_all: bool, status: Optional[str], limit: int,
+        fields: Optional[list[str]] = None,
+    ) -> list[dict]:
+        query = {"name_keys": {"$all" if match_all else "$in": keys}}
+        if status:
+            query["status"] = status
+        projection = _booking_projection(fields, "name_tokens") if fields else {"_id": 0, "name_keys": 0, "name_key_version": 0}
+        cursor = (
+            connection.get_bookings_collection()
+            .find(query, projection)
+            .sort("created_at", -1)
+            .limit(limit)
+        )
+        return await cursor.to_list(length=limit)
+
+    async def missing_name_index(self, version: int) -> AsyncIterator[tuple[Any, str]]:
+        # $ne also matches bookings indexed before versions were stored
+        cursor = connection.get_bookings_collection().find(
+            {"$or": [{"name_keys": {"$exists": False}}, {"name_key_version": {"$ne": version}}]},
+            {"_id": 1, "guest_name": 1}
+        )
+        async for booking in cursor:
+            yield booking["_id"], booking.get("guest_name", "")
+
+    async def set_name_index(self, updates: list[tuple[Any, dict]]):
+        if updates:
+            await connection.get_bookings_collection().bulk_write(
+                [UpdateOne({"_id": booking_id}, {"$set": fields}) for booking_id, fields in updates],
+                ordered=False,
+            )
+
+
+class MongoGuests(GuestRepository):
+
+    async def insert(self, guest: dict) -> str:
+        result = await connection.get_guests_collection().insert_one(dict(guest))
+        return str(result.inserted_id)
+
+    async def get(self, guest_id: str) -> Optional[dict]:
+        object_id = _object_id(guest_id)
+        if object_id is None:
+            return None
+        return _with_id(await connection.get_guests_collection().find_one({"_id": object_id}))
+
+    async def find(self, phone: Optional[str] = None, email: Optional[str] = None) -> list[dict]:
+        conditions = [{field: value} for field, value in (("phone", phone), ("email", email)) if value]
+        if not conditions:
+            return []
+        cursor = connection.get_guests_collection().find({"$or": conditions}).limit(20)
+        return [_with_id(guest) async for guest in cursor]
+
+    async def update(self, guest_id: str, changes: dict) -> bool:
+        object_id = _object_id(guest_id)
+        if object_id is None:
+            return False
+        result = await connection.get_guests_collection().update_one({"_id": object_id}, {"$set": changes})
+        return result.matched_count > 0
+
+
+class MongoServiceRequests(ServiceRequestRepository):
+
+    async def insert(self, request: dict) -> str:
+        result = await connection.get_service_requests_collection().insert_one(dict(request))
+        return str(result.inserted_id)
+
+    async def get(self, request_id: str) -> Optional[dict]:
+        object_id = _object_id(request_id)
+        if object_id is None:
+            return None
+        return _with_id(await connection.get_service_requests_collection().find_one({"_id": object_id}))
+
+    async def update(self, request_id: str, changes: dict) -> bool:
+        object_id = _object_id(request_id)
+        if object_id is None:
+            return False
+        result = await connection.get_service_requests_collection().update_one({"_id": object_id}, {"$set": changes})
+        return result.matched_count > 0
+
+    async def list_by_status(self, status: str, limit: int = 50) -> list[dict]:
+        cursor = connection.get_service_requests_collection().find({"status": status}).sort("_id", 1).limit(limit)
+        return [_with_id(request) async for request in cursor]
+
+
+class MongoIdempotency(IdempotencyRepository):
+
+    async def claim(self, key: str, fingerprint: str, now: datetime, expires_at: datetime) -> Optional[dict]:
+        collection = connection.get_idempotency_keys_collection()
+        record = {"key": key, "fingerprint": fingerprint, "status": "pending", "response": None, "expires_at": expires_at}
+        try:
+            # Inserts the key, or takes over a record that expired before the TTL monitor removed it
+            await collection.update_one({"key": key, "expires_at": {"$lte": now}}, {"$set": record}, upsert=True)
+            return None
+        except MongoDuplicateKeyError:
+            # An unexpired record has the key
+            existing = await collection.find_one({"key": key}, {"_id": 0})
+            if existing is None:
+                # Removed in between; try again
+                return await self.claim(key, fingerprint, now, expires_at)
+            return existing
+
+    async def complete(self, key: str, response: dict, expires_at: datetime):
+        await connection.get_idempotency_keys_collection().update_one(
+            {"key": key}, {"$set": {"status": "done", "response": response, "expires_at": expires_at}}
+        )
+
+    async def release(self, key: str):
+        await connection.get_idempotency_keys_collection().delete_one({"key": key, "status": "pending"})
+
+
+class MongoStorage(StorageEngine):
+    """MongoDB through the shared Motor client (MONGODB_URL)."""
+
+    name = "mongo"
+
+    def __init__(self):
+        self.bookings = MongoBookings()
+        self.room_types = MongoRoomTypes()
+        self.inventory = MongoInventory()
+        self.holds = MongoHolds()
+        self.guests = MongoGuests()
+        self.service_requests = MongoServiceRequests()
+        self.idempotency = MongoIdempotency()
+
+    async def open(self):
+        # Already connected when a benchmark pointed connection.db at its own database
+        if connection.client is None:
+            await connection.connect_to_mongodb()
+
+    async def close(self):
+        await connection.close_mongodb_connection()
+        connection.client = connection.db = None
+
+    async def ensure_indexes(self) -> dict:
+        return await ensure_indexes(connection.get_database())
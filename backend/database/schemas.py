@@ -6,3 +6,95 @@ rooms, room_types, guests, bookings, payments, service_requests, and call_logs.
 MongoDB is schemaless, these schemas serve as documentation and can be used to create
 indexes and validate document structure during insert/update operations.
 """
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+# Indexes each collection needs, created at startup by ensure_indexes()
+REQUIRED_INDEXES = {
+    "bookings": [
+        # GET/DELETE /bookings/{confirmation_number}; unique so a number can't be issued twice
+        IndexModel([("confirmation_number", ASCENDING)], name="confirmation_number_unique", unique=True),
+        # GET /bookings/ pages and exports, ordered by (created_at, _id), with or without a status
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_at_id"),
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="status_created_at_id"
+        ),
+        # Phonetic guest-name lookup, newest first (services/name_search.py)
+        IndexModel([("name_keys", ASCENDING), ("created_at", DESCENDING)], name="name_keys_created_at"),
+        # Morning check-in and night-audit checkout sweeps: bookings in a status by arrival date
+        IndexModel([("status", ASCENDING), ("check_in", ASCENDING)], name="status_check_in"),
+        IndexModel([("phone", ASCENDING)], name="phone"),
+        IndexModel([("email", ASCENDING)], name="email"),
+    ],
+    "room_types": [
+        IndexModel([("code", ASCENDING)], name="code_unique", unique=True),
+    ],
+    "room_inventory": [
+        # One counter per room type and night; concurrent upserts can't create duplicates
+        IndexModel([("code", ASCENDING), ("night", ASCENDING)], name="code_night_unique", unique=True),
+    ],
+    "room_holds": [
+        IndexModel([("hold_id", ASCENDING)], name="hold_id_unique", unique=True),
+        # The hold sweeper's query for expired holds
+        IndexModel([("status", ASCENDING), ("expires_at", ASCENDING)], name="status_expires_at"),
+    ],
+    "guests": [
+        IndexModel([("phone", ASCENDING)], name="phone"),
+        IndexModel([("email", ASCENDING)], name="email"),
+    ],
+    "service_requests": [
+        # The staff work queue: open requests, oldest first
+        IndexModel([("status", ASCENDING), ("_id", ASCENDING)], name="status_id"),
+    ],
+    "idempotency_keys": [
+        IndexModel([("key", ASCENDING)], name="key_unique", unique=True),
+        # MongoDB deletes each record once its expires_at has passed
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+
+def _key(spec) -> tuple:
+    """Index key as a comparable tuple of (field, direction) pairs."""
+    return tuple((field, int(direction)) for field, direction in spec)
+
+
+async def ensure_indexes(db) -> dict:
+    """
+    Create the required indexes that are missing and compare the index set found with
+    the one expected. Indexes are matched by key, so an existing index under another
+    name counts. Failures (e.g. duplicate confirmation numbers blocking a unique
+    index) are reported rather than raised, so the API still starts.
+    """
+    report = {}
+    for collection_name, models in REQUIRED_INDEXES.items():
+        collection = db[collection_name]
+        existing = {_key(info["key"]): info for info in (await collection.index_information()).values()}
+        created, conflicts, failed = [], [], {}
+
+        for model in models:
+            document = model.document
+            info = existing.get(_key(document["key"].items()))
+            if info is not None:
+                if bool(info.get("unique")) != bool(document.get("unique")):
+                    conflicts.append(document["name"])
+                continue
+            try:
+                await collection.create_indexes([model])
+                created.append(document["name"])
+            except PyMongoError as e:
+                failed[document["name"]] = str(e)
+
+        found = {_key(info["key"]): name for name, info in (await collection.index_information()).items()}
+        expected = {_key(m.document["key"].items()): m.document["name"] for m in models}
+        report[collection_name] = {
+            "expected": sorted(expected.values()),
+            "found": sorted(name for name in found.values() if name != "_id_"),
+            "missing": sorted(name for key, name in expected.items() if key not in found),
+            "unexpected": sorted(name for key, name in found.items() if key not in expected and name != "_id_"),
+            "created": created,
+            "conflicts": conflicts,
+            "failed": failed,
+        }
+    return report
@@ -0,0 +1,709 @@
+"""
+SQLite Storage - Repositories in a Single SQLite File (WAL Mode)
+
+This file implements the storage interface on the standard library's sqlite3, for a
+hotel that runs everything on one machine and doesn't want a database server. The
+database runs in WAL mode: readers never block the writer, and exports read from a
+consistent snapshot while bookings keep coming in.
+
+sqlite3 calls block, so every statement runs on one dedicated worker thread and the
+event loop only awaits it. Writes are transactions opened with BEGIN IMMEDIATE, which
+also serializes them against other processes using the same file; reserving a room's
+nights is one such transaction. Documents are stored as JSON (datetimes tagged so they
+round-trip), with the queried fields copied into indexed columns.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Optional
+
+from backend.database.storage import (
+    BookingRepository,
+    DuplicateKeyError,
+    GuestRepository,
+    HoldRepository,
+    IdempotencyRepository,
+    InventoryRepository,
+    RoomTypeRepository,
+    ServiceRequestRepository,
+    StorageEngine
+)
+
+# Database file
+SQLITE_PATH = os.getenv("SQLITE_PATH", "roomiai.db")
+
+# Milliseconds a write waits for another process's transaction before failing
+SQLITE_BUSY_TIMEOUT_MS = 5000
+
+TABLES = [
+    """CREATE TABLE IF NOT EXISTS bookings (
+        id INTEGER PRIMARY KEY,
+        confirmation_number TEXT NOT NULL UNIQUE,
+        status TEXT,
+        created_at TEXT,
+        check_in TEXT,
+        doc TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS booking_name_keys (
+        name_key TEXT NOT NULL,
+        booking_id INTEGER NOT NULL REFERENCES bookings(id),
+        PRIMARY KEY (name_key, booking_id)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS room_types (
+        code TEXT PRIMARY KEY,
+        position INTEGER NOT NULL,
+        doc TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS room_inventory (
+        code TEXT NOT NULL,
+        night TEXT NOT NULL,
+        booked INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (code, night)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS inventory_holds (
+        code TEXT NOT NULL,
+        night TEXT NOT NULL,
+        hold_id TEXT NOT NULL,
+        PRIMARY KEY (code, hold_id, night)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS room_holds (
+        hold_id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        expires_at TEXT,
+        doc TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS guests (
+        id INTEGER PRIMARY KEY,
+        phone TEXT,
+        email TEXT,
+        doc TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS service_requests (
+        id INTEGER PRIMARY KEY,
+        status TEXT,
+        doc TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS idempotency_keys (
+        key TEXT PRIMARY KEY,
+        expires_at TEXT NOT NULL,
+        doc TEXT NOT NULL
+    )""",
+]
+
+# Secondary indexes, created at startup by ensure_indexes(): {table: {name: columns}}
+SQLITE_INDEXES = {
+    "bookings": {
+        # GET /bookings/ pages and exports, with or without a status
+        "bookings_created_at_id": "created_at DESC, id DESC",
+        "bookings_status_created_at_id": "status, created_at DESC, id DESC",
+        "bookings_check_in": "check_in",
+        # Check-in and checkout sweeps
+        "bookings_status_check_in": "status, check_in",
+    },
+    "room_holds": {
+        # The hold sweeper's query for expired holds
+        "room_holds_status_expires_at": "status, expires_at",
+    },
+    "guests": {
+        "guests_phone": "phone",
+        "guests_email": "email",
+    },
+    "service_requests": {
+        "service_requests_status_id": "status, id",
+    },
+    "idempotency_keys": {
+        # Expired keys are deleted before each claim
+        "idempotency_keys_expires_at": "expires_at",
+    },
+}
+
+
+# ============================================
+# Documents
+# ============================================
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    """Datetime as a fixed-width ISO string, which sorts like the datetime."""
+    return value.isoformat(timespec="microseconds") if value is not None else None
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"$date": _iso(value)}
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    raise TypeError(f"Cannot store {type(value).__name__}")
+
+
+def _decode(obj: dict):
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+
+def dumps(doc: dict) -> str:
+    return json.dumps(doc, separators=(",", ":"), default=_encode)
+
+
+def loads(text: str) -> dict:
+    return json.loads(text, object_hook=_decode)
+
+
+def _marks(values: list) -> str:
+    return ",".join("?" * len(values))
+
+
+class _Repository:
+
+    def __init__(self, storage: "SQLiteStorage"):
+        self._storage = storage
+
+    async def _read(self, operation: Callable[[sqlite3.Connection], Any]):
+        return await self._storage.run(operation, write=False)
+
+    async def _write(self, operation: Callable[[sqlite3.Connection], Any]):
+        return await self._storage.run(operation, write=True)
+
+
+class SQLiteRoomTypes(_Repository, RoomTypeRepository):
+
+    async def list_all(self) -> list[dict]:
+        rows = await self._read(lambda db: db.execute("SELECT doc FROM room_types ORDER BY position").fetchall())
+        return [loads(doc) for (doc,) in rows]
+
+    async def seed(self, room_types: list[dict]) -> int:
+        def seed(db):
+            before = db.total_changes
+            position = db.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM room_types").fetchone()[0]
+            db.executemany(
+                "INSERT OR IGNORE INTO room_types (code, position, doc) VALUES (?, ?, ?)",
+                [(r["code"], position + i, dumps(r)) for i, r in enumerate(room_types)],
+            )
+            return db.total_changes - before
+        return await self._write(seed)
+
+    async def update(self, code: str, changes: dict) -> bool:
+        def update(db):
+            row = db.execute("SELECT doc FROM room_types WHERE code = ?", (code,)).fetchone()
+            if row is None:
+                return False
+            db.execute("UPDATE room_types SET doc = ? WHERE code = ?", (dumps({**loads(row[0]), **changes}), code))
+            return True
+        return await self._write(update)
+
+
+class SQLiteInventory(_Repository, InventoryRepository):
+
+    async def booked_counts(self, codes: list[str], nights: list[str]) -> dict[str, int]:
+        booked = {code: 0 for code in codes}
+        if not codes or not nights:
+            return booked
+        rows = await self._read(lambda db: db.execute(
+            f"SELECT code, MAX(booked) FROM room_inventory WHERE code IN ({_marks(codes)}) "
+            f"AND night IN ({_marks(nights)}) GROUP BY code",
+            [*codes, *nights],
+        ).fetchall())
+        booked.update(dict(rows))
+        return booked
+
+    async def booked_by_night(self, codes: list[str], first_night: str, last_night: str) -> list[tuple[str, str, int]]:
+        if not codes:
+            return []
+        return await self._read(lambda db: db.execute(
+            f"SELECT code, night, booked FROM room_inventory WHERE code IN ({_marks(codes)}) AND night BETWEEN ? AND ?",
+            [*codes, first_night, last_night],
+        ).fetchall())
+
+    async def adjust(self, code: str, nights: list[str], delta: int):
+        await self._write(lambda db: db.executemany(
+            "INSERT INTO room_inventory (code, night, booked) VALUES (?, ?, ?) "
+            "ON CONFLICT (code, night) DO UPDATE SET booked = booked + excluded.booked",
+            [(code, night, delta) for night in nights],
+        ))
+
+    async def ensure(self, code: str, nights: list[str]) -> int:
+        def ensure(db):
+            before = db.total_changes
+            db.executemany(
+                "INSERT OR IGNORE INTO room_inventory (code, night, booked) VALUES (?, ?, 0)",
+                [(code, night) for night in nights],
+            )
+            return db.total_changes - before
+        return await self._write(ensure)
+
+    async def take(self, code: str, nights: list[str], total_rooms: int, hold_id: str) -> int:
+        def take(db):
+            free = [night for (night,) in db.execute(
+                f"SELECT night FROM room_inventory WHERE code = ? AND night IN ({_marks(nights)}) AND booked < ? "
+                "AND night NOT IN (SELECT night FROM inventory_holds WHERE code = ? AND hold_id = ?)",
+                [code, *nights, total_rooms, code, hold_id],
+            )]
+            if free:
+                db.execute(
+                    f"UPDATE room_inventory SET booked = booked + 1 WHERE code = ? AND night IN ({_marks(free)})",
+                    [code, *free],
+                )
+                db.executemany(
+                    "INSERT INTO inventory_holds (code, night, hold_id) VALUES (?, ?, ?)",
+                    [(code, night, hold_id) for night in free],
+                )
+            return len(free)
+        return await self._write(take)
+
+    async def release(self, code: str, nights: list[str], hold_id: str) -> int:
+        def release(db):
+            held = [night for (night,) in db.execute(
+                f"SELECT night FROM inventory_holds WHERE code = ? AND hold_id = ? AND night IN ({_marks(nights)})",
+                [code, hold_id, *nights],
+            )]
+            if held:
+                db.execute(
+                    f"UPDATE room_inventory SET booked = booked - 1 WHERE code = ? AND night IN ({_marks(held)})",
+                    [code, *held],
+                )
+                db.execute(
+                    f"DELETE FROM inventory_holds WHERE code = ? AND hold_id = ? AND night IN ({_marks(held)})",
+                    [code, hold_id, *held],
+                )
+            return len(held)
+        return await self._write(release)
+
+
+class SQLiteHolds(_Repository, HoldRepository):
+
+    async def insert(self, hold: dict):
+        def insert(db):
+            try:
+                db.execute(
+                    "INSERT INTO room_holds (hold_id, status, expires_at, doc) VALUES (?, ?, ?, ?)",
+                    (hold["hold_id"], hold["status"], _iso(hold.get("expires_at")), dumps(hold)),
+                )
+            except sqlite3.IntegrityError as e:
+                raise DuplicateKeyError(str(e))
+        await self._write(insert)
+
+    def _transition(self, where: str, params: list, status: str, keep_expiry: bool = True):
+        """Operation moving the first hold matching where to status and returning it."""
+        def transition(db):
+            row = db.execute(f"SELECT hold_id, doc FROM room_holds WHERE {where} LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            hold = dict(loads(row[1]), status=status)
+            if not keep_expiry:
+                hold.pop("expires_at", None)
+            db.execute(
+                "UPDATE room_holds SET status = ?, expires_at = ?, doc = ? WHERE hold_id = ?",
+                (status, _iso(hold.get("expires_at")), dumps(hold), row[0]),
+            )
+            return hold
+        return transition
+
+    async def confirm(self, hold_id: str, now: datetime) -> Optional[dict]:
+        return await self._write(self._transition(
+            "hold_id = ? AND status = 'held' AND expires_at > ?", [hold_id, _iso(now)], "confirmed", keep_expiry=False
+        ))
+
+    async def release(self, hold_id: str) -> Optional[dict]:
+        return await self._write(self._transition("hold_id = ? AND status = 'held'", [hold_id], "released"))
+
+    async def claim_expired(self, now: datetime) -> Optional[dict]:
+        return await self._write(self._transition(
+            "status = 'held' AND expires_at <= ? ORDER BY expires_at", [_iso(now)], "expired"
+        ))
+
+
+class SQLiteBookings(_Repository, BookingRepository):
+
+    @staticmethod
+    def _set_name_keys(db, booking_id: int, name_keys: list[str]):
+        db.execute("DELETE FROM booking_name_keys WHERE booking_id = ?", (booking_id,))
+        db.executemany(
+            "INSERT OR IGNORE INTO booking_name_keys (name_key, booking_id) VALUES (?, ?)",
+            [(key, booking_id) for key in name_keys],
+        )
+
+    @staticmethod
+    def _public(doc: dict, hidden=("name_tokens", "name_keys", "name_key_version"), fields: Optional[list[str]] = None) -> dict:
+        if fields:
+            return {f: doc[f] for f in fields if f in doc}
+        return {k: v for k, v in doc.items() if k not in hidden}
+
+    async def insert(self, booking: dict):
+        doc = {k: v for k, v in booking.items() if k != "_id"}
+
+        def insert(db):
+            try:
+                cursor = db.execute(
+                    "INSERT INTO bookings (confirmation_number, status, created_at, check_in, doc) VALUES (?, ?, ?, ?, ?)",
+                    (doc["confirmation_number"], doc.get("status"), _iso(doc.get("created_at")), doc.get("check_in"), dumps(doc)),
+                )
+            except sqlite3.IntegrityError as e:
+                raise DuplicateKeyError(str(e))
+            self._set_name_keys(db, cursor.lastrowid, doc.get("name_keys") or [])
+        await self._write(insert)
+
+    async def get(self, confirmation_number: str, fields: Optional[list[str]] = None) -> Optional[dict]:
+        row = await self._read(lambda db: db.execute(
+            "SELECT doc FROM bookings WHERE confirmation_number = ?", (confirmation_number,)
+        ).fetchone())
+        return self._public(loads(row[0]), fields=fields) if row else None
+
+    def _change(self, db, booking_id: int, doc: dict, changes: dict):
+        doc = {**doc, **changes}
+        db.execute(
+            "UPDATE bookings SET confirmation_number = ?, status = ?, created_at = ?, check_in = ?, doc = ? WHERE id = ?",
+            (doc["confirmation_number"], doc.get("status"), _iso(doc.get("created_at")), doc.get("check_in"), dumps(doc), booking_id),
+        )
+        if "name_keys" in changes:
+            self._set_name_keys(db, booking_id, doc["name_keys"] or [])
+
+    async def update(self, confirmation_number: str, changes: dict) -> bool:
+        def update(db):
+            row = db.execute("SELECT id, doc FROM bookings WHERE confirmation_number = ?", (confirmation_number,)).fetchone()
+            if row is None:
+                return False
+            self._change(db, row[0], loads(row[1]), changes)
+            return True
+        return await self._write(update)
+
+    def _transition(self, db, confirmation_number: str, from_statuses: list[str], changes: dict) -> Optional[dict]:
+        row = db.execute(
+            f"SELECT id, doc FROM bookings WHERE confirmation_number = ? AND status IN ({_marks(from_statuses)})",
+            (confirmation_number, *from_statuses),
+        ).fetchone()
+        if row is None:
+            return None
+        doc = loads(row[1])
+        self._change(db, row[0], doc, changes)
+        return doc
+
+    async def transition(
+        self, confirmation_number: str, from_statuses: list[str], changes: dict,
+        fields: Optional[list[str]] = None,
+    ) -> Optional[dict]:
+        before = await self._write(lambda db: self._transition(db, confirmation_number, from_statuses, changes))
+        return self._public(before, fields=fields) if before else None
+
+    async def transition_many(self, confirmation_numbers: list[str], from_statuses: list[str], changes: dict) -> int:
+        def transition_all(db):
+            return sum(
+                self._transition(db, number, from_statuses, changes) is not None
+                for number in confirmation_numbers
+            )
+        return await self._write(transition_all)
+
+    def parse_id(self, text: str) -> int:
+        return int(text)
+
+    async def page(
+        self,
+        status: Optional[str],
+        after: Optional[tuple[Optional[datetime], Any]],
+        limit: int,
+        fields: list[str],
+    ) -> list[dict]:
+        conditions, params = [], []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if after:
+            created_at, booking_id = after
+            if created_at is None:
+                # Bookings without created_at sort last; continue among them by id
+                conditions.append("created_at IS NULL AND id < ?")
+                params.append(booking_id)
+            else:
+                conditions.append("(created_at < ? OR (created_at = ? AND id < ?) OR created_at IS NULL)")
+                params += [_iso(created_at), _iso(created_at), booking_id]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        rows = await self._read(lambda db: db.execute(
+            f"SELECT id, doc FROM bookings {where} ORDER BY created_at DESC, id DESC LIMIT ?", [*params, limit]
+        ).fetchall())
+        page = []
+        for booking_id, text in rows:
+            doc = loads(text)
+            page.append({**{f: doc[f] for f in fields if f in doc}, "created_at": doc.get("created_at"), "_id": booking_id})
+        return page
+
+    async def stream(
+        self,
+        fields: list[str],
+        status: Optional[str] = None,
+        by: str = "created_at",
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[dict]:
+        conditions, params = [], []
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if by == "created_at":
+            if start:
+                conditions.append("created_at >= ?")
+                params.append(_iso(datetime.combine(start, datetime.min.time())))
+            if end:
+                conditions.append("created_at < ?")
+                params.append(_iso(datetime.combine(end + timedelta(days=1), datetime.min.time())))
+        else:
+            if start:
+                conditions.append("check_in >= ?")
+                params.append(start.isoformat())
+            if end:
+                conditions.append("check_in <= ?")
+                params.append(end.isoformat())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        # A read connection of its own: one snapshot for the whole export (WAL)
+        reader = await self._storage.run(lambda _: self._storage.connect())
+        try:
+            cursor = await self._storage.run(lambda _: reader.execute(
+                f"SELECT doc FROM bookings {where} ORDER BY created_at, id", params
+            ))
+            while True:
+                rows = await self._storage.run(lambda _: cursor.fetchmany(batch_size))
+                if not rows:
+                    break
+                for (text,) in rows:
+                    doc = loads(text)
+                    yield {f: doc[f] for f in fields if f in doc}
+        finally:
+            await self._storage.run(lambda _: reader.close())
+
+    async def find_by_name_keys(
+        self, keys: list[str], match_all: bool, status: Optional[str], limit: int,
+        fields: Optional[list[str]] = None,
+    ) -> list[dict]:
+        if not keys:
+            return []
+        having = "HAVING COUNT(*) = ?" if match_all else ""
+        status_filter = "AND b.status = ?" if status else ""
+        params = [*keys, *([len(keys)] if match_all else []), *([status] if status else []), limit]
+        rows = await self._read(lambda db: db.execute(
+            f"SELECT b.doc FROM bookings b WHERE b.id IN ("
+            f"SELECT booking_id FROM booking_name_keys WHERE name_key IN ({_marks(keys)}) GROUP BY booking_id {having}"
+            f") {status_filter} ORDER BY b.created_at DESC, b.id DESC LIMIT ?",
+            params,
+        ).fetchall())
+        wanted = fields and [*fields, "name_tokens"]
+        return [self._public(loads(text), hidden=("name_keys", "name_key_version"), fields=wanted) for (text,) in rows]
+
+    async def missing_name_index(self, version: int) -> AsyncIterator[tuple[Any, str]]:
+        rows = await self._read(lambda db: db.execute(
+            "SELECT id, doc FROM bookings WHERE json_extract(doc, '$.name_keys') IS NULL"
+            " OR IFNULL(json_extract(doc, '$.name_key_version'), 1) != ?",
+            (version,),
+        ).fetchall())
+        for booking_id, text in rows:
+            yield booking_id, loads(text).get("guest_name", "")
+
+    async def set_name_index(self, updates: list[tuple[Any, dict]]):
+        def set_name_index(db):
+            for booking_id, fields in updates:
+                row = db.execute("SELECT doc FROM bookings WHERE id = ?", (booking_id,)).fetchone()
+                if row is not None:
+                    self._change(db, booking_id, loads(row[0]), fields)
+        await self._write(set_name_index)
+
+
+class _SQLiteDocuments(_Repository):
+    """A table of JSON documents with integer ids and a few indexed columns."""
+
+    table = ""
+    columns: tuple[str, ...] = ()
+
+    async def insert(self, doc: dict) -> str:
+        columns = ", ".join((*self.columns, "doc"))
+        values = [*(doc.get(c) for c in self.columns), dumps(doc)]
+        cursor = await self._write(lambda db: db.execute(
+            f"INSERT INTO {self.table} ({columns}) VALUES ({_marks(values)})", values
+        ))
+        return str(cursor.lastrowid)
+
+    def _rows(self, where: str, params: list, suffix: str = "") -> Callable:
+        def rows(db):
+            found = db.execute(f"SELECT id, doc FROM {self.table} WHERE {where} {suffix}", params).fetchall()
+            return [dict(loads(text), id=str(doc_id)) for doc_id, text in found]
+        return rows
+
+    async def get(self, doc_id: str) -> Optional[dict]:
+        if not str(doc_id).isdigit():
+            return None
+        found = await self._read(self._rows("id = ?", [int(doc_id)]))
+        return found[0] if found else None
+
+    async def update(self, doc_id: str, changes: dict) -> bool:
+        if not str(doc_id).isdigit():
+            return False
+
+        def update(db):
+            row = db.execute(f"SELECT doc FROM {self.table} WHERE id = ?", (int(doc_id),)).fetchone()
+            if row is None:
+                return False
+            doc = {**loads(row[0]), **changes}
+            assignments = ", ".join(f"{c} = ?" for c in (*self.columns, "doc"))
+            db.execute(
+                f"UPDATE {self.table} SET {assignments} WHERE id = ?",
+                [*(doc.get(c) for c in self.columns), dumps(doc), int(doc_id)],
+            )
+            return True
+        return await self._write(update)
+
+
+class SQLiteGuests(_SQLiteDocuments, GuestRepository):
+
+    table = "guests"
+    columns = ("phone", "email")
+
+    async def find(self, phone: Optional[str] = None, email: Optional[str] = None) -> list[dict]:
+        conditions = [(f"{c} = ?", value) for c, value in (("phone", phone), ("email", email)) if value]
+        if not conditions:
+            return []
+        where = " OR ".join(condition for condition, _ in conditions)
+        return await self._read(self._rows(where, [value for _, value in conditions], "ORDER BY id LIMIT 20"))
+
+
+class SQLiteServiceRequests(_SQLiteDocuments, ServiceRequestRepository):
+
+    table = "service_requests"
+    columns = ("status",)
+
+    async def list_by_status(self, status: str, limit: int = 50) -> list[dict]:
+        return await self._read(self._rows("status = ?", [status], f"ORDER BY id LIMIT {int(limit)}"))
+
+
+class SQLiteIdempotency(_Repository, IdempotencyRepository):
+
+    async def claim(self, key: str, fingerprint: str, now: datetime, expires_at: datetime) -> Optional[dict]:
+        def claim(db):
+            db.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (_iso(now),))
+            row = db.execute("SELECT doc FROM idempotency_keys WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                return loads(row[0])
+            record = {"key": key, "fingerprint": fingerprint, "status": "pending", "response": None, "expires_at": expires_at}
+            db.execute(
+                "INSERT INTO idempotency_keys (key, expires_at, doc) VALUES (?, ?, ?)",
+                (key, _iso(expires_at), dumps(record)),
+            )
+            return None
+        return await self._write(claim)
+
+    async def complete(self, key: str, response: dict, expires_at: datetime):
+        def complete(db):
+            row = db.execute("SELECT doc FROM idempotency_keys WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                record = dict(loads(row[0]), status="done", response=response, expires_at=expires_at)
+                db.execute(
+                    "UPDATE idempotency_keys SET expires_at = ?, doc = ? WHERE key = ?",
+                    (_iso(expires_at), dumps(record), key),
+                )
+        await self._write(complete)
+
+    async def release(self, key: str):
+        def release(db):
+            row = db.execute("SELECT doc FROM idempotency_keys WHERE key = ?", (key,)).fetchone()
+            if row is not None and loads(row[0])["status"] == "pending":
+                db.execute("DELETE FROM idempotency_keys WHERE key = ?", (key,))
+        await self._write(release)
+
+
+class SQLiteStorage(StorageEngine):
+    """A SQLite database file (SQLITE_PATH) in WAL mode."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.bookings = SQLiteBookings(self)
+        self.room_types = SQLiteRoomTypes(self)
+        self.inventory = SQLiteInventory(self)
+        self.holds = SQLiteHolds(self)
+        self.guests = SQLiteGuests(self)
+        self.service_requests = SQLiteServiceRequests(self)
+        self.idempotency = SQLiteIdempotency(self)
+
+    def connect(self) -> sqlite3.Connection:
+        """A new connection to the file; transactions are opened explicitly."""
+        db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        db.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        return db
+
+    def _call(self, operation: Callable[[sqlite3.Connection], Any], write: bool):
+        if not write:
+            return operation(self._db)
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            result = operation(self._db)
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+        return result
+
+    async def run(self, operation: Callable[[sqlite3.Connection], Any], write: bool = False):
+        """Run operation(connection) on the database thread; writes in one transaction."""
+        if self._executor is None:
+            await self.open()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._call, operation, write)
+
+    def _open(self):
+        self._db = self.connect()
+        self._db.execute("PRAGMA journal_mode = WAL")
+        # Durable at checkpoints; a power cut can lose only the last transactions
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        for table in TABLES:
+            self._db.execute(table)
+
+    async def open(self):
+        if self._executor is not None:
+            return
+        # sqlite3 objects stay on the one thread that serializes every statement
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._open)
+        print(f"✅ Opened SQLite database: {self.path}")
+
+    async def close(self):
+        if self._executor is None:
+            return
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._db.close)
+        self._executor.shutdown()
+        self._db = self._executor = None
+
+    async def ensure_indexes(self) -> dict:
+        def ensure(db):
+            def index_names(table: str) -> list[str]:
+                return sorted(name for (name,) in db.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,)
+                ))
+
+            report = {}
+            for table, indexes in SQLITE_INDEXES.items():
+                existing = index_names(table)
+                created, failed = [], {}
+                for name, columns in indexes.items():
+                    if name in existing:
+                        continue
+                    try:
+                        db.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+                        created.append(name)
+                    except sqlite3.Error as e:
+                        failed[name] = str(e)
+
+                found = index_names(table)
+                report[table] = {
+                    "expected": sorted(indexes),
+                    "found": found,
+                    "missing": sorted(name for name in indexes if name not in found),
+                    "unexpected": [name for name in found if name not in indexes],
+                    "created": created,
+                    "conflicts": [],
+                    "failed": failed,
+                }
+            return report
+        return await self.run(ensure)
@@ -0,0 +1,326 @@
+"""
+Storage Engine - Repository Interface for the Reservation Data
+
+This file defines the repositories the routers and services use instead of Motor
+collections: bookings, room types, per-night room inventory, room holds, guests,
+service requests and idempotency keys. A storage engine bundles one implementation of
+each:
+
+- mongo (mongo_storage.py): MongoDB through Motor, the production engine
+- memory (memory_storage.py): Python dictionaries with secondary indexes, for tests,
+  benchmarks and load tests without a database server
+- sqlite (sqlite_storage.py): a SQLite file in WAL mode, for single-node hotels
+
+Set STORAGE_ENGINE to 'mongo' (default), 'memory' or 'sqlite' to choose.
+Repository methods are domain operations (reserve these nights, confirm this hold),
+so each engine implements them with its own atomic primitives.
+"""
+
+import os
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any, AsyncContextManager, AsyncIterator, Optional
+
+STORAGE_ENGINE = os.getenv("STORAGE_ENGINE", "mongo").lower()
+
+
+class DuplicateKeyError(Exception):
+    """A document with the same unique key (e.g. confirmation number) already exists."""
+
+
+class RoomTypeRepository(ABC):
+    """The room type catalog (room_types), keyed by code."""
+
+    @abstractmethod
+    async def list_all(self) -> list[dict]:
+        """Every room type."""
+
+    @abstractmethod
+    async def seed(self, room_types: list[dict]) -> int:
+        """Store the room types whose code is missing, never overwriting; returns how many."""
+
+    @abstractmethod
+    async def update(self, code: str, changes: dict) -> bool:
+        """Set fields on a room type; False when the code doesn't exist."""
+
+    def watch(self) -> Optional[AsyncContextManager[AsyncIterator[str]]]:
+        """
+        Async context manager over the operation types ('insert', 'update', ...) of
+        changes made by any process, or None when the engine has no cross-process
+        change notification.
+        """
+        return None
+
+
+class InventoryRepository(ABC):
+    """Per-night booked counters per room type (room_inventory), with the holds on each."""
+
+    @abstractmethod
+    async def booked_counts(self, codes: list[str], nights: list[str]) -> dict[str, int]:
+        """Highest number of rooms booked on any of the nights, per room type code."""
+
+    @abstractmethod
+    async def booked_by_night(self, codes: list[str], first_night: str, last_night: str) -> list[tuple[str, str, int]]:
+        """(code, night, booked) for every stored counter in the night range, inclusive."""
+
+    @abstractmethod
+    async def adjust(self, code: str, nights: list[str], delta: int):
+        """Add delta to the booked counter on each night, creating missing counters."""
+
+    @abstractmethod
+    async def ensure(self, code: str, nights: list[str]) -> int:
+        """Create missing counters for the nights; returns how many were created."""
+
+    @abstractmethod
+    async def take(self, code: str, nights: list[str], total_rooms: int, hold_id: str) -> int:
+        """
+        Add one booked room under hold_id on each of the nights that has a counter, is
+        below total_rooms and isn't already held by hold_id; returns how many nights.
+        """
+
+    @abstractmethod
+    async def release(self, code: str, nights: list[str], hold_id: str) -> int:
+        """Give back the nights taken under hold_id; returns how many."""
+
+
+class HoldRepository(ABC):
+    """Short-lived room reservations awaiting a booking (room_holds)."""
+
+    @abstractmethod
+    async def insert(self, hold: dict):
+        ...
+
+    # Transitions return the hold's code, nights and hold_id; other fields may show
+    # the state before or after the change depending on the engine
+
+    @abstractmethod
+    async def confirm(self, hold_id: str, now: datetime) -> Optional[dict]:
+        """Mark a live (held, unexpired) hold confirmed and return it; None otherwise."""
+
+    @abstractmethod
+    async def release(self, hold_id: str) -> Optional[dict]:
+        """Mark a held hold released and return it; None when it isn't held."""
+
+    @abstractmethod
+    async def claim_expired(self, now: datetime) -> Optional[dict]:
+        """Mark one held hold past its expiry as expired and return it; None when there are none."""
+
+
+class BookingRepository(ABC):
+    """Reservations (bookings), keyed by confirmation number."""
+
+    @abstractmethod
+    async def insert(self, booking: dict):
+        """Store a booking. Raises DuplicateKeyError for a confirmation number in use."""
+
+    @abstractmethod
+    async def get(self, confirmation_number: str, fields: Optional[list[str]] = None) -> Optional[dict]:
+        """A booking without storage ids or the name index; only the fields when given."""
+
+    @abstractmethod
+    async def update(self, confirmation_number: str, changes: dict) -> bool:
+        """Set fields on a booking; False when it doesn't exist."""
+
+    @abstractmethod
+    async def transition(
+        self, confirmation_number: str, from_statuses: list[str], changes: dict,
+        fields: Optional[list[str]] = None,
+    ) -> Optional[dict]:
+        """
+        Set changes on the booking only while its status is one of from_statuses, as one
+        atomic step; the booking as it was before (only the fields when given), or None
+        when it doesn't exist or is in another status.
+        """
+
+    @abstractmethod
+    async def transition_many(self, confirmation_numbers: list[str], from_statuses: list[str], changes: dict) -> int:
+        """transition() for many bookings in one batch; returns how many changed."""
+
+    @abstractmethod
+    def parse_id(self, text: str) -> Any:
+        """A booking id from its string form (as kept in page cursors). Raises ValueError."""
+
+    @abstractmethod
+    async def page(
+        self,
+        status: Optional[str],
+        after: Optional[tuple[Optional[datetime], Any]],
+        limit: int,
+        fields: list[str],
+    ) -> list[dict]:
+        """
+        Up to limit bookings ordered by (created_at, _id) newest first, starting after
+        the (created_at, _id) position when given. Each has the fields plus created_at
+        and _id; bookings without created_at come last.
+        """
+
+    @abstractmethod
+    def stream(
+        self,
+        fields: list[str],
+        status: Optional[str] = None,
+        by: str = "created_at",
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[dict]:
+        """
+        Bookings made (by='created_at') or arriving (by='check_in') from start to end
+        inclusive, oldest first, with only the fields; read batch_size at a time.
+        """
+
+    @abstractmethod
+    async def find_by_name_keys(
+        self, keys: list[str], match_all: bool, status: Optional[str], limit: int,
+        fields: Optional[list[str]] = None,
+    ) -> list[dict]:
+        """
+        Newest bookings having all (or any) of the phonetic name keys, with name_tokens
+        and without storage ids; only the fields (and name_tokens) when given.
+        """
+
+    @abstractmethod
+    def missing_name_index(self, version: int) -> AsyncIterator[tuple[Any, str]]:
+        """
+        (_id, guest_name) of bookings stored without name_tokens/name_keys, or with
+        keys from another name_key_version (none stored counts as version 1).
+        """
+
+    @abstractmethod
+    async def set_name_index(self, updates: list[tuple[Any, dict]]):
+        """Store name_tokens, name_keys and name_key_version for bookings by _id."""
+
+
+class GuestRepository(ABC):
+    """Guest profiles (guests)."""
+
+    @abstractmethod
+    async def insert(self, guest: dict) -> str:
+        """Store a guest profile; returns its id."""
+
+    @abstractmethod
+    async def get(self, guest_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def find(self, phone: Optional[str] = None, email: Optional[str] = None) -> list[dict]:
+        """Guests with the phone number or email address."""
+
+    @abstractmethod
+    async def update(self, guest_id: str, changes: dict) -> bool:
+        ...
+
+
+class ServiceRequestRepository(ABC):
+    """In-stay service requests (service_requests)."""
+
+    @abstractmethod
+    async def insert(self, request: dict) -> str:
+        """Store a service request; returns its id."""
+
+    @abstractmethod
+    async def get(self, request_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def update(self, request_id: str, changes: dict) -> bool:
+        ...
+
+    @abstractmethod
+    async def list_by_status(self, status: str, limit: int = 50) -> list[dict]:
+        """Requests with the status, oldest first (the staff work queue)."""
+
+
+class IdempotencyRepository(ABC):
+    """Request keys already seen (idempotency_keys) and their responses, kept until they expire."""
+
+    @abstractmethod
+    async def claim(self, key: str, fingerprint: str, now: datetime, expires_at: datetime) -> Optional[dict]:
+        """
+        Record the key as pending until expires_at unless an unexpired record has it.
+        Returns that record (key, fingerprint, status 'pending' or 'done', response), or
+        None when this call claimed the key.
+        """
+
+    @abstractmethod
+    async def complete(self, key: str, response: dict, expires_at: datetime):
+        """Store the response for a claimed key and keep it until expires_at."""
+
+    @abstractmethod
+    async def release(self, key: str):
+        """Forget a pending key whose request failed, so a retry can run it again."""
+
+
+class StorageEngine:
+    """One implementation of every repository."""
+
+    name = "base"
+
+    bookings: BookingRepository
+    room_types: RoomTypeRepository
+    inventory: InventoryRepository
+    holds: HoldRepository
+    guests: GuestRepository
+    service_requests: ServiceRequestRepository
+    idempotency: IdempotencyRepository
+
+    async def open(self):
+        """Connect, or create the schema."""
+
+    async def close(self):
+        """Release connections and files."""
+
+    async def ensure_indexes(self) -> dict:
+        """
+        Build missing indexes and report, per collection or table, the index names
+        expected, found, missing, unexpected, created, in conflict and failed.
+        """
+        return {}
+
+
+def create_storage(name: str = STORAGE_ENGINE) -> StorageEngine:
+    """A new storage engine by name."""
+    if name == "mongo":
+        from backend.database.mongo_storage import MongoStorage
+        return MongoStorage()
+    if name == "memory":
+        from backend.database.memory_storage import MemoryStorage
+        return MemoryStorage()
+    if name == "sqlite":
+        from backend.database.sqlite_storage import SQLiteStorage
+        return SQLiteStorage()
+    raise ValueError(f"Unknown STORAGE_ENGINE '{name}' (use 'mongo', 'memory' or 'sqlite')")
+
+
+# Storage engine for this process
+_storage: Optional[StorageEngine] = None
+
+
+def get_storage() -> StorageEngine:
+    """Get the engine selected by STORAGE_ENGINE, creating it on first use."""
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+        print(f"Storage engine: {_storage.name}")
+    return _storage
+
+
+def set_storage(storage: StorageEngine):
+    """Use a specific storage engine for this process (tests, benchmarks)."""
+    global _storage
+    _storage = storage
+
+
+async def open_storage() -> StorageEngine:
+    """Open the process's storage engine."""
+    storage = get_storage()
+    await storage.open()
+    return storage
+
+
+async def close_storage():
+    """Close the process's storage engine."""
+    global _storage
+    if _storage is not None:
+        await _storage.close()
+        _storage = None
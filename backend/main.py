@@ -2,26 +2,66 @@
 RoomiAI - FastAPI Backend Server
 
 This is the main FastAPI application that provides REST API endpoints for the
-hotel reservation system. It connects to MongoDB for data storage and is used
-by both the voice agent and any external applications.
+hotel reservation system. It stores data through the storage engine chosen by
+STORAGE_ENGINE (MongoDB by default) and is used by both the voice agent and any
+external applications.
 """
 
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from backend.database.connection import connect_to_mongodb, close_mongodb_connection
+from backend.database.storage import close_storage, get_storage, open_storage
 from backend.routers import booking, rooms
+from backend.routers.responses import FastJSONResponse
+from backend.services.catalog_service import seed_room_types, watch_catalog_changes
+from backend.services.name_search import backfill_name_index
+from backend.services.room_service import run_hold_sweeper
+
+
+async def bootstrap_database():
+    """Create the required indexes, seed the room type catalog and report what was found."""
+    report = await get_storage().ensure_indexes()
+    for collection, indexes in report.items():
+        status = "ok" if not (indexes["missing"] or indexes["conflicts"]) else "INCOMPLETE"
+        print(f"Indexes on {collection}: {status} - expected {indexes['expected']}, found {indexes['found']}")
+        if indexes["created"]:
+            print(f"  created: {indexes['created']}")
+        if indexes["unexpected"]:
+            print(f"  not required: {indexes['unexpected']}")
+        if indexes["conflicts"]:
+            print(f"  ⚠️ same keys, different uniqueness: {indexes['conflicts']}")
+        for name, error in indexes["failed"].items():
+            print(f"  ❌ {name} could not be built: {error}")
+
+    seeded = await seed_room_types()
+    if seeded:
+        print(f"Seeded {seeded} default room type(s)")
+
+    # Bookings stored before the phonetic name index, or keyed by older rules, need new name keys
+    backfilled = await backfill_name_index()
+    if backfilled:
+        print(f"Added name keys to {backfilled} booking(s)")
 
 
 # Lifespan handler for startup/shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    await connect_to_mongodb()
+    await open_storage()
+    # Indexes and seed data are set up here, never on the request path
+    await bootstrap_database()
+    # Release room holds left behind by callers who hung up
+    hold_sweeper = asyncio.create_task(run_hold_sweeper())
+    # Drop the cached room type catalog when room_types changes
+    catalog_watcher = asyncio.create_task(watch_catalog_changes())
     yield
     # Shutdown
-    await close_mongodb_connection()
+    hold_sweeper.cancel()
+    catalog_watcher.cancel()
+    await close_storage()
 
 
 # Create FastAPI app
@@ -29,7 +69,9 @@ app = FastAPI(
     title="RoomiAI - Hotel Reservation API",
     description="REST API for hotel room reservations and guest services",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson encoding for every route; hot reads also skip re-validation (trusted_response)
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -41,6 +41,14 @@ class RoomTypeModel(BaseModel):
     amenities: List[str]
 
 
+class RoomTypeUpdate(BaseModel):
+    rate: Optional[float] = None
+    description: Optional[str] = None
+    max_guests: Optional[int] = None
+    amenities: Optional[List[str]] = None
+    total_rooms: Optional[int] = None
+
+
 class AvailabilityRequest(BaseModel):
     check_in: str
     check_out: str
@@ -88,6 +96,7 @@ class BookingCreate(BaseModel):
     email: str
     guests: str = "2"
     special_requests: str = ""
+    hold_id: Optional[str] = None
 
 
 class BookingResponse(BaseModel):
@@ -122,6 +131,8 @@ class BookingInDB(BaseModel):
     grand_total: float
     special_requests: str
     status: str
+    room_code: Optional[str] = None
+    hold_id: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
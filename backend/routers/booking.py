@@ -1,17 +1,52 @@
 """
 Booking API Routes - FastAPI Endpoints for Reservation Operations
 
-POST /bookings - Create a new reservation
+POST /bookings - Create a new reservation (Idempotency-Key: repeats get the first response)
 GET /bookings/{confirmation_number} - Retrieve booking details
 DELETE /bookings/{confirmation_number} - Cancel a booking
+POST /bookings/{confirmation_number}/check-in - Check a guest in
+POST /bookings/{confirmation_number}/check-out - Check a guest out
+POST /bookings/sweeps/check-in - Check in the day's arrivals (morning sweep)
+POST /bookings/sweeps/check-out - Check out the day's departures (night audit)
+GET /bookings/ - List bookings a page at a time (keyset cursor)
+GET /bookings/export - Stream bookings as NDJSON or CSV
 """
 
-from fastapi import APIRouter, HTTPException
-from datetime import datetime
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from datetime import date, datetime
 import random
 import string
+from typing import Annotated, Optional
 
-from backend.database.connection import get_bookings_collection
+from backend.database.storage import DuplicateKeyError, get_storage
+from backend.routers.responses import trusted_response
+from backend.services.booking_service import (
+    BOOKING_FIELDS,
+    EXPORT_FORMATS,
+    LIST_FIELDS,
+    InvalidTransition,
+    check_in_arrivals,
+    check_out_departures,
+    export_bookings,
+    export_query,
+    list_bookings_page,
+    parse_fields,
+    transition_booking
+)
+from backend.services.idempotency import IdempotencyInProgress, IdempotencyKeyReused, booking_identity, run_once
+from backend.services.name_search import name_index_fields, search_bookings_by_name
+from backend.services.pricing_service import get_pricing_engine
+from backend.services.room_service import (
+    adjust_inventory,
+    confirm_hold,
+    get_room_type_catalog,
+    normalize_stay,
+    release_inventory,
+    reserve_inventory,
+    resolve_room_type,
+    stay_nights
+)
 from backend.models.booking import (
     BookingCreate,
     BookingResponse,
@@ -22,44 +57,106 @@ from backend.models.booking import (
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
-# Room rates
-ROOM_RATES = {
-    "standard": 120,
-    "deluxe": 150,
-    "suite": 220,
-    "executive": 350,
-    "family": 250
-}
+# Confirmation numbers drawn before giving up on a unique one
+CONFIRMATION_NUMBER_ATTEMPTS = 5
+
+# What cancelling reads from the booking: the stay to give back
+CANCEL_FIELDS = ["room_code", "check_in", "check_out", "hold_id"]
+
+# What checking in or out reads from the booking
+STAY_FIELDS = ["guest_name", "room_type", "check_in", "check_out"]
+
+
+def _new_confirmation_number() -> str:
+    random_suffix = ''.join(random.choices(string.digits, k=4))
+    date_part = datetime.now().strftime("%Y%m%d")
+    return f"ROOMI-{date_part}-{random_suffix}"
+
+
+async def _reserve_room(hold_id: Optional[str], room: dict, stay: list[str], confirmation_number: str) -> str:
+    """Reserve the room for the stay and return the hold id the booking keeps it under."""
+    if hold_id:
+        hold = await confirm_hold(hold_id)
+        if hold is None:
+            raise HTTPException(status_code=409, detail="The room hold has expired or was already used. Please check availability again.")
+        if hold["code"] == room["code"] and hold["nights"] == stay:
+            return hold_id
+        # The guest changed the room or dates since the hold was placed
+        await release_inventory(hold["code"], hold["nights"], hold_id)
+    
+    if not await reserve_inventory(room["code"], stay, room.get("total_rooms", 0), confirmation_number):
+        raise HTTPException(status_code=409, detail=f"No {room['type']} available for those dates")
+    return confirmation_number
 
 
 @router.post("/", response_model=BookingResponse)
-async def create_booking(booking: BookingCreate):
-    """Create a new room reservation."""
+async def create_booking(booking: BookingCreate, idempotency_key: Annotated[Optional[str], Header()] = None):
+    """Create a new room reservation; a repeat with the same Idempotency-Key returns the first booking."""
+    
+    if not idempotency_key:
+        return trusted_response(await _create_booking(booking))
+    
+    try:
+        identity = booking_identity(booking.model_dump(), await get_room_type_catalog())
+        response, replayed = await run_once(
+            f"create_booking:{idempotency_key}", identity, lambda: _create_booking(booking)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    return trusted_response(response, headers={"Idempotent-Replayed": "true"} if replayed else None)
+
+
+async def _create_booking(booking: BookingCreate) -> dict:
+    """Reserve the room, price the stay and store the booking; the BookingResponse body."""
     
     # Generate confirmation number
-    random_suffix = ''.join(random.choices(string.digits, k=4))
-    date_part = datetime.now().strftime("%Y%m%d")
-    confirmation_number = f"ROOMI-{date_part}-{random_suffix}"
+    confirmation_number = _new_confirmation_number()
+    
+    # Normalize the stay and match the room type to the catalog
+    try:
+        arrival, departure = normalize_stay(booking.check_in, booking.check_out)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    catalog = await get_room_type_catalog()
+    room = resolve_room_type(booking.room_type, catalog)
+    if room is None:
+        raise HTTPException(status_code=400, detail=f"Unknown room type '{booking.room_type}'")
+    
+    stay = stay_nights(arrival, departure)
     
-    # Calculate pricing
-    rate_per_night = ROOM_RATES.get(booking.room_type.lower(), 150)
-    nights = 5  # TODO: Calculate from actual dates
-    room_total = rate_per_night * nights
-    taxes = round(room_total * 0.125, 2)
-    grand_total = room_total + taxes
+    # Take the room on every night atomically, or use the caller's live hold
+    hold_id = await _reserve_room(booking.hold_id, room, stay, confirmation_number)
+    
+    # Price the stay from the rate calendar
+    quote = get_pricing_engine(catalog).quote(room["code"], arrival, departure)
+    rate_per_night = quote["rate_per_night"]
+    nights = quote["nights"]
+    room_total = quote["room_total"]
+    taxes = quote["taxes"]
+    grand_total = quote["grand_total"]
     
     # Create booking document
     booking_doc = {
         "confirmation_number": confirmation_number,
         "guest_name": booking.guest_name,
+        **name_index_fields(booking.guest_name),
         "email": booking.email,
         "phone": booking.phone,
-        "check_in": booking.check_in,
-        "check_out": booking.check_out,
+        "check_in": arrival.isoformat(),
+        "check_out": departure.isoformat(),
         "nights": nights,
         "room_type": booking.room_type,
+        "room_code": room["code"],
+        "hold_id": hold_id,
         "guests": booking.guests,
         "rate_per_night": rate_per_night,
+        "discount": quote["discount"],
         "room_total": room_total,
         "taxes": taxes,
         "grand_total": grand_total,
@@ -69,16 +166,28 @@ async def create_booking(booking: BookingCreate):
         "updated_at": datetime.utcnow()
     }
     
-    # Save to MongoDB
-    collection = get_bookings_collection()
-    await collection.insert_one(booking_doc)
+    # Save the booking, giving the room back if it can't be stored
+    bookings = get_storage().bookings
+    try:
+        for attempt in range(CONFIRMATION_NUMBER_ATTEMPTS):
+            try:
+                await bookings.insert(booking_doc)
+                break
+            except DuplicateKeyError:
+                # The unique index caught a number already issued; draw another
+                if attempt == CONFIRMATION_NUMBER_ATTEMPTS - 1:
+                    raise
+                booking_doc["confirmation_number"] = confirmation_number = _new_confirmation_number()
+    except Exception:
+        await release_inventory(room["code"], stay, hold_id)
+        raise
     
     return BookingResponse(
         success=True,
         confirmation_number=confirmation_number,
         guest_name=booking.guest_name,
-        check_in=booking.check_in,
-        check_out=booking.check_out,
+        check_in=booking_doc["check_in"],
+        check_out=booking_doc["check_out"],
         nights=nights,
         room_type=booking.room_type,
         rate_per_night=rate_per_night,
@@ -87,6 +196,36 @@ async def create_booking(booking: BookingCreate):
         grand_total=grand_total,
         status="confirmed",
         message=f"Booking confirmed! Confirmation number is {confirmation_number}"
+    ).model_dump()
+
+
+@router.get("/export")
+async def export_bookings_dump(
+    format: str = "ndjson",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    status: Optional[str] = None,
+    by: str = "created_at",
+    fields: str = ""
+):
+    """
+    Stream bookings made (or, with by=check_in, arriving) from start to end inclusive
+    as NDJSON or CSV, oldest first, for the night audit.
+    """
+    
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Export format must be 'ndjson' or 'csv'")
+    try:
+        columns = parse_fields(fields, BOOKING_FIELDS)
+        query = export_query(start, end, status, by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    period = "-".join(d.isoformat() for d in (start, end) if d) or "all"
+    return StreamingResponse(
+        export_bookings(query, columns, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="bookings-{period}.{format}"'}
     )
 
 
@@ -94,95 +233,131 @@ async def create_booking(booking: BookingCreate):
 async def get_booking(confirmation_number: str):
     """Retrieve booking details by confirmation number."""
     
-    collection = get_bookings_collection()
-    booking = await collection.find_one({"confirmation_number": confirmation_number})
+    booking = await get_storage().bookings.get(confirmation_number, BOOKING_FIELDS)
     
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
     
-    # Remove MongoDB _id field
-    booking.pop("_id", None)
-    
-    return {
+    return trusted_response({
         "found": True,
         "booking": booking
-    }
+    })
 
 
 @router.get("/search/by-name")
 async def search_booking_by_name(guest_name: str):
-    """Search bookings by guest name."""
+    """Search bookings by guest name, tolerating misheard spellings; best match first."""
     
-    collection = get_bookings_collection()
-    cursor = collection.find({"guest_name": {"$regex": guest_name, "$options": "i"}})
-    bookings = await cursor.to_list(length=10)
+    # Phonetic index lookup, re-ranked by spelling ("Jon Smyth" finds John Smith)
+    bookings = await search_bookings_by_name(guest_name, limit=10, fields=BOOKING_FIELDS)
     
-    # Remove MongoDB _id fields
-    for booking in bookings:
-        booking.pop("_id", None)
-    
-    return {
+    return trusted_response({
         "found": len(bookings) > 0,
         "count": len(bookings),
         "bookings": bookings
-    }
+    })
 
 
 @router.delete("/{confirmation_number}")
 async def cancel_booking(confirmation_number: str, reason: str = ""):
     """Cancel an existing booking."""
     
-    collection = get_bookings_collection()
+    cancellation_ref = f"CXL-{confirmation_number}"
     
-    # Find the booking
-    booking = await collection.find_one({"confirmation_number": confirmation_number})
+    # Cancel in one write, only if the booking is still pending or confirmed
+    try:
+        booking = await transition_booking(
+            confirmation_number,
+            "cancelled",
+            {"cancellation_reference": cancellation_ref, "cancellation_reason": reason},
+            CANCEL_FIELDS
+        )
+    except InvalidTransition as e:
+        if e.current != "cancelled":
+            raise HTTPException(status_code=409, detail=str(e))
+        # Cancelled before: same answer, and the room was given back then
+        booking = {}
     
-    if not booking:
+    if booking is None:
         raise HTTPException(status_code=404, detail="Booking not found")
     
-    # Update status to cancelled
-    cancellation_ref = f"CXL-{confirmation_number}"
-    
-    await collection.update_one(
-        {"confirmation_number": confirmation_number},
-        {
-            "$set": {
-                "status": "cancelled",
-                "cancellation_reference": cancellation_ref,
-                "cancellation_reason": reason,
-                "cancelled_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
-        }
-    )
+    # Free the room on each night of the stay (bookings made before the
+    # inventory counters existed have no room_code and were never counted)
+    if booking.get("room_code"):
+        stay = stay_nights(date.fromisoformat(booking["check_in"]), date.fromisoformat(booking["check_out"]))
+        if booking.get("hold_id"):
+            await release_inventory(booking["room_code"], stay, booking["hold_id"])
+        else:
+            await adjust_inventory(booking["room_code"], stay, -1)
     
-    return CancelBookingResponse(
+    return trusted_response(CancelBookingResponse(
         success=True,
         confirmation_number=confirmation_number,
         cancellation_reference=cancellation_ref,
         refund_eligible=True,
         message=f"Booking cancelled. Reference: {cancellation_ref}. Full refund in 5-7 business days."
-    )
+    ))
 
 
-@router.get("/")
-async def list_bookings(status: str = None, limit: int = 20):
-    """List all bookings with optional status filter."""
-    
-    collection = get_bookings_collection()
-    
-    query = {}
-    if status:
-        query["status"] = status
+@router.post("/sweeps/check-in")
+async def check_in_sweep(day: Optional[date] = None):
+    """Check in every confirmed booking arriving on day (default today)."""
+    return trusted_response(await check_in_arrivals(day or date.today()))
+
+
+@router.post("/sweeps/check-out")
+async def check_out_sweep(day: Optional[date] = None):
+    """Check out every checked-in booking leaving on or before day (default today)."""
+    return trusted_response(await check_out_departures(day or date.today()))
+
+
+async def _move_booking(confirmation_number: str, status: str) -> dict:
+    """Move one booking to status; 404 when it doesn't exist, 409 when its status doesn't allow it."""
+    try:
+        booking = await transition_booking(confirmation_number, status, fields=STAY_FIELDS)
+    except InvalidTransition as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if booking is None:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return booking
+
+
+@router.post("/{confirmation_number}/check-in")
+async def check_in_booking(confirmation_number: str):
+    """Check a confirmed booking's guest in."""
     
-    cursor = collection.find(query).sort("created_at", -1).limit(limit)
-    bookings = await cursor.to_list(length=limit)
+    booking = await _move_booking(confirmation_number, "checked_in")
+    return trusted_response({
+        "success": True,
+        "confirmation_number": confirmation_number,
+        "status": "checked_in",
+        "message": f"{booking.get('guest_name', 'The guest')} is checked in to a {booking.get('room_type', 'room')} "
+                   f"until {booking.get('check_out')}."
+    })
+
+
+@router.post("/{confirmation_number}/check-out")
+async def check_out_booking(confirmation_number: str):
+    """Check a checked-in booking's guest out."""
     
-    # Remove MongoDB _id fields
-    for booking in bookings:
-        booking.pop("_id", None)
+    booking = await _move_booking(confirmation_number, "checked_out")
+    return trusted_response({
+        "success": True,
+        "confirmation_number": confirmation_number,
+        "status": "checked_out",
+        "message": f"{booking.get('guest_name', 'The guest')} is checked out."
+    })
+
+
+@router.get("/")
+async def list_bookings(status: str = None, limit: int = 20, cursor: str = None, fields: str = ""):
+    """
+    List bookings, newest first, with optional status filter. Pass the returned
+    next_cursor to get the following page; fields picks the columns returned.
+    """
     
-    return {
-        "count": len(bookings),
-        "bookings": bookings
-    }
+    try:
+        page = await list_bookings_page(status, limit, cursor, parse_fields(fields, LIST_FIELDS))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return trusted_response(page)
@@ -0,0 +1,56 @@
+"""
+Fast JSON Responses - Encoding Response Bodies Without the Default JSON Encoder
+
+This file contains the response class the API uses by default. It encodes with
+orjson, which writes datetimes and dates natively (as ISO 8601, like FastAPI's own
+encoder), and falls back to the standard json module when orjson is not installed.
+
+Handlers that return data the backend built itself (read from storage with a
+projection, or computed by a service) wrap it in trusted_response(). A Response
+returned from a handler is sent as it is, so FastAPI skips re-validating it against
+the response model and walking it with jsonable_encoder; only the encoding is left.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _encode(value: Any) -> Any:
+    """Values neither encoder handles natively (ObjectId, Decimal, models)."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if hasattr(value, "item"):
+        # numpy scalars
+        return value.item()
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON bytes for a response body."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_encode, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False, default=_encode).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def trusted_response(content: Any, status_code: int = 200, headers: Optional[dict] = None) -> FastJSONResponse:
+    """Send content as JSON without response-model validation; only for data the backend built."""
+    if hasattr(content, "model_dump"):
+        content = content.model_dump()
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
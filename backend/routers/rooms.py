@@ -1,100 +1,61 @@
 """
 Room API Routes - FastAPI Endpoints for Room Operations
 
-GET /rooms/types - List all room types with amenities and pricing
+GET /rooms/types - List all room types with amenities and pricing (ETag, 304 when unchanged)
+PATCH /rooms/types/{code} - Update a room type and invalidate the cached catalog
+GET /rooms/cache-stats - Catalog cache hit/miss counters
 GET /rooms/availability - Check room availability for specific dates
+GET /rooms/flexible-search - Cheapest or earliest N-night stays over a date horizon
+POST /rooms/holds - Hold a room while the caller gives their details
+DELETE /rooms/holds/{hold_id} - Release a hold
+GET /rooms/info - General hotel information (ETag, 304 when unchanged)
 """
 
-from fastapi import APIRouter
-from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Response
+from typing import Annotated, Optional
 
-from backend.database.connection import get_room_types_collection, get_rooms_collection
+from backend.database.storage import get_storage
+from backend.models.booking import RoomTypeUpdate
+from backend.routers.responses import trusted_response
+from backend.services import catalog_service, room_service
 
 router = APIRouter(prefix="/rooms", tags=["Rooms"])
 
-# Sample room type data (will be used if DB is empty)
-DEFAULT_ROOM_TYPES = [
-    {
-        "type": "Standard Room",
-        "code": "STD",
-        "rate": 120,
-        "description": "Comfortable room with modern amenities, 300 sq ft",
-        "max_guests": 3,
-        "amenities": ["WiFi", "TV", "Safe", "Coffee Maker"],
-        "total_rooms": 20
-    },
-    {
-        "type": "Deluxe Room",
-        "code": "DLX",
-        "rate": 150,
-        "description": "Spacious room with premium views, 400 sq ft",
-        "max_guests": 3,
-        "amenities": ["WiFi", "TV", "Safe", "Coffee Maker", "Bathrobe", "Work Desk"],
-        "total_rooms": 20
-    },
-    {
-        "type": "Junior Suite",
-        "code": "STE-J",
-        "rate": 220,
-        "description": "Luxurious suite with separate living area, 550 sq ft",
-        "max_guests": 3,
-        "amenities": ["WiFi", "TV", "Safe", "Living Area", "Mini Bar"],
-        "total_rooms": 6
-    },
-    {
-        "type": "Executive Suite",
-        "code": "STE-E",
-        "rate": 350,
-        "description": "Premium suite with panoramic city views, 800 sq ft",
-        "max_guests": 4,
-        "amenities": ["WiFi", "TV", "Safe", "Living Area", "Dining Table", "Kitchenette"],
-        "total_rooms": 3
-    },
-    {
-        "type": "Family Room",
-        "code": "FAM",
-        "rate": 250,
-        "description": "Large room perfect for families, 600 sq ft",
-        "max_guests": 5,
-        "amenities": ["WiFi", "TV", "Safe", "Extra Beds", "Kids Pack"],
-        "total_rooms": 1
-    }
-]
-
 
 @router.get("/types")
-async def get_room_types(filter_type: str = "all"):
-    """Get all available room types with descriptions and pricing."""
+async def get_room_types(filter_type: str = "all", if_none_match: Annotated[Optional[str], Header()] = None):
+    """Get all available room types with descriptions and pricing (cached, with ETag)."""
     
-    collection = get_room_types_collection()
+    body, etag = await catalog_service.get_room_types_response(filter_type)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
     
-    # Check if room types exist in DB, if not use defaults
-    count = await collection.count_documents({})
+    # The client already has this version of the catalog
+    if catalog_service.etag_matches(if_none_match, etag):
+        catalog_service.record_not_modified()
+        return Response(status_code=304, headers=headers)
     
-    if count == 0:
-        # Insert default room types
-        await collection.insert_many(DEFAULT_ROOM_TYPES)
-        room_types = DEFAULT_ROOM_TYPES
-    else:
-        cursor = collection.find({})
-        room_types = await cursor.to_list(length=100)
-        # Remove MongoDB _id fields
-        for room in room_types:
-            room.pop("_id", None)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.patch("/types/{code}")
+async def update_room_type(code: str, update: RoomTypeUpdate):
+    """Change a room type's rate, description, capacity, amenities or room count."""
     
-    # Apply filter
-    if filter_type.lower() == "budget":
-        room_types = [r for r in room_types if r["rate"] <= 150]
-    elif filter_type.lower() == "premium":
-        room_types = [r for r in room_types if r["rate"] > 150]
+    changes = update.model_dump(exclude_none=True)
+    if not changes:
+        raise HTTPException(status_code=400, detail="No changes given")
     
-    rates_message = ", ".join([f"{r['type']} at ${r['rate']}" for r in room_types])
+    if not await get_storage().room_types.update(code.upper(), changes):
+        raise HTTPException(status_code=404, detail=f"Room type '{code}' not found")
     
-    return {
-        "room_types": room_types,
-        "count": len(room_types),
-        "message": f"We have {rates_message} per night."
-    }
+    catalog_service.invalidate_catalog(f"{code.upper()} updated")
+    return {"success": True, "code": code.upper(), "updated": sorted(changes)}
+
+
+@router.get("/cache-stats")
+async def get_catalog_cache_stats():
+    """Catalog cache hit/miss counters."""
+    return catalog_service.catalog_cache_stats()
 
 
 @router.get("/availability")
@@ -104,77 +65,134 @@ async def check_availability(
     room_type: str = "any",
     guests: str = "2"
 ):
-    """Check room availability for given dates."""
+    """Check room availability for given dates against the per-night inventory."""
     
-    # TODO: Implement actual availability logic based on bookings
-    # For now, return all room types as available
+    try:
+        party_size = max(1, int(guests))
+    except ValueError:
+        party_size = 2
     
-    collection = get_room_types_collection()
+    try:
+        result = await room_service.check_availability(check_in, check_out, room_type, party_size)
+    except ValueError as e:
+        # Answered as a normal result so the agent can ask the guest again
+        return {
+            "available": False,
+            "check_in": check_in,
+            "check_out": check_out,
+            "rooms": [],
+            "message": f"{e}. Could you tell me the dates again?"
+        }
     
-    if room_type.lower() == "any":
-        cursor = collection.find({})
+    arrival, departure = result.pop("spoken_check_in"), result.pop("spoken_check_out")
+    if result["rooms"]:
+        message = f"We have rooms available from {arrival} to {departure}."
     else:
-        cursor = collection.find({"code": room_type.upper()})
-    
-    rooms = await cursor.to_list(length=100)
-    
-    # If no rooms found, use defaults
-    if not rooms:
-        rooms = DEFAULT_ROOM_TYPES
-        if room_type.lower() != "any":
-            rooms = [r for r in rooms if room_type.lower() in r["type"].lower()]
-    
-    # Remove MongoDB _id fields
-    for room in rooms:
-        room.pop("_id", None)
+        wanted = "rooms" if room_type.lower() == "any" else f"{room_type} rooms"
+        message = f"Sorry, we have no {wanted} available from {arrival} to {departure} for {party_size} guests."
+    
+    return trusted_response({
+        "available": bool(result["rooms"]),
+        **result,
+        "message": message
+    })
+
+
+@router.get("/flexible-search")
+async def flexible_date_search(
+    nights: int,
+    room_type: str = "any",
+    guests: str = "2",
+    start: str = "",
+    horizon_days: int = 90,
+    sort: str = "price",
+    top_k: int = 3
+):
+    """Find the best N-night windows for every room type in one call."""
+    
+    try:
+        party_size = max(1, int(guests))
+    except ValueError:
+        party_size = 2
+    
+    try:
+        result = await room_service.search_flexible_dates(
+            nights, room_type, party_size, start, horizon_days, sort, max(1, min(top_k, 10))
+        )
+    except ValueError as e:
+        return {"found": False, "options": [], "message": f"{e}."}
+    
+    # Spoken dates are only used for the message
+    windows = result["options"] + [w for ws in result["by_room_type"].values() for w in ws]
+    spoken = [(w.pop("spoken_check_in"), w.pop("spoken_check_out")) for w in windows]
+    
+    if not result["options"]:
+        wanted = "rooms" if room_type.lower() == "any" else f"{room_type} rooms"
+        message = f"Sorry, we have no {wanted} free for {nights} nights in the next {result['horizon_days']} days."
+    else:
+        best = result["options"][0]
+        arrival, departure = spoken[0]
+        lead = "The best price" if sort == "price" else "The earliest stay"
+        message = (
+            f"{lead} for {nights} nights is a {best['room_type']} from {arrival} to {departure}, "
+            f"${best['total']:g} in total before tax."
+        )
+    
+    return trusted_response({
+        "found": bool(result["options"]),
+        **result,
+        "message": message
+    })
+
+
+@router.post("/holds")
+async def create_room_hold(check_in: str, check_out: str, room_type: str):
+    """Hold one room for the stay; the hold expires unless a booking confirms it."""
+    
+    try:
+        arrival, departure = room_service.normalize_stay(check_in, check_out)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    room = room_service.resolve_room_type(room_type, await room_service.get_room_type_catalog())
+    if room is None:
+        raise HTTPException(status_code=400, detail=f"Unknown room type '{room_type}'")
+    
+    hold = await room_service.create_hold(
+        room["code"], room_service.stay_nights(arrival, departure), room.get("total_rooms", 0)
+    )
+    if hold is None:
+        raise HTTPException(status_code=409, detail=f"No {room['type']} available for those dates")
+    
+    return trusted_response({
+        "success": True,
+        "hold_id": hold["hold_id"],
+        "room_type": room["type"],
+        "check_in": arrival.isoformat(),
+        "check_out": departure.isoformat(),
+        "expires_in": int(room_service.HOLD_TTL_SECONDS),
+        "message": f"I've held a {room['type']} for you while we finish the booking."
+    })
+
+
+@router.delete("/holds/{hold_id}")
+async def release_room_hold(hold_id: str):
+    """Release a hold before it expires."""
     
-    return {
-        "available": True,
-        "check_in": check_in,
-        "check_out": check_out,
-        "rooms": rooms,
-        "message": f"We have rooms available from {check_in} to {check_out}."
-    }
+    if not await room_service.release_hold(hold_id):
+        raise HTTPException(status_code=404, detail="Hold not found or no longer active")
+    return {"success": True, "hold_id": hold_id}
 
 
 @router.get("/info")
-async def get_hotel_info(info_type: str = "all"):
-    """Get general hotel information."""
-    
-    hotel_info = {
-        "hotel_name": "Grand Hotel",
-        "address": "123 Main Street, Downtown, City 12345",
-        "phone": "+1-555-HOTEL-00",
-        "check_in_time": "3:00 PM",
-        "check_out_time": "11:00 AM",
-        "early_check_in_fee": 50,
-        "late_check_out_fee": 50,
-        "parking_self": 15,
-        "parking_valet": 25,
-        "cancellation_policy": "Free cancellation up to 24 hours before check-in",
-        "tax_rate": 12.5
-    }
-    
-    if info_type.lower() == "timings":
-        return {
-            "check_in_time": hotel_info["check_in_time"],
-            "check_out_time": hotel_info["check_out_time"],
-            "message": f"Check-in is at {hotel_info['check_in_time']} and checkout is at {hotel_info['check_out_time']}."
-        }
-    elif info_type.lower() == "location":
-        return {
-            "hotel_name": hotel_info["hotel_name"],
-            "address": hotel_info["address"],
-            "phone": hotel_info["phone"],
-            "message": f"We are located at {hotel_info['address']}."
-        }
-    elif info_type.lower() == "policies":
-        return {
-            "cancellation_policy": hotel_info["cancellation_policy"],
-            "parking_self": hotel_info["parking_self"],
-            "parking_valet": hotel_info["parking_valet"],
-            "message": hotel_info["cancellation_policy"]
-        }
+async def get_hotel_info(info_type: str = "all", if_none_match: Annotated[Optional[str], Header()] = None):
+    """Get general hotel information (with ETag)."""
+    
+    body, etag = catalog_service.get_hotel_info_response(info_type)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    
+    if catalog_service.etag_matches(if_none_match, etag):
+        catalog_service.record_not_modified()
+        return Response(status_code=304, headers=headers)
     
-    hotel_info["message"] = f"Check-in is at {hotel_info['check_in_time']} and checkout is at {hotel_info['check_out_time']}. {hotel_info['cancellation_policy']}."
-    return hotel_info
+    return Response(content=body, media_type="application/json", headers=headers)
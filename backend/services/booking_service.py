@@ -5,4 +5,280 @@ This file contains the core booking logic including reservation creation, modifi
 cancellation, and confirmation number generation. It validates dates, checks availability,
 calculates total pricing with taxes, handles payment processing, and sends confirmation
 emails. This is the central service that orchestrates the entire booking workflow.
+
+Listing and export: bookings are paged with keyset pagination on (created_at, _id),
+newest first. The next page starts from an opaque cursor that encodes the last
+booking's position, so every page costs the same index range scan no matter how deep
+it is, and bookings added meanwhile don't shift pages. Exports stream bookings from the
+storage engine out as NDJSON or CSV one batch at a time, so a month of bookings never
+sits in memory.
+
+Status changes: a booking moves between statuses only along STATUS_TRANSITIONS. Each
+move is one conditional write whose filter includes the statuses it may come from, so
+two desks changing the same booking can't both succeed. The check-in and checkout
+sweeps move hundreds of bookings per bulk write.
 """
+
+import base64
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Optional
+
+from backend.database.storage import get_storage
+
+# Page size limits for GET /bookings/
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Booking fields a listing or export can ask for (the name index and _id stay server-side)
+BOOKING_FIELDS = [
+    "confirmation_number", "guest_name", "email", "phone", "check_in", "check_out", "nights",
+    "room_type", "room_code", "guests", "rate_per_night", "discount", "room_total", "taxes",
+    "grand_total", "special_requests", "status", "hold_id", "cancellation_reference",
+    "cancellation_reason", "cancelled_at", "confirmed_at", "checked_in_at", "checked_out_at",
+    "created_at", "updated_at",
+]
+
+# Fields returned when none are asked for
+LIST_FIELDS = [
+    "confirmation_number", "guest_name", "check_in", "check_out", "room_type", "guests",
+    "grand_total", "status", "created_at",
+]
+
+# Bookings read from storage per round-trip while exporting
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Dates an export range can apply to
+EXPORT_BY = ("created_at", "check_in")
+
+# Statuses (BookingStatus values) a booking can move to from each; checked_out and
+# cancelled are final
+STATUS_TRANSITIONS = {
+    "pending": ("confirmed", "cancelled"),
+    "confirmed": ("checked_in", "cancelled"),
+    "checked_in": ("checked_out",),
+    "checked_out": (),
+    "cancelled": (),
+}
+
+# Timestamp set when a booking enters a status
+STATUS_TIMESTAMPS = {
+    "confirmed": "confirmed_at",
+    "checked_in": "checked_in_at",
+    "checked_out": "checked_out_at",
+    "cancelled": "cancelled_at",
+}
+
+# Bookings moved per bulk write in the check-in and checkout sweeps
+SWEEP_BATCH_SIZE = 500
+
+
+class InvalidTransition(ValueError):
+    """The booking's current status doesn't allow the requested one."""
+
+    def __init__(self, confirmation_number: str, current: Optional[str], status: str):
+        self.current = current
+        super().__init__(
+            f"Booking {confirmation_number} is {(current or 'unknown').replace('_', ' ')} "
+            f"and can't be {status.replace('_', ' ')}"
+        )
+
+
+def parse_fields(fields: str, default: list[str]) -> list[str]:
+    """Comma-separated field names checked against BOOKING_FIELDS. Raises ValueError."""
+    wanted = [f.strip() for f in fields.split(",") if f.strip()] or list(default)
+    unknown = [f for f in wanted if f not in BOOKING_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown booking field(s): {', '.join(unknown)}")
+    return wanted
+
+
+def encode_cursor(booking: dict) -> str:
+    """Opaque cursor for the position just after a booking."""
+    created_at = booking.get("created_at")
+    position = {"t": created_at.isoformat() if created_at else None, "id": str(booking["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[datetime], Any]:
+    """(created_at, _id) from a cursor. Raises ValueError for a cursor this API didn't issue."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        created_at = datetime.fromisoformat(position["t"]) if position["t"] else None
+        return created_at, get_storage().bookings.parse_id(position["id"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+async def list_bookings_page(
+    status: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fields: Optional[list[str]] = None,
+) -> dict:
+    """
+    One page of bookings, newest first, with the cursor for the next page (None on the last).
+    Raises ValueError for an invalid cursor.
+    """
+    fields = fields or LIST_FIELDS
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    after = decode_cursor(cursor) if cursor else None
+
+    # One extra booking tells whether there is another page
+    found = await get_storage().bookings.page(status, after, limit + 1, fields)
+    page = found[:limit]
+    next_cursor = encode_cursor(page[-1]) if len(found) > limit else None
+    return {
+        "count": len(page),
+        "bookings": [{f: b[f] for f in fields if f in b} for b in page],
+        "next_cursor": next_cursor,
+    }
+
+
+def export_query(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    status: Optional[str] = None,
+    by: str = "created_at",
+) -> dict:
+    """
+    Range for an export: bookings made (by='created_at') or arriving (by='check_in')
+    from start up to and including end. Raises ValueError for an unknown 'by'.
+    """
+    if by not in EXPORT_BY:
+        raise ValueError("Export by 'created_at' or 'check_in'")
+    return {"start": start, "end": end, "status": status, "by": by}
+
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, (datetime, date)) else str(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_json_value)
+    return value
+
+
+async def export_bookings(query: dict, fields: list[str], fmt: str = "ndjson") -> AsyncIterator[str]:
+    """
+    Stream the bookings in an export_query() range as NDJSON lines or CSV rows (header
+    first), oldest first. Memory stays at one batch of EXPORT_BATCH_SIZE bookings however
+    many match.
+    """
+    bookings = get_storage().bookings.stream(fields, batch_size=EXPORT_BATCH_SIZE, **query)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(fields)
+
+    rows = 0
+    try:
+        async for booking in bookings:
+            if writer:
+                writer.writerow([_csv_value(booking.get(f)) for f in fields])
+            else:
+                buffer.write(json.dumps(booking, separators=(",", ":"), default=_json_value))
+                buffer.write("\n")
+            rows += 1
+            # Hand over one batch at a time
+            if rows % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        # The client may disconnect mid-export
+        await bookings.aclose()
+
+
+def statuses_before(status: str) -> list[str]:
+    """Statuses a booking can move to status from. Raises ValueError for an unknown status."""
+    if status not in STATUS_TRANSITIONS:
+        raise ValueError(f"Unknown booking status '{status}'")
+    return [current for current, targets in STATUS_TRANSITIONS.items() if status in targets]
+
+
+def _status_changes(status: str, changes: Optional[dict] = None) -> dict:
+    now = datetime.utcnow()
+    return {**(changes or {}), "status": status, STATUS_TIMESTAMPS[status]: now, "updated_at": now}
+
+
+async def transition_booking(
+    confirmation_number: str,
+    status: str,
+    changes: Optional[dict] = None,
+    fields: Optional[list[str]] = None,
+) -> Optional[dict]:
+    """
+    Move a booking to status (setting any other changes with it) in one guarded write.
+    Returns the booking as it was before, with only the fields when given, or None when
+    it doesn't exist. Raises InvalidTransition when its status doesn't allow the move.
+    """
+    bookings = get_storage().bookings
+    before = await bookings.transition(
+        confirmation_number, statuses_before(status), _status_changes(status, changes), fields
+    )
+    if before is None:
+        # Only a refused move costs a second read, to tell the caller why
+        current = await bookings.get(confirmation_number, ["status"])
+        if current is None:
+            return None
+        raise InvalidTransition(confirmation_number, current.get("status"), status)
+    return before
+
+
+async def transition_bookings(confirmation_numbers: list[str], status: str, batch_size: int = SWEEP_BATCH_SIZE) -> int:
+    """
+    Move many bookings to status, batch_size per bulk write. Bookings whose status
+    doesn't allow the move are left as they are. Returns how many moved.
+    """
+    bookings = get_storage().bookings
+    from_statuses = statuses_before(status)
+    changes = _status_changes(status)
+    moved = 0
+    for first in range(0, len(confirmation_numbers), batch_size):
+        moved += await bookings.transition_many(confirmation_numbers[first:first + batch_size], from_statuses, changes)
+    return moved
+
+
+async def _sweep(status: str, select: dict, keep=None) -> dict:
+    """Move the bookings a stream() selection finds (filtered by keep) to status."""
+    bookings = get_storage().bookings.stream(
+        ["confirmation_number", "check_out"], batch_size=SWEEP_BATCH_SIZE, by="check_in", **select
+    )
+    try:
+        numbers = [b["confirmation_number"] async for b in bookings if keep is None or keep(b)]
+    finally:
+        await bookings.aclose()
+    return {"status": status, "found": len(numbers), "moved": await transition_bookings(numbers, status)}
+
+
+async def check_in_arrivals(day: date) -> dict:
+    """Check in the confirmed bookings arriving on day (the morning sweep)."""
+    return await _sweep("checked_in", {"status": "confirmed", "start": day, "end": day})
+
+
+async def check_out_departures(day: date) -> dict:
+    """
+    Check out the checked-in bookings leaving on or before day (the night audit), also
+    catching any an earlier audit missed; the status_check_in index keeps this to the
+    guests in house.
+    """
+    departed = day.isoformat()
+    return await _sweep(
+        "checked_out",
+        {"status": "checked_in", "end": day},
+        keep=lambda b: b.get("check_out") and b["check_out"] <= departed,
+    )
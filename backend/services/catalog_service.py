@@ -0,0 +1,307 @@
+"""
+Catalog Service - Cached Room Type Catalog
+
+This file keeps the room type catalog in process memory. The catalog almost never
+changes, but every room types, availability, hold and booking request used to read
+the whole room_types collection again. Requests are served from the cache. It is
+dropped on catalog writes made through the API, or by a MongoDB change stream on
+room_types when the storage engine and server support one (replica sets and Atlas).
+Otherwise entries expire after CATALOG_CACHE_TTL seconds.
+
+GET /rooms/types and GET /rooms/info responses are serialized once per catalog
+version and filter, with a strong ETag, so repeat clients sending If-None-Match get a
+304 and no body. The payload builders are pure functions, so the agent's local
+replica derives the filtered views from the full documents the same way.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from backend.database.storage import get_storage
+from backend.services.pricing_service import TAX_RATE
+
+# Sample room type data (will be used if DB is empty)
+DEFAULT_ROOM_TYPES = [
+    {
+        "type": "Standard Room",
+        "code": "STD",
+        "rate": 120,
+        "description": "Comfortable room with modern amenities, 300 sq ft",
+        "max_guests": 3,
+        "amenities": ["WiFi", "TV", "Safe", "Coffee Maker"],
+        "total_rooms": 20
+    },
+    {
+        "type": "Deluxe Room",
+        "code": "DLX",
+        "rate": 150,
+        "description": "Spacious room with premium views, 400 sq ft",
+        "max_guests": 3,
+        "amenities": ["WiFi", "TV", "Safe", "Coffee Maker", "Bathrobe", "Work Desk"],
+        "total_rooms": 20
+    },
+    {
+        "type": "Junior Suite",
+        "code": "STE-J",
+        "rate": 220,
+        "description": "Luxurious suite with separate living area, 550 sq ft",
+        "max_guests": 3,
+        "amenities": ["WiFi", "TV", "Safe", "Living Area", "Mini Bar"],
+        "total_rooms": 6
+    },
+    {
+        "type": "Executive Suite",
+        "code": "STE-E",
+        "rate": 350,
+        "description": "Premium suite with panoramic city views, 800 sq ft",
+        "max_guests": 4,
+        "amenities": ["WiFi", "TV", "Safe", "Living Area", "Dining Table", "Kitchenette"],
+        "total_rooms": 3
+    },
+    {
+        "type": "Family Room",
+        "code": "FAM",
+        "rate": 250,
+        "description": "Large room perfect for families, 600 sq ft",
+        "max_guests": 5,
+        "amenities": ["WiFi", "TV", "Safe", "Extra Beds", "Kids Pack"],
+        "total_rooms": 1
+    }
+]
+
+# General hotel information (GET /rooms/info)
+HOTEL_INFO = {
+    "hotel_name": "Grand Hotel",
+    "address": "123 Main Street, Downtown, City 12345",
+    "phone": "+1-555-HOTEL-00",
+    "check_in_time": "3:00 PM",
+    "check_out_time": "11:00 AM",
+    "early_check_in_fee": 50,
+    "late_check_out_fee": 50,
+    "parking_self": 15,
+    "parking_valet": 25,
+    "cancellation_policy": "Free cancellation up to 24 hours before check-in",
+    "tax_rate": round(TAX_RATE * 100, 2)
+}
+
+# Seconds a cached catalog is trusted when no change stream is watching room_types
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+
+# Filters accepted by GET /rooms/types, as predicates on the nightly rate
+ROOM_TYPE_FILTERS = {
+    "all": lambda rate: True,
+    "budget": lambda rate: rate <= 150,
+    "premium": lambda rate: rate > 150,
+}
+
+# Cached catalog, the version it belongs to and when it was loaded
+_catalog: Optional[list[dict]] = None
+_loaded_at = 0.0
+_version = 0
+_load_lock: Optional[asyncio.Lock] = None
+
+# Serialized /rooms/types responses for the current version: {filter: (body, etag)}
+_responses: dict[str, tuple[bytes, str]] = {}
+
+# Serialized /rooms/info responses: {info type: (body, etag)}
+_info_responses: dict[str, tuple[bytes, str]] = {}
+
+# True while the change stream is running (entries then never expire on their own)
+_watching = False
+
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "not_modified": 0,
+    "invalidations": 0,
+}
+
+
+def _expired() -> bool:
+    return not _watching and time.monotonic() - _loaded_at > CATALOG_CACHE_TTL
+
+
+async def seed_room_types() -> int:
+    """
+    Store any default room type missing from room_types; returns how many were added.
+    Idempotent: existing room types (matched by code) are never overwritten, so it is
+    safe on every startup and from several instances at once.
+    """
+    seeded = await get_storage().room_types.seed(DEFAULT_ROOM_TYPES)
+    if seeded:
+        invalidate_catalog("seeded")
+    return seeded
+
+
+async def _load_catalog() -> list[dict]:
+    """Room types from the database, or the defaults when none are stored."""
+    room_types = await get_storage().room_types.list_all()
+    return room_types or [dict(r) for r in DEFAULT_ROOM_TYPES]
+
+
+async def get_room_type_catalog() -> list[dict]:
+    """The room type catalog, from memory when cached. Entries are copies callers may change."""
+    global _catalog, _loaded_at, _load_lock
+    if _catalog is None or _expired():
+        if _load_lock is None:
+            _load_lock = asyncio.Lock()
+        async with _load_lock:
+            # Another request may have loaded it while this one waited
+            if _catalog is None or _expired():
+                _stats["misses"] += 1
+                version = _version
+                room_types = await _load_catalog()
+                if version == _version:
+                    _catalog, _loaded_at = room_types, time.monotonic()
+                    _responses.clear()
+                return [dict(r) for r in room_types]
+    _stats["hits"] += 1
+    return [dict(r) for r in _catalog]
+
+
+def invalidate_catalog(reason: str = "write"):
+    """Drop the cached catalog and its serialized responses; the next request reloads."""
+    global _catalog, _version
+    _catalog = None
+    _version += 1
+    _responses.clear()
+    _stats["invalidations"] += 1
+    print(f"Room type catalog invalidated ({reason})")
+
+
+def filter_room_types(room_types: list[dict], filter_type: str) -> list[dict]:
+    """Room types matching a /rooms/types filter ('all', 'budget' or 'premium')."""
+    keep = ROOM_TYPE_FILTERS.get(filter_type.lower(), ROOM_TYPE_FILTERS["all"])
+    return [r for r in room_types if keep(r["rate"])]
+
+
+def room_types_payload(room_types: list[dict], filter_type: str = "all") -> dict:
+    """The /rooms/types response body for a filter."""
+    room_types = filter_room_types(room_types, filter_type)
+    rates_message = ", ".join([f"{r['type']} at ${r['rate']}" for r in room_types])
+    return {
+        "room_types": room_types,
+        "count": len(room_types),
+        "message": f"We have {rates_message} per night."
+    }
+
+
+def hotel_info_payload(hotel_info: dict, info_type: str = "all") -> dict:
+    """The /rooms/info response body for an info type ('all', 'timings', 'location' or 'policies')."""
+    if info_type.lower() == "timings":
+        return {
+            "check_in_time": hotel_info["check_in_time"],
+            "check_out_time": hotel_info["check_out_time"],
+            "message": f"Check-in is at {hotel_info['check_in_time']} and checkout is at {hotel_info['check_out_time']}."
+        }
+    elif info_type.lower() == "location":
+        return {
+            "hotel_name": hotel_info["hotel_name"],
+            "address": hotel_info["address"],
+            "phone": hotel_info["phone"],
+            "message": f"We are located at {hotel_info['address']}."
+        }
+    elif info_type.lower() == "policies":
+        return {
+            "cancellation_policy": hotel_info["cancellation_policy"],
+            "parking_self": hotel_info["parking_self"],
+            "parking_valet": hotel_info["parking_valet"],
+            "message": hotel_info["cancellation_policy"]
+        }
+    
+    return dict(
+        hotel_info,
+        message=f"Check-in is at {hotel_info['check_in_time']} and checkout is at {hotel_info['check_out_time']}. {hotel_info['cancellation_policy']}."
+    )
+
+
+def _serialize(payload: dict) -> tuple[bytes, str]:
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    return body, make_etag(body)
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names the current ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+async def get_room_types_response(filter_type: str = "all") -> tuple[bytes, str]:
+    """Serialized /rooms/types body and its ETag, built once per catalog version."""
+    room_types = await get_room_type_catalog()
+    key = filter_type.lower() if filter_type.lower() in ROOM_TYPE_FILTERS else "all"
+    cached = _responses.get(key)
+    if cached is None:
+        cached = _serialize(room_types_payload(room_types, key))
+        # Not kept when the catalog was invalidated while it loaded
+        if _catalog is not None:
+            _responses[key] = cached
+    return cached
+
+
+def get_hotel_info_response(info_type: str = "all") -> tuple[bytes, str]:
+    """Serialized /rooms/info body and its ETag."""
+    key = info_type.lower()
+    cached = _info_responses.get(key)
+    if cached is None:
+        cached = _info_responses[key] = _serialize(hotel_info_payload(HOTEL_INFO, key))
+    return cached
+
+
+def record_not_modified():
+    """Count a request answered with 304 Not Modified."""
+    _stats["not_modified"] += 1
+
+
+async def watch_catalog_changes():
+    """Background task that invalidates the cache whenever room_types changes."""
+    global _watching
+    room_types = get_storage().room_types
+    watcher = room_types.watch()
+    if watcher is None:
+        # The memory and SQLite engines have no change notification; the TTL bounds staleness
+        print(f"Room type change stream unavailable, caching for {CATALOG_CACHE_TTL:g}s: "
+              f"{type(room_types).__name__} has no change notification")
+        return
+    try:
+        async with watcher as changes:
+            _watching = True
+            print("Watching room_types for catalog changes")
+            async for operation in changes:
+                invalidate_catalog(f"change stream: {operation}")
+    except OperationFailure as e:
+        # Standalone MongoDB servers have no change streams; the TTL bounds staleness instead
+        print(f"Room type change stream unavailable, caching for {CATALOG_CACHE_TTL:g}s: {e}")
+    except PyMongoError as e:
+        print(f"Room type change stream stopped: {e}")
+    finally:
+        if _watching:
+            _watching = False
+            # Changes may be missed from here on, so nothing cached is trusted past the TTL
+            invalidate_catalog("change stream closed")
+
+
+def catalog_cache_stats() -> dict:
+    """Hit/miss counters and the state of the catalog cache."""
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else 0.0,
+        "version": _version,
+        "cached": _catalog is not None,
+        "change_stream": _watching,
+        "cached_responses": len(_responses),
+    }
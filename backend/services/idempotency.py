@@ -0,0 +1,126 @@
+"""
+Idempotency Service - Answering Repeated Requests Without Repeating Their Writes
+
+This file lets a write endpoint be called again with the same Idempotency-Key and get
+the first call's response back instead of doing the work twice. The voice agent
+retries tool calls (the LLM repeats them, and a booking can time out after the
+backend already stored it), so each create-booking call carries a key derived from
+the call session and the booking details.
+
+The first request with a key claims it in the storage engine's idempotency_keys
+store, runs, and saves its response for IDEMPOTENCY_TTL_SECONDS. A repeat within
+that time gets the saved response. A repeat that arrives while the first is still
+running waits for it (up to IDEMPOTENCY_WAIT_SECONDS). A key sent again with
+different request details is refused. When the first request fails, its claim is
+dropped so a retry runs it again.
+
+Booking details are compared in a form that doesn't depend on how they were said
+(booking_identity): 'Dec 5' and 'December 5' are the same check-in, 'deluxe' and
+'Deluxe Room' the same room type.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from backend.database.storage import get_storage
+from backend.services.room_service import normalize_stay, resolve_room_type
+
+# How long a response is kept for repeats of its key
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+
+# How long a claimed key stays claimed if the request never finishes (e.g. a crash)
+IDEMPOTENCY_PENDING_SECONDS = 60.0
+
+# How long a repeat waits for the first request with its key to finish (below the
+# agent's create_booking timeout, so its retry gets an answer)
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "5"))
+IDEMPOTENCY_POLL_SECONDS = 0.1
+
+# Longest key accepted
+MAX_KEY_LENGTH = 200
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was first sent with different request details."""
+
+
+class IdempotencyInProgress(Exception):
+    """The first request with the key is still running."""
+
+
+def _normalize(value):
+    return " ".join(value.casefold().split()) if isinstance(value, str) else value
+
+
+def request_fingerprint(payload: dict) -> str:
+    """
+    Hash of the request details, to tell a true repeat from a reused key. Text is
+    compared ignoring case and spacing, as the agent's keys are ('john smith' repeats
+    'John Smith').
+    """
+    normalized = {field: _normalize(value) for field, value in payload.items()}
+    canonical = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def booking_identity(booking: dict, room_types: list[dict], today: Optional[date] = None) -> dict:
+    """
+    The booking request with its stay as ISO dates, its room type as the catalog code
+    and its phone number as digits, so a repeat that says them differently still
+    matches. Details that can't be understood are kept as given.
+    """
+    identity = dict(booking)
+    try:
+        arrival, departure = normalize_stay(booking["check_in"], booking["check_out"], today)
+        identity["check_in"], identity["check_out"] = arrival.isoformat(), departure.isoformat()
+    except ValueError:
+        pass
+    room = resolve_room_type(booking["room_type"], room_types)
+    if room is not None:
+        identity["room_type"] = room["code"]
+    digits = re.sub(r"\D", "", booking.get("phone") or "")
+    if digits:
+        identity["phone"] = digits
+    return identity
+
+
+async def run_once(key: str, payload: dict, operation: Callable[[], Awaitable[dict]]) -> tuple[dict, bool]:
+    """
+    The response for key: operation()'s result the first time, the stored result for
+    repeats until it expires. Returns (response, replayed). Raises ValueError for an
+    unusable key, IdempotencyKeyReused when payload differs from the first request's,
+    and IdempotencyInProgress when the first request doesn't finish in time.
+    """
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise ValueError(f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+
+    store = get_storage().idempotency
+    fingerprint = request_fingerprint(payload)
+    deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        now = datetime.utcnow()
+        existing = await store.claim(key, fingerprint, now, now + timedelta(seconds=IDEMPOTENCY_PENDING_SECONDS))
+        if existing is None:
+            break
+        if existing["fingerprint"] != fingerprint:
+            raise IdempotencyKeyReused("Idempotency-Key was already used for a different request")
+        if existing["status"] == "done":
+            return existing["response"], True
+        # The first request is still running; if it fails, its claim goes and this one runs
+        if time.monotonic() >= deadline:
+            raise IdempotencyInProgress("A request with this Idempotency-Key is still in progress")
+        await asyncio.sleep(IDEMPOTENCY_POLL_SECONDS)
+
+    try:
+        response = await operation()
+    except BaseException:
+        await store.release(key)
+        raise
+    await store.complete(key, response, datetime.utcnow() + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS))
+    return response, False
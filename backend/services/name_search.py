@@ -0,0 +1,276 @@
+"""
+Name Search - Phonetic Guest-Name Lookup for Bookings
+
+This file finds bookings by a spoken guest name. Speech-to-text often spells names
+differently from the booking ("Jon Smyth" for "John Smith"), and an unanchored regex
+over guest_name scans every booking. Each booking instead stores its name as
+normalized tokens (name_tokens) and a phonetic key per token (name_keys), and
+name_keys is indexed together with created_at.
+
+A lookup reads a small, bounded set of candidates through that index (bookings that
+share the query's phonetic keys, newest first) and re-ranks them by edit distance
+between the name tokens. The cost depends on how many guests share a name, not on
+the size of the bookings collection.
+"""
+
+import re
+import unicodedata
+from typing import Optional
+
+from backend.database.storage import get_storage
+
+# Candidates read from the index per lookup, before re-ranking
+CANDIDATE_LIMIT = 50
+
+# Lowest name score (0-1) returned as a match
+MIN_NAME_SCORE = 0.6
+
+# Lowest score for tokens that sound alike, however differently they are spelled
+PHONETIC_MATCH_SCORE = 0.85
+
+# Booking fields that hold the name index (kept out of API responses)
+NAME_INDEX_FIELDS = ("name_tokens", "name_keys", "name_key_version")
+
+# Version of the phonetic_key rules; bookings keyed by another version are re-keyed at startup
+NAME_KEY_VERSION = 2
+
+_VOWELS = set("AEIOU")
+
+# Names whose S sounds like SH (Irish spellings of Shawn, Shaymus)
+_SH_NAMES = {"SEAN", "SEAMUS"}
+
+
+# ============================================
+# Normalization and phonetic keys
+# ============================================
+def name_tokens(name: str) -> list[str]:
+    """Lowercase ASCII tokens of a name ('Zoë O'Brien-Smith' -> ['zoe', 'obrien', 'smith'])."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    ascii_name = re.sub(r"['’.]", "", ascii_name.lower())
+    return [token for token in re.split(r"[^a-z]+", ascii_name) if token]
+
+
+def phonetic_key(token: str) -> str:
+    """
+    Phonetic key of one name token, after the Metaphone rules.
+
+    Spellings that sound alike get the same key: John/Jon -> JN, Smith/Smyth -> SM0,
+    Stephen/Steven -> STFN, Catherine/Kathryn -> K0RN, Philip/Filip -> FLP,
+    Thompson/Tomson -> TMSN, Sean/Shawn -> XN.
+    """
+    word = re.sub(r"[^A-Z]", "", token.upper())
+    if not word:
+        return ""
+
+    # Silent or changed first letters
+    if word[:2] in ("GN", "KN", "PN", "WR", "AE"):
+        word = word[1:]
+    elif word[0] == "X":
+        word = "S" + word[1:]
+    elif word[:2] == "WH":
+        word = "W" + word[2:]
+    elif word in _SH_NAMES:
+        word = "SH" + word[1:]
+
+    def at(i: int) -> str:
+        return word[i] if 0 <= i < len(word) else ""
+
+    key = []
+    i = 0
+    while i < len(word):
+        c = at(i)
+        # Double letters sound once (except CC, as in 'Acci')
+        if c == at(i - 1) and c != "C":
+            i += 1
+            continue
+
+        if c in _VOWELS:
+            if i == 0:
+                key.append("A")
+        elif c == "B":
+            # Silent at the end after M ('Plumb')
+            if not (i == len(word) - 1 and at(i - 1) == "M"):
+                key.append("B")
+        elif c == "C":
+            if at(i + 1) == "I" and at(i + 2) == "A":
+                key.append("X")
+            elif at(i + 1) == "H":
+                # CH and, in names, SCH ('Schmidt') sound like X
+                if key[-1:] == ["S"] and at(i - 1) == "S":
+                    key.pop()
+                key.append("X")
+                i += 1
+            elif at(i + 1) in ("I", "E", "Y"):
+                if at(i - 1) != "S":
+                    key.append("S")
+            else:
+                key.append("K")
+        elif c == "D":
+            if at(i + 1) == "G" and at(i + 2) in ("E", "I", "Y"):
+                key.append("J")
+                i += 2
+            else:
+                key.append("T")
+        elif c == "G":
+            if at(i + 1) == "H":
+                # Silent in 'Hugh', 'Wright'; hard at the start ('Ghent')
+                if i == 0:
+                    key.append("K")
+                i += 1
+            elif at(i + 1) == "N" and i + 2 >= len(word):
+                pass
+            elif at(i + 1) in ("I", "E", "Y"):
+                key.append("J")
+            else:
+                key.append("K")
+        elif c == "H":
+            if at(i + 1) in _VOWELS and at(i - 1) not in _VOWELS | set("CGPST"):
+                key.append("H")
+        elif c == "K":
+            if at(i - 1) != "C":
+                key.append("K")
+        elif c == "P":
+            if at(i + 1) == "H":
+                key.append("F")
+                i += 1
+            elif not (at(i - 1) == "M" and at(i + 1) in ("S", "T")):
+                # Silent between M and S or T ('Thompson', 'Sampson')
+                key.append("P")
+        elif c == "Q":
+            key.append("K")
+        elif c == "S":
+            if at(i + 1) == "H":
+                key.append("X")
+                i += 1
+            elif at(i + 1) == "I" and at(i + 2) in ("O", "A"):
+                key.append("X")
+            else:
+                key.append("S")
+        elif c == "T":
+            if at(i + 1) == "I" and at(i + 2) in ("O", "A"):
+                key.append("X")
+            elif at(i + 1) == "H":
+                # A plain T at the start before OM/AM ('Thomas', 'Thompson'), as in Double Metaphone
+                key.append("T" if i == 0 and at(i + 2) + at(i + 3) in ("OM", "AM") else "0")
+                i += 1
+            elif not (at(i + 1) == "C" and at(i + 2) == "H"):
+                key.append("T")
+        elif c == "V":
+            key.append("F")
+        elif c == "W":
+            if at(i + 1) in _VOWELS:
+                key.append("W")
+        elif c == "Y":
+            # A consonant only before a vowel and not after a consonant ('Maya', not 'Bryan')
+            if at(i + 1) in _VOWELS and (i == 0 or at(i - 1) in _VOWELS):
+                key.append("Y")
+        elif c == "X":
+            key.append("KS")
+        elif c == "Z":
+            key.append("S")
+        else:
+            key.append(c)
+        i += 1
+
+    # Sounds written twice in a row ('Schmidt' -> XMTT) count once
+    collapsed = [code for n, code in enumerate(key) if n == 0 or code != key[n - 1]]
+    return "".join(collapsed) or word[0]
+
+
+def name_index_fields(name: str) -> dict:
+    """The name_tokens, name_keys and name_key_version stored on a booking for its guest name."""
+    tokens = name_tokens(name)
+    return {
+        "name_tokens": tokens,
+        "name_keys": list(dict.fromkeys(phonetic_key(token) for token in tokens)),
+        "name_key_version": NAME_KEY_VERSION,
+    }
+
+
+# ============================================
+# Scoring
+# ============================================
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def token_similarity(a: str, b: str) -> float:
+    """Similarity of two name tokens from 0 to 1 (spelling, raised for tokens that sound alike)."""
+    if a == b:
+        return 1.0
+    score = 1 - edit_distance(a, b) / max(len(a), len(b))
+    if phonetic_key(a) == phonetic_key(b):
+        # Sound-alikes rank above other matches, closer spellings first (Jon: John > Jane)
+        score = PHONETIC_MATCH_SCORE + (1 - PHONETIC_MATCH_SCORE) * max(score, 0.0)
+    return score
+
+
+def name_score(query_tokens: list[str], candidate_tokens: list[str]) -> float:
+    """How well a booking's name matches the query: each query token against its best match."""
+    if not query_tokens or not candidate_tokens:
+        return 0.0
+    return sum(max(token_similarity(q, c) for c in candidate_tokens) for q in query_tokens) / len(query_tokens)
+
+
+# ============================================
+# Lookup
+# ============================================
+async def search_bookings_by_name(
+    guest_name: str, limit: int = 10, status: Optional[str] = None, fields: Optional[list[str]] = None
+) -> list[dict]:
+    """
+    Bookings whose guest name matches a spoken name, best match first, with only the
+    fields when given.
+
+    Reads at most CANDIDATE_LIMIT bookings per query through the name_keys index:
+    first those with every phonetic key of the query, then, if that finds nothing
+    (e.g. a garbled first name), those with any of them.
+    """
+    index = name_index_fields(guest_name)
+    tokens, keys = index["name_tokens"], index["name_keys"]
+    if not keys:
+        return []
+
+    bookings = get_storage().bookings
+    candidates = await bookings.find_by_name_keys(keys, True, status, CANDIDATE_LIMIT, fields)
+    if not candidates and len(keys) > 1:
+        candidates = await bookings.find_by_name_keys(keys, False, status, CANDIDATE_LIMIT, fields)
+
+    scored = []
+    for booking in candidates:
+        score = name_score(tokens, booking.pop("name_tokens", None) or name_tokens(booking.get("guest_name", "")))
+        if score >= MIN_NAME_SCORE:
+            scored.append((score, booking))
+
+    # Stable sort keeps newest first among equal scores
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [dict(booking, name_match=round(score, 2)) for score, booking in scored[:limit]]
+
+
+async def backfill_name_index(batch_size: int = 1000) -> int:
+    """
+    Add the name index to bookings stored without it, or with keys from older
+    phonetic_key rules; returns how many.
+    """
+    bookings = get_storage().bookings
+    updated = 0
+    batch = []
+    async for booking_id, guest_name in bookings.missing_name_index(NAME_KEY_VERSION):
+        batch.append((booking_id, name_index_fields(guest_name)))
+        if len(batch) >= batch_size:
+            await bookings.set_name_index(batch)
+            updated += len(batch)
+            batch = []
+    if batch:
+        await bookings.set_name_index(batch)
+        updated += len(batch)
+    return updated
@@ -0,0 +1,140 @@
+"""
+Pricing Service - Rate Calendar and Stay Quotes
+
+This file is the single place room prices are calculated. Each room type's base
+rate (the 'rate' in the room type catalog) is turned into a rate calendar: a dense
+(room types x nights) array with seasonal and weekend multipliers applied per night.
+A quote sums the nights of a stay for every room type in one vectorized pass, then
+applies the length-of-stay discount and tax. The booking router, availability
+responses, flexible-date search and the agent's offline fallback all price through it.
+"""
+
+import os
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+
+# Tax applied to the discounted room total
+TAX_RATE = float(os.getenv("TAX_RATE", "0.125"))
+
+# Seasons as (first day, last day, multiplier) with days as (month, day); later entries win
+SEASONS = [
+    ((1, 6), (2, 28), 0.90),     # Low season
+    ((6, 15), (8, 31), 1.25),    # Summer peak
+    ((12, 20), (12, 31), 1.30),  # Holidays
+    ((1, 1), (1, 2), 1.30),
+]
+
+# Friday and Saturday nights
+WEEKEND_NIGHTS = (4, 5)
+WEEKEND_MULTIPLIER = 1.15
+
+# Length-of-stay discounts as (minimum nights, discount), largest first
+STAY_DISCOUNTS = [(7, 0.10), (4, 0.05)]
+
+# Nights kept precomputed in the calendar, from the day the engine is built
+CALENDAR_DAYS = 730
+
+
+def _season_table() -> np.ndarray:
+    """Multiplier per (month * 32 + day), so any date's season is one array lookup."""
+    table = np.ones(13 * 32)
+    for (first_month, first_day), (last_month, last_day), multiplier in SEASONS:
+        first, last = first_month * 32 + first_day, last_month * 32 + last_day
+        table[first:last + 1] = multiplier
+    return table
+
+
+_SEASON_MULTIPLIERS = _season_table()
+
+
+def night_multipliers(first_night: date, count: int) -> np.ndarray:
+    """Seasonal and weekend multiplier for each of count nights from first_night."""
+    days = np.arange(np.datetime64(first_night), np.datetime64(first_night + timedelta(days=count)))
+    months = days.astype("datetime64[M]")
+    month_number = months.astype(int) % 12 + 1
+    day_of_month = (days - months).astype(int) + 1
+    multipliers = _SEASON_MULTIPLIERS[month_number * 32 + day_of_month]
+
+    # 1970-01-01 was a Thursday; weekday 0 is Monday
+    weekday = (days.astype(int) + 3) % 7
+    return multipliers * np.where(np.isin(weekday, WEEKEND_NIGHTS), WEEKEND_MULTIPLIER, 1.0)
+
+
+def stay_discount(nights: int) -> float:
+    """Length-of-stay discount as a fraction."""
+    return next((discount for minimum, discount in STAY_DISCOUNTS if nights >= minimum), 0.0)
+
+
+class PricingEngine:
+    """Rate calendar for a set of room types, with vectorized quotes."""
+
+    def __init__(self, room_types: list[dict], calendar_start: Optional[date] = None, calendar_days: int = CALENDAR_DAYS):
+        self.room_types = room_types
+        self.codes = [r["code"] for r in room_types]
+        self.base_rates = np.array([float(r.get("rate", 0)) for r in room_types])
+        self.calendar_start = calendar_start or date.today()
+        self.calendar_days = calendar_days
+        # Dense (room types x nights) nightly rates
+        self.calendar = np.round(
+            self.base_rates[:, None] * night_multipliers(self.calendar_start, calendar_days)[None, :], 2
+        )
+
+    def rows(self, codes: list[str]) -> list[int]:
+        """Calendar rows for room type codes."""
+        index = {code: i for i, code in enumerate(self.codes)}
+        return [index[code] for code in codes]
+
+    def nightly_rates(self, first_night: date, count: int, codes: Optional[list[str]] = None) -> np.ndarray:
+        """Rates per room type (rows, all or codes) for count nights from first_night (columns)."""
+        rows = slice(None) if codes is None else self.rows(codes)
+        offset = (first_night - self.calendar_start).days
+        if 0 <= offset and offset + count <= self.calendar_days:
+            return self.calendar[rows, offset:offset + count]
+        # Outside the precomputed calendar: build just these nights
+        return np.round(self.base_rates[rows, None] * night_multipliers(first_night, count)[None, :], 2)
+
+    def quote_arrays(self, arrival: date, departure: date, codes: Optional[list[str]] = None) -> dict[str, np.ndarray]:
+        """Quote room types (all or codes) for a stay; each value has one entry per room type."""
+        nights = (departure - arrival).days
+        rates = self.nightly_rates(arrival, nights, codes)
+        subtotal = rates.sum(axis=1)
+        discount = np.round(subtotal * stay_discount(nights), 2)
+        room_total = np.round(subtotal - discount, 2)
+        taxes = np.round(room_total * TAX_RATE, 2)
+        return {
+            "rate_per_night": np.round(subtotal / nights, 2),
+            "discount": discount,
+            "room_total": room_total,
+            "taxes": taxes,
+            "grand_total": np.round(room_total + taxes, 2),
+        }
+
+    def quote_all(self, arrival: date, departure: date, codes: Optional[list[str]] = None) -> dict[str, dict]:
+        """Quotes for room types (all or codes), keyed by room type code."""
+        codes = self.codes if codes is None else codes
+        nights = (departure - arrival).days
+        arrays = self.quote_arrays(arrival, departure, codes)
+        return {
+            code: dict({key: float(values[i]) for key, values in arrays.items()}, nights=nights)
+            for i, code in enumerate(codes)
+        }
+
+    def quote(self, code: str, arrival: date, departure: date) -> dict:
+        """Quote one room type for a stay."""
+        return self.quote_all(arrival, departure, [code])[code]
+
+
+# Engine for the current catalog, rebuilt when rates change or the day rolls over
+_engine: Optional[PricingEngine] = None
+_engine_key: Optional[tuple] = None
+
+
+def get_pricing_engine(room_types: list[dict]) -> PricingEngine:
+    """Pricing engine for the full room type catalog, reused while it is unchanged."""
+    global _engine, _engine_key
+    key = (date.today(), tuple((r["code"], r.get("rate", 0)) for r in room_types))
+    if key != _engine_key:
+        _engine, _engine_key = PricingEngine(room_types), key
+    return _engine
@@ -5,4 +5,401 @@ This file contains the business logic for room-related operations including chec
 availability across date ranges, calculating rates based on weekday/weekend/holiday,
 applying discounts, and managing room inventory. It queries the rooms and room_types
 collections and returns processed data ready for API responses or agent tool calls.
+
+Availability is kept as per-night occupancy counters in the room_inventory collection,
+one document per room type and night ({code, night, booked, holds}). A query reads the
+counters for the requested nights only, so it costs O(nights x room types) no matter
+how many bookings exist. Bookings take rooms with conditional updates that can never
+push a counter past total_rooms, and short-lived holds (room_holds collection) keep a
+room for a caller until they confirm, cancel or the hold expires. Counters and holds
+are read and written through the configured storage engine (database/storage.py).
+
+Flexible-date search loads the counters for a whole horizon into per-night arrays
+and finds every N-night window for every room type at once with vectorized sliding
+minimums (rooms free on every night) and sums over the rate calendar (stay price).
+Prices come from the pricing service and room types from the cached catalog
+(catalog service).
 """
+
+import asyncio
+import os
+import random
+import re
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from backend.database.storage import get_storage
+from backend.services.catalog_service import DEFAULT_ROOM_TYPES, get_room_type_catalog  # noqa: F401
+from backend.services.pricing_service import get_pricing_engine, stay_discount
+
+# Longest stay accepted in one booking (bounds the per-night counter reads)
+MAX_STAY_NIGHTS = 30
+
+# Reservation settings
+HOLD_TTL_SECONDS = float(os.getenv("HOLD_TTL_SECONDS", "300"))
+HOLD_SWEEP_INTERVAL = float(os.getenv("HOLD_SWEEP_INTERVAL", "30"))
+RESERVE_RETRIES = int(os.getenv("RESERVE_RETRIES", "5"))
+RESERVE_BACKOFF = 0.02
+
+# Flexible-date search limits
+MAX_SEARCH_HORIZON_DAYS = 180
+
+# Date formats callers and the agent use, tried in order (ordinal suffixes are stripped first)
+_DATE_FORMATS_WITH_YEAR = ["%Y-%m-%d", "%m/%d/%Y", "%B %d %Y", "%b %d %Y", "%d %B %Y", "%d %b %Y"]
+_DATE_FORMATS_NO_YEAR = ["%B %d", "%b %d", "%d %B", "%d %b", "%m/%d"]
+
+
+# ============================================
+# Dates
+# ============================================
+def parse_stay_date(text: str, today: Optional[date] = None, not_before: Optional[date] = None) -> date:
+    """
+    Parse a free-text date such as '2026-01-20', 'January 20th', '20 Jan 2026' or
+    'tomorrow'. Dates without a year fall on the next occurrence on or after
+    not_before (default today). Raises ValueError if the text is not a date.
+    """
+    today = today or date.today()
+    not_before = not_before or today
+    cleaned = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", text.strip().lower())
+    cleaned = re.sub(r"[,.]", " ", cleaned)
+    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+
+    if cleaned == "today":
+        return today
+    if cleaned == "tomorrow":
+        return today + timedelta(days=1)
+
+    for fmt in _DATE_FORMATS_WITH_YEAR:
+        try:
+            return datetime.strptime(cleaned, fmt).date()
+        except ValueError:
+            pass
+
+    for fmt in _DATE_FORMATS_NO_YEAR:
+        try:
+            # Parse with a leap year so 'February 29' is accepted, then place it in a real year
+            parsed = datetime.strptime(f"{cleaned} 2000", f"{fmt} %Y").date()
+        except ValueError:
+            continue
+        for year in (not_before.year, not_before.year + 1, not_before.year + 2):
+            try:
+                candidate = parsed.replace(year=year)
+            except ValueError:
+                continue
+            if candidate >= not_before:
+                return candidate
+
+    raise ValueError(f"Could not understand the date '{text}'")
+
+
+def normalize_stay(check_in: str, check_out: str, today: Optional[date] = None) -> tuple[date, date]:
+    """Parse check-in/check-out text into dates, validating the stay."""
+    today = today or date.today()
+    arrival = parse_stay_date(check_in, today=today)
+    if arrival < today:
+        raise ValueError("Check-in can't be in the past")
+    departure = parse_stay_date(check_out, today=today, not_before=arrival + timedelta(days=1))
+    if departure <= arrival:
+        raise ValueError("Check-out must be after check-in")
+    if (departure - arrival).days > MAX_STAY_NIGHTS:
+        raise ValueError(f"Stays are limited to {MAX_STAY_NIGHTS} nights")
+    return arrival, departure
+
+
+def stay_nights(arrival: date, departure: date) -> list[str]:
+    """The nights of a stay as ISO dates (the check-out day is not a night)."""
+    return [(arrival + timedelta(days=i)).isoformat() for i in range((departure - arrival).days)]
+
+
+def spoken_date(value: date) -> str:
+    """Date as the agent says it, e.g. 'January 20'."""
+    return f"{value:%B} {value.day}"
+
+
+# ============================================
+# Room types
+# ============================================
+def resolve_room_type(name: str, room_types: list[dict]) -> Optional[dict]:
+    """Match a spoken room type ('deluxe', 'Junior Suite', 'STE-J') to a catalog entry."""
+    wanted = name.strip().lower()
+    if not wanted:
+        return None
+    for room in room_types:
+        if wanted in (room["code"].lower(), room["type"].lower()):
+            return room
+    for room in room_types:
+        if wanted in room["type"].lower() or room["type"].lower().split()[0] in wanted:
+            return room
+    return None
+
+
+def matching_room_types(catalog: list[dict], room_type: str, guests: int) -> list[dict]:
+    """Catalog entries for the requested room type ('any' for all) that fit the party."""
+    room_types = catalog
+    if room_type.strip().lower() not in ("", "any"):
+        match = resolve_room_type(room_type, catalog)
+        room_types = [match] if match else []
+    return [r for r in room_types if r.get("max_guests", guests) >= guests]
+
+
+# ============================================
+# Inventory counters
+# ============================================
+async def get_booked_counts(codes: list[str], nights: list[str]) -> dict[str, int]:
+    """Highest number of rooms booked on any of the nights, per room type code."""
+    return await get_storage().inventory.booked_counts(codes, nights)
+
+
+async def adjust_inventory(code: str, nights: list[str], delta: int):
+    """Add delta to the booked counter of a room type on each night, in one round-trip."""
+    if not nights or not delta:
+        return
+    await get_storage().inventory.adjust(code, nights, delta)
+
+
+# ============================================
+# Atomic reservation and holds
+# ============================================
+async def _ensure_counters(code: str, nights: list[str]) -> int:
+    """Create missing counters for the nights; returns how many were created."""
+    return await get_storage().inventory.ensure(code, nights)
+
+
+async def release_inventory(code: str, nights: list[str], hold_id: str) -> int:
+    """Give back the nights taken under hold_id; safe to call more than once."""
+    return await get_storage().inventory.release(code, nights, hold_id)
+
+
+async def reserve_inventory(code: str, nights: list[str], total_rooms: int, hold_id: str) -> bool:
+    """
+    Take one room of a type on every night of a stay, or none at all.
+
+    Each night's counter is only incremented while booked < total_rooms, in a single
+    storage operation for the whole range. The hold_id is recorded on every
+    counter it took, so a partial reservation (another caller got the last room on
+    one of the nights) is rolled back exactly. Contended attempts are retried after
+    a short random backoff, since two partial winners both roll back.
+    """
+    inventory = get_storage().inventory
+    for attempt in range(RESERVE_RETRIES):
+        if await inventory.take(code, nights, total_rooms, hold_id) == len(nights):
+            return True
+
+        await release_inventory(code, nights, hold_id)
+        if await _ensure_counters(code, nights):
+            # First booking on some of these nights: the counters exist now
+            continue
+        booked = await get_booked_counts([code], nights)
+        if booked[code] >= total_rooms and not await expire_holds():
+            # A night is genuinely full (not just taken by another caller's partial attempt)
+            return False
+        await asyncio.sleep(random.uniform(0, RESERVE_BACKOFF * (attempt + 1)))
+    return False
+
+
+async def create_hold(code: str, nights: list[str], total_rooms: int, ttl: float = HOLD_TTL_SECONDS) -> Optional[dict]:
+    """Reserve a room for a caller who is still giving their details; expires after ttl seconds."""
+    hold_id = f"HOLD-{uuid.uuid4().hex[:12].upper()}"
+    if not await reserve_inventory(code, nights, total_rooms, hold_id):
+        return None
+    hold = {
+        "hold_id": hold_id,
+        "code": code,
+        "nights": nights,
+        "status": "held",
+        "expires_at": datetime.utcnow() + timedelta(seconds=ttl),
+    }
+    await get_storage().holds.insert(hold)
+    return hold
+
+
+async def confirm_hold(hold_id: str) -> Optional[dict]:
+    """Turn a live hold into a booking's reservation; None if it expired or doesn't exist."""
+    return await get_storage().holds.confirm(hold_id, datetime.utcnow())
+
+
+async def release_hold(hold_id: str) -> bool:
+    """Release a hold the caller no longer needs."""
+    hold = await get_storage().holds.release(hold_id)
+    if hold is None:
+        return False
+    await release_inventory(hold["code"], hold["nights"], hold_id)
+    return True
+
+
+async def expire_holds() -> int:
+    """Release every hold past its expiry (callers who hung up); returns how many."""
+    holds = get_storage().holds
+    expired = 0
+    while True:
+        # Claim one at a time so concurrent sweepers never release the same hold twice
+        hold = await holds.claim_expired(datetime.utcnow())
+        if hold is None:
+            return expired
+        await release_inventory(hold["code"], hold["nights"], hold["hold_id"])
+        expired += 1
+
+
+async def run_hold_sweeper(interval: float = HOLD_SWEEP_INTERVAL):
+    """Background task that expires abandoned holds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            expired = await expire_holds()
+            if expired:
+                print(f"Released {expired} expired room hold(s)")
+        except Exception as e:
+            print(f"Hold sweep failed: {e}")
+
+
+async def check_availability(
+    check_in: str,
+    check_out: str,
+    room_type: str = "any",
+    guests: int = 2
+) -> dict:
+    """
+    Rooms free on every night of the stay that fit the party size.
+    Raises ValueError for dates that can't be understood.
+    """
+    arrival, departure = normalize_stay(check_in, check_out)
+    nights = stay_nights(arrival, departure)
+
+    catalog = await get_room_type_catalog()
+    room_types = matching_room_types(catalog, room_type, guests)
+    codes = [r["code"] for r in room_types]
+
+    booked = await get_booked_counts(codes, nights)
+    quotes = get_pricing_engine(catalog).quote_all(arrival, departure, codes)
+    rooms = []
+    for room in room_types:
+        free = room.get("total_rooms", 0) - booked[room["code"]]
+        if free > 0:
+            quote = quotes[room["code"]]
+            rooms.append(dict(room, available=free, rate_per_night=quote["rate_per_night"], grand_total=quote["grand_total"]))
+
+    return {
+        "check_in": arrival.isoformat(),
+        "check_out": departure.isoformat(),
+        "nights": len(nights),
+        "guests": guests,
+        "rooms": rooms,
+        "spoken_check_in": spoken_date(arrival),
+        "spoken_check_out": spoken_date(departure),
+    }
+
+
+# ============================================
+# Flexible-date search
+# ============================================
+async def get_booked_matrix(codes: list[str], nights: list[str]) -> np.ndarray:
+    """Rooms booked per room type (rows) and night (columns), in one range query."""
+    booked = np.zeros((len(codes), len(nights)), dtype=np.int32)
+    if not codes or not nights:
+        return booked
+    row = {code: i for i, code in enumerate(codes)}
+    column = {night: j for j, night in enumerate(nights)}
+    for code, night, count in await get_storage().inventory.booked_by_night(codes, nights[0], nights[-1]):
+        booked[row[code], column[night]] = count
+    return booked
+
+
+def window_stats(free: np.ndarray, rates: np.ndarray, length: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Every N-night window of every room type at once.
+
+    free and rates are (room types x horizon nights). Returns (room types x windows)
+    arrays of the rooms free on every night of the window (sliding minimum) and the
+    window's total price (sliding sum via cumulative sums).
+    """
+    if free.shape[1] < length:
+        empty = np.zeros((free.shape[0], 0))
+        return empty.astype(free.dtype), empty
+    min_free = sliding_window_view(free, length, axis=1).min(axis=-1)
+    sums = np.cumsum(np.pad(rates, ((0, 0), (1, 0))), axis=1)
+    return min_free, sums[:, length:] - sums[:, :-length]
+
+
+def top_windows(
+    min_free: np.ndarray,
+    totals: np.ndarray,
+    sort: str = "price",
+    top_k: int = 3
+) -> list[tuple[int, int, int, float]]:
+    """
+    Up to top_k bookable windows as (room type row, first night column, rooms free,
+    total price), ordered by price then date, or by date then price.
+    """
+    rows, starts = np.nonzero(min_free > 0)
+    if not len(rows):
+        return []
+    prices = totals[rows, starts]
+    order = np.lexsort((starts, prices) if sort == "price" else (prices, starts))[:top_k]
+    return [(int(rows[i]), int(starts[i]), int(min_free[rows[i], starts[i]]), float(prices[i])) for i in order]
+
+
+async def search_flexible_dates(
+    nights: int,
+    room_type: str = "any",
+    guests: int = 2,
+    start: str = "",
+    horizon_days: int = 90,
+    sort: str = "price",
+    top_k: int = 3
+) -> dict:
+    """
+    Find the cheapest or earliest stays of a given length over a date horizon, for
+    every matching room type in one pass. Raises ValueError for bad input.
+    """
+    if not 1 <= nights <= MAX_STAY_NIGHTS:
+        raise ValueError(f"Stays must be between 1 and {MAX_STAY_NIGHTS} nights")
+    if sort not in ("price", "date"):
+        raise ValueError("Sort must be 'price' or 'date'")
+    horizon_days = max(nights, min(horizon_days, MAX_SEARCH_HORIZON_DAYS))
+    first = parse_stay_date(start) if start.strip() else date.today()
+    if first < date.today():
+        raise ValueError("The search can't start in the past")
+    horizon = stay_nights(first, first + timedelta(days=horizon_days))
+
+    catalog = await get_room_type_catalog()
+    room_types = matching_room_types(catalog, room_type, guests)
+    codes = [r["code"] for r in room_types]
+
+    totals = np.array([r.get("total_rooms", 0) for r in room_types], dtype=np.int32)
+    free = totals[:, None] - await get_booked_matrix(codes, horizon)
+    rates = get_pricing_engine(catalog).nightly_rates(first, len(horizon), codes)
+
+    # Best windows per room type, and overall
+    def window(row: int, col: int, left: int, price: float) -> dict:
+        arrival = first + timedelta(days=col)
+        return {
+            "room_type": room_types[row]["type"],
+            "check_in": arrival.isoformat(),
+            "check_out": (arrival + timedelta(days=nights)).isoformat(),
+            "total": round(price, 2),
+            "left": left,
+            "spoken_check_in": spoken_date(arrival),
+            "spoken_check_out": spoken_date(arrival + timedelta(days=nights)),
+        }
+
+    min_free, window_totals = window_stats(free, rates, nights)
+    window_totals = window_totals * (1 - stay_discount(nights))
+    options = [window(*w) for w in top_windows(min_free, window_totals, sort, top_k)]
+    by_room_type = {}
+    for row, room in enumerate(room_types):
+        ranked = top_windows(min_free[row:row + 1], window_totals[row:row + 1], sort, top_k)
+        if ranked:
+            by_room_type[room["type"]] = [window(row, col, left, price) for _, col, left, price in ranked]
+
+    return {
+        "nights": nights,
+        "horizon_start": first.isoformat(),
+        "horizon_days": horizon_days,
+        "sort": sort,
+        "options": options,
+        "by_room_type": by_room_type,
+    }
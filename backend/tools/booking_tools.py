@@ -2,17 +2,32 @@
 Booking Tools - Business Logic for Reservation Operations
 
 This file contains the business logic functions for booking operations.
-These functions call the FastAPI backend which stores data in MongoDB.
+These functions call the FastAPI backend which stores data in MongoDB, through the
+transport selected in transport.py (HTTP or in-process).
 """
 
-import os
-import httpx
-from datetime import datetime
+from datetime import date, datetime, timedelta
+import hashlib
 import random
 import string
 
-# FastAPI backend URL
-API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000/api/v1")
+from backend.services.idempotency import booking_identity, request_fingerprint
+from backend.services.pricing_service import get_pricing_engine
+from backend.services.room_service import (
+    DEFAULT_ROOM_TYPES,
+    matching_room_types,
+    normalize_stay,
+    resolve_room_type,
+    spoken_date
+)
+from backend.tools.catalog_replica import get_catalog_replica
+from backend.tools.circuit_breaker import CircuitOpenError
+from backend.tools.transport import get_transport
+
+# Tries at creating a booking when the backend times out or fails. Repeating is safe
+# because every try carries the same Idempotency-Key: a booking the backend already
+# stored is returned, not made again.
+CREATE_BOOKING_ATTEMPTS = 2
 
 
 async def check_room_availability(
@@ -26,44 +41,107 @@ async def check_room_availability(
     Calls the FastAPI backend.
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{API_BASE_URL}/rooms/availability",
-                params={
-                    "check_in": check_in,
-                    "check_out": check_out,
-                    "room_type": room_type,
-                    "guests": guests
-                },
-                timeout=10.0
-            )
-            if response.status_code == 200:
-                return response.json()
-            else:
-                # Fallback to local data if API fails
-                return _fallback_availability(check_in, check_out, room_type)
+        response = await get_transport().request(
+            "GET", "availability", "/rooms/availability",
+            params={
+                "check_in": check_in,
+                "check_out": check_out,
+                "room_type": room_type,
+                "guests": guests
+            }
+        )
+        if response.status_code == 200:
+            return response.json()
+        else:
+            # Fallback to local data if API fails
+            return await _fallback_availability(check_in, check_out, room_type, guests)
     except Exception as e:
         print(f"API call failed: {e}")
-        return _fallback_availability(check_in, check_out, room_type)
+        return await _fallback_availability(check_in, check_out, room_type, guests)
 
 
-def _fallback_availability(check_in: str, check_out: str, room_type: str) -> dict:
-    """Fallback availability data when API is not available."""
+async def _fallback_availability(check_in: str, check_out: str, room_type: str, guests: str) -> dict:
+    """
+    Fallback when the API is not available: prices for the stay from the replicated
+    catalog. Free rooms can't be checked offline, so availability is left unknown.
+    """
+    try:
+        arrival, departure = normalize_stay(check_in, check_out)
+    except ValueError as e:
+        return {
+            "available": False,
+            "check_in": check_in,
+            "check_out": check_out,
+            "rooms": [],
+            "message": f"{e}. Could you tell me the dates again?"
+        }
+    
+    try:
+        party_size = max(1, int(guests))
+    except ValueError:
+        party_size = 2
+    catalog = (await get_catalog_replica().room_types())["room_types"]
+    room_types = matching_room_types(catalog, room_type, party_size)
+    
+    # Quoted from the same rate calendar as the backend
+    quotes = get_pricing_engine(catalog).quote_all(arrival, departure, [r["code"] for r in room_types])
     rooms = [
-        {"type": "Standard Room", "rate": 120, "available": 8},
-        {"type": "Deluxe Room", "rate": 150, "available": 5},
-        {"type": "Junior Suite", "rate": 220, "available": 2},
+        dict(r, rate_per_night=quotes[r["code"]]["rate_per_night"], grand_total=quotes[r["code"]]["grand_total"])
+        for r in room_types
     ]
+    prices = ", ".join(f"{r['type']} ${r['grand_total']:g}" for r in rooms)
     return {
-        "available": True,
-        "check_in": check_in,
-        "check_out": check_out,
+        "available": None,
+        "check_in": arrival.isoformat(),
+        "check_out": departure.isoformat(),
         "rooms": rooms,
-        "message": f"We have rooms available from {check_in} to {check_out}."
+        "message": (
+            f"I can't check which rooms are free right now. From {spoken_date(arrival)} to "
+            f"{spoken_date(departure)} the total with tax would be: {prices}."
+        )
     }
 
 
-async def create_room_booking(
+async def find_flexible_dates(
+    nights: str,
+    room_type: str = "any",
+    guests: str = "2",
+    start_date: str = "",
+    sort: str = "price",
+    horizon_days: int = 90
+) -> dict:
+    """
+    Find the cheapest or earliest stays of a given length over the coming months.
+    Calls the FastAPI backend.
+    """
+    try:
+        stay_length = int(str(nights).strip())
+    except ValueError:
+        return {"found": False, "message": "How many nights would you like to stay?"}
+    
+    try:
+        response = await get_transport().request(
+            "GET", "flexible_search", "/rooms/flexible-search",
+            params={
+                "nights": stay_length,
+                "room_type": room_type,
+                "guests": guests,
+                "start": start_date,
+                "horizon_days": horizon_days,
+                "sort": "date" if sort.lower().startswith(("date", "earl")) else "price"
+            }
+        )
+        if response.status_code == 200:
+            return response.json()
+        else:
+            return {"found": False, "message": "I couldn't search the calendar right now. Which dates would you like?"}
+    except Exception as e:
+        print(f"API call failed: {e}")
+        return {"found": False, "message": "I couldn't search the calendar right now. Which dates would you like?"}
+
+
+async def booking_idempotency_key(
+    session_id: str,
     guest_name: str,
     check_in: str,
     check_out: str,
@@ -72,15 +150,49 @@ async def create_room_booking(
     email: str,
     guests: str = "2",
     special_requests: str = ""
+) -> str:
+    """
+    Idempotency-Key for a booking: the same call session asking for the same booking
+    always gets the same key, however the LLM words the dates ('Dec 5', 'December 5')
+    or the room type ('deluxe', 'Deluxe Room') on the repeat.
+    """
+    room_types = (await get_catalog_replica().room_types())["room_types"]
+    identity = booking_identity({
+        "guest_name": guest_name,
+        "check_in": check_in,
+        "check_out": check_out,
+        "room_type": room_type,
+        "phone": phone,
+        "email": email,
+        "guests": guests,
+        "special_requests": special_requests
+    }, room_types)
+    return hashlib.sha256(f"{session_id}\x1f{request_fingerprint(identity)}".encode()).hexdigest()[:32]
+
+
+async def create_room_booking(
+    guest_name: str,
+    check_in: str,
+    check_out: str,
+    room_type: str,
+    phone: str,
+    email: str,
+    guests: str = "2",
+    special_requests: str = "",
+    idempotency_key: str = ""
 ) -> dict:
     """
     Create a new hotel room reservation.
-    Calls the FastAPI backend to store in MongoDB.
+    Calls the FastAPI backend to store in MongoDB. With an idempotency_key, repeats
+    (the LLM calling again, or a retry after a timeout) return the same booking, and no
+    local fallback booking is made: the backend may already hold the real one.
     """
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{API_BASE_URL}/bookings/",
+    headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+    attempts = CREATE_BOOKING_ATTEMPTS if idempotency_key else 1
+    for attempt in range(1, attempts + 1):
+        try:
+            response = await get_transport().request(
+                "POST", "create_booking", "/bookings/",
                 json={
                     "guest_name": guest_name,
                     "check_in": check_in,
@@ -91,22 +203,33 @@ async def create_room_booking(
                     "guests": guests,
                     "special_requests": special_requests
                 },
-                timeout=10.0
+                headers=headers
             )
-            if response.status_code == 200:
-                return response.json()
-            else:
-                # Fallback to local booking
-                return _fallback_create_booking(
-                    guest_name, check_in, check_out, room_type,
-                    phone, email, guests, special_requests
-                )
-    except Exception as e:
-        print(f"API call failed: {e}")
-        return _fallback_create_booking(
-            guest_name, check_in, check_out, room_type,
-            phone, email, guests, special_requests
-        )
+        except CircuitOpenError as e:
+            print(f"API call failed: {e}")
+            break
+        except Exception as e:
+            print(f"API call failed (attempt {attempt} of {attempts}): {e}")
+            continue
+        if response.status_code == 200:
+            return response.json()
+        elif 400 <= response.status_code < 500:
+            # The backend refused the booking (bad dates, no rooms left); don't fake one
+            return {"success": False, "message": response.json().get("detail", "Booking could not be created.")}
+
+    if idempotency_key:
+        # The booking may have been stored before the failure; a made-up confirmation
+        # number would hide it. Asking again with the same key is safe
+        return {
+            "success": False,
+            "message": "I couldn't confirm the booking yet. Let me try again in a moment."
+        }
+
+    # Fallback to local booking
+    return _fallback_create_booking(
+        guest_name, check_in, check_out, room_type,
+        phone, email, guests, special_requests
+    )
 
 
 def _fallback_create_booking(
@@ -118,12 +241,19 @@ def _fallback_create_booking(
     date_part = datetime.now().strftime("%Y%m%d")
     confirmation_number = f"ROOMI-{date_part}-{random_suffix}"
     
-    rates = {"standard": 120, "deluxe": 150, "suite": 220}
-    rate_per_night = rates.get(room_type.lower(), 150)
-    nights = 5
-    room_total = rate_per_night * nights
-    taxes = round(room_total * 0.125, 2)
-    grand_total = room_total + taxes
+    # Price from the same rate calendar as the backend (Deluxe if the type isn't recognized)
+    room = resolve_room_type(room_type, DEFAULT_ROOM_TYPES) or resolve_room_type("DLX", DEFAULT_ROOM_TYPES)
+    try:
+        arrival, departure = normalize_stay(check_in, check_out)
+    except ValueError:
+        arrival = date.today()
+        departure = arrival + timedelta(days=1)
+    quote = get_pricing_engine(DEFAULT_ROOM_TYPES).quote(room["code"], arrival, departure)
+    nights = quote["nights"]
+    rate_per_night = quote["rate_per_night"]
+    room_total = quote["room_total"]
+    taxes = quote["taxes"]
+    grand_total = quote["grand_total"]
     
     return {
         "success": True,
@@ -149,28 +279,25 @@ async def get_booking_details(
     Retrieve booking details from the FastAPI backend.
     """
     try:
-        async with httpx.AsyncClient() as client:
-            if confirmation_number:
-                response = await client.get(
-                    f"{API_BASE_URL}/bookings/{confirmation_number}",
-                    timeout=10.0
-                )
-            elif guest_name:
-                response = await client.get(
-                    f"{API_BASE_URL}/bookings/search/by-name",
-                    params={"guest_name": guest_name},
-                    timeout=10.0
-                )
-            else:
-                return {
-                    "found": False,
-                    "message": "Please provide either a confirmation number or guest name."
-                }
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {"found": False, "message": "Booking not found."}
+        if confirmation_number:
+            response = await get_transport().request(
+                "GET", "get_booking", f"/bookings/{confirmation_number}"
+            )
+        elif guest_name:
+            response = await get_transport().request(
+                "GET", "search_booking", "/bookings/search/by-name",
+                params={"guest_name": guest_name}
+            )
+        else:
+            return {
+                "found": False,
+                "message": "Please provide either a confirmation number or guest name."
+            }
+        
+        if response.status_code == 200:
+            return response.json()
+        else:
+            return {"found": False, "message": "Booking not found."}
     except Exception as e:
         print(f"API call failed: {e}")
         return {"found": False, "message": "Could not retrieve booking. Please try again."}
@@ -181,26 +308,26 @@ async def cancel_room_booking(confirmation_number: str) -> dict:
     Cancel an existing reservation via FastAPI backend.
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                f"{API_BASE_URL}/bookings/{confirmation_number}",
-                timeout=10.0
-            )
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {
-                    "success": False,
-                    "message": "Could not cancel booking. Please check the confirmation number."
-                }
+        response = await get_transport().request(
+            "DELETE", "cancel_booking", f"/bookings/{confirmation_number}"
+        )
+        if response.status_code == 200:
+            return response.json()
+        elif response.status_code == 409:
+            # e.g. the guest has already checked in
+            return {"success": False, "message": response.json().get("detail", "This booking can't be cancelled.")}
+        elif 400 <= response.status_code < 500:
+            return {
+                "success": False,
+                "message": "Could not cancel booking. Please check the confirmation number."
+            }
     except Exception as e:
         print(f"API call failed: {e}")
-        # Fallback response
-        cancellation_ref = f"CXL-{confirmation_number}"
-        return {
-            "success": True,
-            "confirmation_number": confirmation_number,
-            "cancellation_reference": cancellation_ref,
-            "refund_eligible": True,
-            "message": f"Booking cancelled (offline). Reference: {cancellation_ref}."
-        }
\ No newline at end of file
+
+    # The backend couldn't be reached (or failed): the booking may or may not be
+    # cancelled, so don't tell the guest it is
+    return {
+        "success": False,
+        "confirmation_number": confirmation_number,
+        "message": "I couldn't confirm the cancellation right now. Let me try again in a moment."
+    }
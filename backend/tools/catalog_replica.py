@@ -0,0 +1,158 @@
+"""
+Catalog Replica - Room Types and Hotel Info Held in the Call Process
+
+This file keeps a copy of the room type catalog and the hotel information in the
+memory of the call's job process, so get_all_room_types and get_hotel_information
+answer without a backend round-trip. LiveKit runs every call in its own process, so
+the copy is per call process: the full documents (/rooms/types and /rooms/info with
+no filter) are loaded when the process is prewarmed, before its call arrives, and
+refreshed in the background during the call every REPLICA_REFRESH_INTERVAL seconds
+with If-None-Match, which costs a 304 and no body while nothing has changed. Filtered views are derived locally with the backend's
+own payload builders.
+
+When the backend can't be reached the replica keeps serving the last good copy; a
+call process that has never reached it serves the backend's default catalog.
+"""
+
+import asyncio
+import os
+import time
+from typing import Optional
+
+from backend.services.catalog_service import (
+    DEFAULT_ROOM_TYPES,
+    HOTEL_INFO,
+    hotel_info_payload,
+    room_types_payload
+)
+from backend.tools.transport import get_transport
+
+# Seconds between background refreshes
+REPLICA_REFRESH_INTERVAL = float(os.getenv("REPLICA_REFRESH_INTERVAL", "60"))
+
+# Documents replicated: name -> (endpoint, path, params)
+REPLICATED = {
+    "room_types": ("room_types", "/rooms/types", {"filter_type": "all"}),
+    "hotel_info": ("hotel_info", "/rooms/info", {"info_type": "all"}),
+}
+
+
+class CatalogReplica:
+    """In-memory copies of the replicated documents, refreshed by ETag."""
+
+    def __init__(self):
+        # Seed with the defaults so even a call that starts during an outage can answer
+        self._documents: dict[str, dict] = {
+            "room_types": room_types_payload([dict(r) for r in DEFAULT_ROOM_TYPES]),
+            "hotel_info": hotel_info_payload(HOTEL_INFO),
+        }
+        self._etags: dict[str, Optional[str]] = {name: None for name in REPLICATED}
+        self._synced_at: dict[str, Optional[float]] = {name: None for name in REPLICATED}
+        self._refresh_lock = asyncio.Lock()
+        self._loaded_once = False
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {
+            "reads": 0,
+            "refreshes": 0,
+            "updated": 0,
+            "not_modified": 0,
+            "errors": 0,
+        }
+
+    @property
+    def synced(self) -> bool:
+        """True once every document has been loaded from the backend."""
+        return all(at is not None for at in self._synced_at.values())
+
+    async def _refresh_one(self, name: str) -> bool:
+        """Conditional fetch of one document; returns True when it changed."""
+        endpoint, path, params = REPLICATED[name]
+        etag = self._etags[name]
+        headers = {"If-None-Match": etag} if etag else None
+        try:
+            response = await get_transport().request("GET", endpoint, path, params=params, headers=headers)
+        except Exception as e:
+            self._stats["errors"] += 1
+            print(f"Replica refresh of {name} failed: {e}")
+            return False
+
+        if response.status_code == 304:
+            self._stats["not_modified"] += 1
+            self._synced_at[name] = time.monotonic()
+            return False
+        if response.status_code != 200:
+            self._stats["errors"] += 1
+            print(f"Replica refresh of {name} failed: HTTP {response.status_code}")
+            return False
+
+        self._documents[name] = response.json()
+        self._etags[name] = response.headers.get("etag")
+        self._synced_at[name] = time.monotonic()
+        self._stats["updated"] += 1
+        return True
+
+    async def refresh(self) -> int:
+        """Refresh every document; returns how many changed."""
+        async with self._refresh_lock:
+            self._loaded_once = True
+            self._stats["refreshes"] += 1
+            changed = await asyncio.gather(*(self._refresh_one(name) for name in REPLICATED))
+            return sum(changed)
+
+    async def _refresh_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.refresh()
+
+    async def start(self, interval: float = REPLICA_REFRESH_INTERVAL):
+        """Load the documents if this process hasn't yet, then keep them fresh in the background."""
+        if not self.synced:
+            await self.refresh()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop(interval))
+
+    async def stop(self):
+        """Stop background refreshes; the documents stay in memory."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _document(self, name: str) -> dict:
+        # Processes that never called start() (scripts, load tests) load on first use
+        if not self._loaded_once:
+            await self.refresh()
+        self._stats["reads"] += 1
+        return self._documents[name]
+
+    async def room_types(self, filter_type: str = "all") -> dict:
+        """The /rooms/types response for a filter, from memory."""
+        document = await self._document("room_types")
+        return room_types_payload([dict(r) for r in document.get("room_types", [])], filter_type)
+
+    async def hotel_info(self, info_type: str = "all") -> dict:
+        """The /rooms/info response for an info type, from memory."""
+        document = await self._document("hotel_info")
+        return hotel_info_payload(document, info_type)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            **self._stats,
+            "synced": self.synced,
+            "age_s": {
+                name: round(now - at, 1) if at is not None else None for name, at in self._synced_at.items()
+            },
+            "etags": dict(self._etags),
+        }
+
+
+# Replica for this call process
+_replica: Optional[CatalogReplica] = None
+
+
+def get_catalog_replica() -> CatalogReplica:
+    """Get this process's replica, creating it on first use."""
+    global _replica
+    if _replica is None:
+        _replica = CatalogReplica()
+    return _replica
@@ -0,0 +1,231 @@
+"""
+Circuit Breaker - Fast-Fail Protection for Backend Outages
+
+This file keeps one circuit breaker per backend endpoint. After repeated failures or
+latency SLO breaches the breaker opens and tool calls go straight to their fallback
+instead of waiting out the timeout. While open, a background probe checks the backend
+/health endpoint and closes the breaker again.
+
+LiveKit runs every call in its own job process, so the breaker state (closed, open or
+half open, the failure streak and when it opened) lives in a small state file
+(BREAKER_STATE_FILE) that every call process on the host reads and updates under a
+file lock. A call that starts during an outage finds the circuit already open and
+fails fast from its first tool call; any process that finds it open probes /health,
+so it closes again even after the call that opened it has ended. Without a state file
+(platforms without fcntl) each process keeps its own breakers.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # No POSIX file locks (Windows, where LiveKit runs jobs as threads of one process)
+    fcntl = None
+
+# Breaker settings
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_LATENCY_SLO = float(os.getenv("BREAKER_LATENCY_SLO", "2.0"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "10.0"))
+BREAKER_PROBE_INTERVAL = float(os.getenv("BREAKER_PROBE_INTERVAL", "5.0"))
+
+# State file holding the breakers shared by every call process on the host
+BREAKER_STATE_FILE = os.getenv("BREAKER_STATE_FILE", os.path.join(tempfile.gettempdir(), "roomiai-breakers.json"))
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is rejected because the endpoint's breaker is open."""
+
+    def __init__(self, endpoint: str):
+        super().__init__(f"Circuit open for endpoint '{endpoint}'")
+        self.endpoint = endpoint
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with a background health probe. With state_file,
+    its state is shared with every breaker of the same name using that file; without,
+    it is this breaker's own.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], Awaitable[bool]],
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        latency_slo: float = BREAKER_LATENCY_SLO,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+        probe_interval: float = BREAKER_PROBE_INTERVAL,
+        state_file: Optional[str] = None,
+    ):
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.latency_slo = latency_slo
+        self.reset_timeout = reset_timeout
+        self.probe_interval = probe_interval
+        self.state_file = state_file if fcntl is not None else None
+        # Wall-clock time when shared, so every process agrees on when the circuit opened
+        self.clock = time.time if self.state_file else time.monotonic
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        # Counted by this process only
+        self.total_failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self._probe_task: Optional[asyncio.Task] = None
+
+    @contextmanager
+    def _synced(self):
+        """Load the shared state under an exclusive lock and save it back afterwards."""
+        if not self.state_file:
+            yield
+            return
+        fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = b""
+            while chunk := os.read(fd, 65536):
+                raw += chunk
+            breakers = json.loads(raw) if raw else {}
+            shared = breakers.get(self.name)
+            if shared:
+                self.state = shared["state"]
+                self.consecutive_failures = shared["consecutive_failures"]
+                self.opened_at = shared["opened_at"]
+            else:
+                self.state, self.consecutive_failures, self.opened_at = CLOSED, 0, None
+            yield
+            breakers[self.name] = {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "opened_at": self.opened_at,
+            }
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps(breakers).encode())
+        finally:
+            os.close(fd)
+
+    def allow_request(self) -> bool:
+        """Check whether a request may go to the backend right now."""
+        with self._synced():
+            closed = self.state == CLOSED
+        if closed:
+            return True
+        self.rejected += 1
+        # Opened by another call process, which may have ended: probe from here too
+        self._start_probe()
+        return False
+
+    def record_success(self, latency: float):
+        """Record a completed call; calls slower than the SLO count as failures."""
+        if latency > self.latency_slo:
+            self.slow_calls += 1
+            self.record_failure()
+            return
+        with self._synced():
+            self.consecutive_failures = 0
+
+    def record_failure(self):
+        """Record a failed call and open the breaker once the threshold is reached."""
+        self.total_failures += 1
+        with self._synced():
+            self.consecutive_failures += 1
+            opened = self.state == CLOSED and self.consecutive_failures >= self.failure_threshold
+            if opened:
+                self.state = OPEN
+                self.opened_at = self.clock()
+        if opened:
+            print(f"Circuit breaker '{self.name}' opened after {self.consecutive_failures} failures")
+            self._start_probe()
+
+    def _start_probe(self):
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+
+    async def _probe_loop(self):
+        """Probe the backend in the background until it is healthy again."""
+        with self._synced():
+            opened_at = self.opened_at or self.clock()
+        await asyncio.sleep(max(0.0, opened_at + self.reset_timeout - self.clock()))
+        while True:
+            with self._synced():
+                if self.state == CLOSED:
+                    # Closed by another process's probe
+                    return
+                self.state = HALF_OPEN
+            try:
+                healthy = await self.probe()
+            except Exception:
+                healthy = False
+
+            with self._synced():
+                if self.state == CLOSED:
+                    return
+                if healthy:
+                    self.state = CLOSED
+                    self.consecutive_failures = 0
+                    self.opened_at = None
+                else:
+                    self.state = OPEN
+            if healthy:
+                print(f"Circuit breaker '{self.name}' closed, backend is healthy again")
+                return
+            await asyncio.sleep(self.probe_interval)
+
+    def cancel_probe(self):
+        """Stop the background probe (used on worker shutdown)."""
+        if self._probe_task is not None and not self._probe_task.done():
+            self._probe_task.cancel()
+        self._probe_task = None
+
+    def snapshot(self) -> dict:
+        """Get the breaker state for monitoring."""
+        with self._synced():
+            state, opened_at = self.state, self.opened_at
+        return {
+            "state": state,
+            "consecutive_failures": self.consecutive_failures,
+            "total_failures": self.total_failures,
+            "slow_calls": self.slow_calls,
+            "rejected": self.rejected,
+            "open_for_s": round(self.clock() - opened_at, 1) if opened_at else 0.0,
+        }
+
+
+# This process's breakers, keyed by endpoint name; their state is shared through the file
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(endpoint: str, probe: Callable[[], Awaitable[bool]]) -> CircuitBreaker:
+    """Get the breaker for an endpoint, creating it on first use."""
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        breaker = CircuitBreaker(endpoint, probe, state_file=BREAKER_STATE_FILE)
+        _breakers[endpoint] = breaker
+    return breaker
+
+
+def get_breaker_states() -> dict:
+    """Get the state of every endpoint breaker."""
+    return {name: breaker.snapshot() for name, breaker in _breakers.items()}
+
+
+def cancel_all_probes():
+    """Stop all background probes."""
+    for breaker in _breakers.values():
+        breaker.cancel_probe()
@@ -0,0 +1,191 @@
+"""
+HTTP Client - Shared Connection Pool for Agent Tools
+
+This file owns the single httpx.AsyncClient used by every tool function in the call's
+job process. LiveKit runs each call in its own process, so the pool lives for one
+call: connections to the FastAPI backend are kept alive between that call's tool
+calls, so only its first tool turn pays a TCP/TLS handshake. The pool is closed when
+the call's job shuts down; nothing is reused by the next call.
+"""
+
+import asyncio
+import os
+import time
+from typing import Optional
+
+import httpx
+
+from backend.tools.circuit_breaker import CircuitOpenError, cancel_all_probes, get_breaker
+
+# FastAPI backend URL
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000/api/v1")
+
+# Backend health check used by the circuit breaker probe
+HEALTH_CHECK_URL = os.getenv(
+    "HEALTH_CHECK_URL",
+    API_BASE_URL.rstrip("/").removesuffix("/api/v1") + "/health"
+)
+HEALTH_CHECK_TIMEOUT = 2.0
+
+# Connection pool settings
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+
+# Per-endpoint timeouts in seconds (override with HTTP_TIMEOUT_<ENDPOINT>, e.g. HTTP_TIMEOUT_ROOM_TYPES=2)
+DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT_DEFAULT", "10.0"))
+ENDPOINT_TIMEOUTS = {
+    "availability": 5.0,
+    "flexible_search": 5.0,
+    "create_booking": 10.0,
+    "get_booking": 5.0,
+    "search_booking": 5.0,
+    "cancel_booking": 8.0,
+    "room_types": 3.0,
+    "hotel_info": 3.0,
+}
+
+# Client for this call process
+_client: Optional[httpx.AsyncClient] = None
+_slots: Optional[asyncio.Semaphore] = None
+
+_stats = {
+    "requests": 0,
+    "in_use": 0,
+    "waiting": 0,
+    "wait_time_total": 0.0,
+    "wait_time_max": 0.0,
+}
+
+
+def get_endpoint_timeout(endpoint: str) -> float:
+    """Get the timeout for an endpoint, honouring HTTP_TIMEOUT_<ENDPOINT> overrides."""
+    override = os.getenv(f"HTTP_TIMEOUT_{endpoint.upper()}")
+    if override:
+        return float(override)
+    return ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get this process's client, creating it on first use."""
+    global _client, _slots
+    if _client is None or _client.is_closed:
+        http2 = HTTP2_ENABLED
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                print("HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+                http2 = False
+
+        _client = httpx.AsyncClient(
+            base_url=API_BASE_URL,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=DEFAULT_TIMEOUT,
+        )
+        _slots = asyncio.Semaphore(HTTP_MAX_CONNECTIONS)
+    return _client
+
+
+async def api_request(
+    method: str,
+    endpoint: str,
+    path: str,
+    params: Optional[dict] = None,
+    json: Optional[dict] = None,
+    headers: Optional[dict] = None,
+) -> httpx.Response:
+    """
+    Send a request to the backend through the shared pool.
+
+    `endpoint` is the logical endpoint name used for timeouts, stats and the
+    circuit breaker, `path` is relative to API_BASE_URL (e.g. '/rooms/types').
+    Raises CircuitOpenError without touching the network while the breaker is open.
+    """
+    breaker = get_breaker(endpoint, probe_backend_health)
+    if not breaker.allow_request():
+        raise CircuitOpenError(endpoint)
+
+    client = get_http_client()
+
+    # Wait for a pool slot so the time spent queueing for a connection is measurable
+    _stats["waiting"] += 1
+    wait_start = time.perf_counter()
+    async with _slots:
+        wait_time = time.perf_counter() - wait_start
+        _stats["waiting"] -= 1
+        _stats["wait_time_total"] += wait_time
+        _stats["wait_time_max"] = max(_stats["wait_time_max"], wait_time)
+        _stats["requests"] += 1
+        _stats["in_use"] += 1
+        start = time.perf_counter()
+        try:
+            response = await client.request(
+                method,
+                path,
+                params=params,
+                json=json,
+                headers=headers,
+                timeout=get_endpoint_timeout(endpoint),
+            )
+        except Exception:
+            breaker.record_failure()
+            raise
+        finally:
+            _stats["in_use"] -= 1
+
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success(time.perf_counter() - start)
+    return response
+
+
+async def probe_backend_health() -> bool:
+    """Check the backend /health endpoint (used by the circuit breaker probe)."""
+    response = await get_http_client().get(HEALTH_CHECK_URL, timeout=HEALTH_CHECK_TIMEOUT)
+    return response.status_code == 200
+
+
+def get_pool_stats() -> dict:
+    """Get connection pool statistics (in-use, idle, wait time)."""
+    connections = []
+    if _client is not None and not _client.is_closed:
+        pool = getattr(_client._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+
+    idle = sum(1 for c in connections if c.is_idle())
+    requests = _stats["requests"]
+    return {
+        "max_connections": HTTP_MAX_CONNECTIONS,
+        "http2": HTTP2_ENABLED,
+        "open_connections": len(connections),
+        "idle_connections": idle,
+        "in_use": _stats["in_use"],
+        "waiting": _stats["waiting"],
+        "requests": requests,
+        "avg_wait_ms": round(_stats["wait_time_total"] / requests * 1000, 3) if requests else 0.0,
+        "max_wait_ms": round(_stats["wait_time_max"] * 1000, 3),
+    }
+
+
+async def close_http_client(drain_timeout: float = 5.0):
+    """Close this process's client, letting in-flight requests finish first."""
+    global _client
+    cancel_all_probes()
+    if _client is None:
+        return
+
+    deadline = time.monotonic() + drain_timeout
+    while _stats["in_use"] > 0 and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+
+    await _client.aclose()
+    _client = None
+    print("Backend HTTP client closed.")
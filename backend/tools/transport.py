@@ -0,0 +1,194 @@
+"""
+Backend Transport - How Agent Tools Reach the Reservation Backend
+
+This file defines the transport used by the tool functions to talk to the backend.
+HttpTransport sends requests to the FastAPI server over the shared connection pool.
+InProcessTransport calls the router functions directly when the agent and backend run
+on the same machine, sharing the storage engine and skipping HTTP and JSON entirely.
+Set BACKEND_TRANSPORT to 'http' (default) or 'inprocess' to choose.
+"""
+
+import asyncio
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+from backend.tools.http_client import api_request, close_http_client
+
+BACKEND_TRANSPORT = os.getenv("BACKEND_TRANSPORT", "http").lower()
+
+# Callbacks told about every backend request: (endpoint, seconds, status_code or None)
+_request_observers: list[Callable[[str, float, Optional[int]], None]] = []
+
+
+def add_request_observer(observer: Callable[[str, float, Optional[int]], None]):
+    """Register a callback for backend request timings (used by latency tracing)."""
+    if observer not in _request_observers:
+        _request_observers.append(observer)
+
+
+class BackendResponse:
+    """Minimal response object with the same interface the tools use on httpx.Response."""
+
+    def __init__(self, status_code: int, payload: Any, headers: Optional[dict] = None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = headers or {}
+
+    def json(self) -> Any:
+        return self._payload
+
+
+def _decode_body(body: bytes) -> Any:
+    """JSON payload of a pre-serialized response body (None for an empty body, e.g. 304)."""
+    return json.loads(body) if body else None
+
+
+class BackendTransport(ABC):
+    """Base class for backend transports."""
+
+    name = "base"
+
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        path: str,
+        params: Optional[dict] = None,
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+    ):
+        """Send a request and return an object with `status_code`, `headers` and `json()`."""
+        start = time.perf_counter()
+        status_code = None
+        try:
+            response = await self._send(method, endpoint, path, params, json, headers)
+            status_code = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            for observer in _request_observers:
+                observer(endpoint, elapsed, status_code)
+
+    @abstractmethod
+    async def _send(self, method, endpoint, path, params, json, headers=None):
+        """Send the request over this transport."""
+
+    async def close(self):
+        """Release transport resources."""
+
+
+class HttpTransport(BackendTransport):
+    """Calls the FastAPI backend over HTTP through the shared connection pool."""
+
+    name = "http"
+
+    async def _send(self, method, endpoint, path, params, json, headers=None):
+        return await api_request(method, endpoint, path, params=params, json=json, headers=headers)
+
+    async def close(self):
+        await close_http_client()
+
+
+class InProcessTransport(BackendTransport):
+    """Calls the router functions directly, in the agent's own event loop."""
+
+    name = "inprocess"
+
+    def __init__(self):
+        self._connect_lock = asyncio.Lock()
+        self._connected = False
+
+    async def _ensure_connected(self):
+        """Open the storage engine the first time a tool needs it."""
+        if self._connected:
+            return
+        from backend.database.storage import open_storage
+
+        async with self._connect_lock:
+            if not self._connected:
+                await open_storage()
+            self._connected = True
+
+    async def _dispatch(self, endpoint: str, path: str, params: dict, json: dict, headers: dict):
+        from backend.models.booking import BookingCreate
+        from backend.routers import booking, rooms
+
+        # Path parameter for /bookings/{confirmation_number}
+        last_segment = path.rstrip("/").rsplit("/", 1)[-1]
+
+        if endpoint == "availability":
+            return await rooms.check_availability(**params)
+        if endpoint == "flexible_search":
+            return await rooms.flexible_date_search(**params)
+        if endpoint == "room_types":
+            return await rooms.get_room_types(**params, if_none_match=headers.get("If-None-Match"))
+        if endpoint == "hotel_info":
+            return await rooms.get_hotel_info(**params, if_none_match=headers.get("If-None-Match"))
+        if endpoint == "create_booking":
+            return await booking.create_booking(BookingCreate(**json), idempotency_key=headers.get("Idempotency-Key"))
+        if endpoint == "get_booking":
+            return await booking.get_booking(last_segment)
+        if endpoint == "search_booking":
+            return await booking.search_booking_by_name(**params)
+        if endpoint == "cancel_booking":
+            return await booking.cancel_booking(last_segment, **params)
+        raise ValueError(f"No in-process route for endpoint '{endpoint}'")
+
+    async def _send(self, method, endpoint, path, params, json, headers=None):
+        from fastapi import HTTPException, Response
+        from fastapi.encoders import jsonable_encoder
+
+        await self._ensure_connected()
+        try:
+            result = await self._dispatch(endpoint, path, params or {}, json or {}, headers or {})
+        except HTTPException as e:
+            return BackendResponse(e.status_code, {"detail": e.detail})
+
+        # Routes that serialize their own body (e.g. the cached room types)
+        if isinstance(result, Response):
+            return BackendResponse(result.status_code, _decode_body(result.body), dict(result.headers))
+
+        # Same JSON-compatible shape the HTTP transport would return
+        return BackendResponse(200, jsonable_encoder(result))
+
+    async def close(self):
+        from backend.database.storage import close_storage
+
+        if self._connected:
+            await close_storage()
+            self._connected = False
+
+
+# Transport for this worker process
+_transport: Optional[BackendTransport] = None
+
+
+def get_transport() -> BackendTransport:
+    """Get the transport selected by BACKEND_TRANSPORT, creating it on first use."""
+    global _transport
+    if _transport is None:
+        if BACKEND_TRANSPORT == "inprocess":
+            _transport = InProcessTransport()
+        elif BACKEND_TRANSPORT == "http":
+            _transport = HttpTransport()
+        else:
+            raise ValueError(f"Unknown BACKEND_TRANSPORT '{BACKEND_TRANSPORT}' (use 'http' or 'inprocess')")
+        print(f"Backend transport: {_transport.name}")
+    return _transport
+
+
+def set_transport(transport: BackendTransport):
+    """Use a specific transport for this process (e.g. the load-test in-memory backend)."""
+    global _transport
+    _transport = transport
+
+
+async def close_transport():
+    """Close the active transport."""
+    global _transport
+    if _transport is not None:
+        await _transport.close()
+        _transport = None
@@ -0,0 +1,7 @@
+"""
+Benchmarks Package - RoomiAI Backend Performance Checks
+
+This package contains standalone benchmark scripts for the reservation backend. Each
+script runs with `python -m benchmarks.<name>` and prints a JSON report. Scripts that
+need MongoDB use MONGODB_URL and a separate benchmark database, never the live one.
+"""
@@ -0,0 +1,149 @@
+"""
+Booking Contention Benchmark - Hundreds of Callers Racing for One Room Type
+
+This file starts many concurrent bookers against the same room type and stay, the
+situation of several phone calls asking for the last Junior Suite or the single
+Family Room at once. It compares the atomic reservation path (conditional per-night
+updates with rollback) to the read-then-increment path that bookings used before,
+and checks that no night ends up booked past total_rooms. A share of the bookers can
+take a short hold and hang up, to check that expired holds give their rooms back.
+
+Needs MongoDB (MONGODB_URL); it works in a separate 'roomiai_bench' database.
+
+Example:
+    python -m benchmarks.booking_contention --bookers 300 --total-rooms 1 --nights 3
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+from backend.database.storage import get_storage
+from backend.services.room_service import (
+    adjust_inventory,
+    create_hold,
+    expire_holds,
+    get_booked_counts,
+    reserve_inventory,
+    stay_nights
+)
+from benchmarks.common import BENCH_MONGODB_URL, drop_bench_database, percentiles, use_bench_database, write_report
+
+ROOM_CODE = "BENCH"
+
+
+async def atomic_booker(index: int, nights: list[str], total_rooms: int) -> bool:
+    return await reserve_inventory(ROOM_CODE, nights, total_rooms, f"BOOKER-{index}")
+
+
+async def naive_booker(index: int, nights: list[str], total_rooms: int) -> bool:
+    """Check the counters, then increment them: the race the atomic path removes."""
+    booked = await get_booked_counts([ROOM_CODE], nights)
+    if booked[ROOM_CODE] >= total_rooms:
+        return False
+    await adjust_inventory(ROOM_CODE, nights, 1)
+    return True
+
+
+async def abandoning_booker(index: int, nights: list[str], total_rooms: int, ttl: float) -> bool:
+    """Hold a room and hang up without booking."""
+    return await create_hold(ROOM_CODE, nights, total_rooms, ttl=ttl) is not None
+
+
+async def night_counts(nights: list[str]) -> dict[str, int]:
+    counters = await get_storage().inventory.booked_by_night([ROOM_CODE], min(nights), max(nights))
+    return {night: booked for _, night, booked in counters if night in nights}
+
+
+async def run_mode(mode: str, args) -> dict:
+    await use_bench_database(args.mongodb_url, args.database)
+    first_night = date.today() + timedelta(days=30)
+    all_nights = stay_nights(first_night, first_night + timedelta(days=args.nights + args.spread))
+
+    def stay_for(index: int) -> list[str]:
+        # Overlapping stays when --spread > 0, the same stay otherwise
+        start = random.randint(0, args.spread) if args.spread else 0
+        return all_nights[start:start + args.nights]
+
+    abandon = int(args.bookers * args.abandon) if mode == "atomic" else 0
+    latencies: list[float] = []
+
+    async def timed(index: int) -> bool:
+        nights = stay_for(index)
+        start = time.perf_counter()
+        try:
+            if index < abandon:
+                await abandoning_booker(index, nights, args.total_rooms, args.hold_ttl)
+                return False
+            if mode == "atomic":
+                return await atomic_booker(index, nights, args.total_rooms)
+            return await naive_booker(index, nights, args.total_rooms)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    results = await asyncio.gather(*(timed(i) for i in random.sample(range(args.bookers), args.bookers)))
+    wall = time.perf_counter() - wall_start
+
+    counts = await night_counts(all_nights)
+    peak = max(counts.values(), default=0)
+
+    # Abandoned holds expire and give their rooms back
+    expired = 0
+    if abandon:
+        await asyncio.sleep(args.hold_ttl)
+        expired = await expire_holds()
+    counts_after_expiry = await night_counts(all_nights)
+
+    await drop_bench_database(args.database)
+    return {
+        "mode": mode,
+        "bookings": sum(results),
+        "rejected": args.bookers - abandon - sum(results),
+        "abandoned_holds": abandon,
+        "expired_holds_released": expired,
+        "peak_booked_per_night": peak,
+        "overbooked": peak > args.total_rooms,
+        "booked_after_expiry": max(counts_after_expiry.values(), default=0),
+        "wall_s": round(wall, 3),
+        "bookers_per_s": round(args.bookers / wall, 1) if wall else None,
+        "latency": percentiles(latencies),
+    }
+
+
+async def run_benchmark(args) -> dict:
+    report = {
+        "config": {
+            "bookers": args.bookers,
+            "total_rooms": args.total_rooms,
+            "nights": args.nights,
+            "spread": args.spread,
+            "abandon": args.abandon,
+        },
+    }
+    for mode in args.modes.split(","):
+        report[mode] = await run_mode(mode, args)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent booking contention benchmark")
+    parser.add_argument("--bookers", type=int, default=300, help="concurrent callers booking the same room type")
+    parser.add_argument("--total-rooms", type=int, default=1, help="rooms of the contested type")
+    parser.add_argument("--nights", type=int, default=3, help="nights per stay")
+    parser.add_argument("--spread", type=int, default=0, help="random start offset in nights (overlapping stays)")
+    parser.add_argument("--abandon", type=float, default=0.1, help="share of callers who hold a room and hang up")
+    parser.add_argument("--hold-ttl", type=float, default=0.5, help="seconds before abandoned holds expire")
+    parser.add_argument("--modes", default="atomic,naive", help="atomic, naive or both")
+    parser.add_argument("--database", default="roomiai_bench", help="benchmark database (dropped before and after)")
+    parser.add_argument("--mongodb-url", default=BENCH_MONGODB_URL, help="MongoDB server for the benchmark database")
+    parser.add_argument("--output", default="", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    write_report(asyncio.run(run_benchmark(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
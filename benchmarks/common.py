@@ -0,0 +1,68 @@
+"""
+Benchmark Helpers - Shared Timing and Reporting Utilities
+
+This file contains the small helpers the benchmark scripts share: latency percentiles,
+a connection to a throwaway benchmark database, and JSON report output.
+"""
+
+import json
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from backend.database import connection
+from backend.database.mongo_storage import MongoStorage
+from backend.database.storage import set_storage
+
+BENCH_DATABASE = "roomiai_bench"
+
+# Benchmarks drop their database, so they never default to the app's MONGODB_URL; a
+# server other than a local one has to be named with --mongodb-url
+BENCH_MONGODB_URL = "mongodb://localhost:27017"
+
+
+def percentiles(samples: list[float]) -> dict:
+    """p50/p95/p99/max in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(pct: float) -> float:
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+    return {
+        "count": len(ordered),
+        "p50_ms": round(pick(50) * 1000, 3),
+        "p95_ms": round(pick(95) * 1000, 3),
+        "p99_ms": round(pick(99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _check_bench_database(name: str):
+    if name == connection.DATABASE_NAME:
+        raise ValueError(f"Refusing to use '{name}' as a benchmark database: it is the app's database")
+
+
+async def use_bench_database(url: str = BENCH_MONGODB_URL, name: str = BENCH_DATABASE):
+    """Point the shared connection, and the Mongo storage engine, at an empty benchmark database."""
+    _check_bench_database(name)
+    connection.client = AsyncIOMotorClient(url)
+    await connection.client.drop_database(name)
+    connection.db = connection.client[name]
+    set_storage(MongoStorage())
+
+
+async def drop_bench_database(name: str = BENCH_DATABASE):
+    """Remove the benchmark database and close the connection."""
+    _check_bench_database(name)
+    await connection.client.drop_database(name)
+    connection.client.close()
+
+
+def write_report(report: dict, output: str = ""):
+    """Print the report as JSON, and save it when an output path is given."""
+    text = json.dumps(report, indent=2)
+    print(text)
+    if output:
+        with open(output, "w") as f:
+            f.write(text)
@@ -0,0 +1,282 @@
+"""
+Endpoint Benchmark - Throughput and Latency of the API Routes, with a Baseline Check
+
+This file starts the FastAPI app in process (lifespan included) on a storage engine
+that needs no database server, grows the bookings to each dataset size in turn (by
+default 1k, 100k and 1M bookings) and, at each size, drives every route the agent
+calls at a fixed concurrency through httpx's ASGI transport:
+
+    POST /bookings, GET /bookings/{confirmation_number}, GET /bookings/search/by-name,
+    GET /bookings, GET /rooms/types, GET /rooms/availability, GET /rooms/info
+
+It records requests per second and p50/p95/p99 latency per route to JSON. Every route
+is measured --repeats times, in rounds over all routes, and the median of the runs is
+reported, so one noisy run (a GC pause, another process on the machine) neither
+fails the check nor ends up in the baseline. With --save-baseline the report becomes
+the stored baseline; otherwise each result is compared with it, and the script exits
+with status 1 when a route's throughput or p95 latency is worse than the baseline by
+more than --tolerance. Baselines are machine specific, so save one on the machine
+that runs the check.
+
+Example:
+    python -m benchmarks.endpoints --sizes 1000,100000,1000000 --concurrency 16
+    python -m benchmarks.endpoints --sizes 1000,100000 --save-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import httpx
+
+from backend.database.storage import close_storage, create_storage, get_storage, set_storage
+from backend.main import app
+from benchmarks.common import percentiles, write_report
+from benchmarks.name_lookup import FIRST_NAMES, LAST_NAMES, mishear
+from benchmarks.storage_engines import make_booking
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "endpoints.json")
+
+ROOM_TYPES = ["Standard Room", "Deluxe Room", "Junior Suite", "Executive Suite", "Family Room"]
+
+# Statuses that count as served; 404 and 409 are normal answers for these calls
+EXPECTED_STATUS = {200, 404, 409}
+
+
+def random_stay(horizon_days: int = 170) -> tuple[str, str]:
+    arrival = date.today() + timedelta(days=random.randint(1, horizon_days))
+    return arrival.isoformat(), (arrival + timedelta(days=random.randint(1, 3))).isoformat()
+
+
+def random_guest() -> str:
+    return f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}"
+
+
+def endpoint_requests(size: int) -> dict:
+    """Per route, a function returning the next (method, url, params, json) to send."""
+
+    def create_booking():
+        check_in, check_out = random_stay()
+        return "POST", "/api/v1/bookings/", None, {
+            "guest_name": random_guest(),
+            "email": "bench@example.com",
+            "phone": "+1-555-0000",
+            "check_in": check_in,
+            "check_out": check_out,
+            "room_type": random.choice(ROOM_TYPES),
+            "guests": "2",
+        }
+
+    def get_booking():
+        return "GET", f"/api/v1/bookings/BENCH-{random.randrange(size):08d}", None, None
+
+    def search_by_name():
+        return "GET", "/api/v1/bookings/search/by-name", {"guest_name": mishear(random_guest())}, None
+
+    def list_bookings():
+        params = {"limit": 20}
+        if random.random() < 0.5:
+            params["status"] = "confirmed"
+        return "GET", "/api/v1/bookings/", params, None
+
+    def room_types():
+        return "GET", "/api/v1/rooms/types", None, None
+
+    def availability():
+        check_in, check_out = random_stay()
+        return "GET", "/api/v1/rooms/availability", {"check_in": check_in, "check_out": check_out}, None
+
+    def hotel_info():
+        return "GET", "/api/v1/rooms/info", {"info_type": random.choice(["all", "timings", "location", "policies"])}, None
+
+    return {
+        "POST /bookings": create_booking,
+        "GET /bookings/{id}": get_booking,
+        "GET /bookings/search/by-name": search_by_name,
+        "GET /bookings": list_bookings,
+        "GET /rooms/types": room_types,
+        "GET /rooms/availability": availability,
+        "GET /rooms/info": hotel_info,
+    }
+
+
+async def drive(client: httpx.AsyncClient, next_request, requests: int, concurrency: int) -> dict:
+    """Send requests calls from concurrency workers; throughput, latency and errors."""
+    latencies, errors = [], {}
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            method, url, params, body = next_request()
+            start = time.perf_counter()
+            response = await client.request(method, url, params=params, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code not in EXPECTED_STATUS:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else None,
+        **percentiles(latencies),
+        "errors": errors,
+    }
+
+
+def median_run(runs: list[dict]) -> dict:
+    """Median of each figure over repeated runs of a route, with every run's p95."""
+    result = {
+        key: round(statistics.median(run[key] for run in runs), 3)
+        for key in ("requests_per_second", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+    }
+    errors = {}
+    for run in runs:
+        for status, count in run["errors"].items():
+            errors[status] = errors.get(status, 0) + count
+    return {
+        **result,
+        "count": sum(run["count"] for run in runs),
+        "runs": len(runs),
+        "p95_runs_ms": [run["p95_ms"] for run in runs],
+        "errors": errors,
+    }
+
+
+async def grow_to(size: int, loaded: int) -> float:
+    """Insert bookings until the engine holds size of them; returns seconds taken."""
+    bookings = get_storage().bookings
+    start = time.perf_counter()
+    now = datetime.utcnow()
+    for i in range(loaded, size):
+        await bookings.insert(make_booking(i, now - timedelta(seconds=i)))
+    return time.perf_counter() - start
+
+
+async def run_benchmark(args) -> dict:
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+    report = {"config": {
+        "engine": args.engine, "sizes": sizes, "requests": args.requests, "repeats": args.repeats,
+        "concurrency": args.concurrency,
+    }}
+
+    workdir = tempfile.mkdtemp(prefix="roomiai-bench-")
+    storage = create_storage(args.engine)
+    if args.engine == "sqlite":
+        storage.path = os.path.join(workdir, "bench.db")
+    set_storage(storage)
+
+    # The app's own lifespan opens the engine, builds indexes and seeds the catalog
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with app.router.lifespan_context(app), \
+                httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            loaded = 0
+            for size in sizes:
+                load_s = await grow_to(size, loaded)
+                loaded = size
+                routes = endpoint_requests(size)
+                for route, next_request in routes.items():
+                    random.seed(f"{args.seed}:{size}:{route}")
+                    # A few unmeasured calls first, so caches and code paths are warm
+                    await drive(client, next_request, args.warmup, 1)
+                # Rounds over every route, so a slow spell hits one run of several routes
+                # rather than every run of one
+                runs = {route: [] for route in routes}
+                for repeat in range(args.repeats):
+                    for route, next_request in routes.items():
+                        random.seed(f"{args.seed}:{size}:{route}:{repeat}")
+                        runs[route].append(await drive(client, next_request, args.requests, args.concurrency))
+                results = {"load_s": round(load_s, 2)}
+                results.update({route: median_run(route_runs) for route, route_runs in runs.items()})
+                report[str(size)] = results
+                print(f"{size} bookings: " + ", ".join(
+                    f"{route} {r['requests_per_second']}/s p95 {r['p95_ms']}ms"
+                    for route, r in results.items() if route != "load_s"
+                ))
+    finally:
+        await close_storage()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Routes slower than the baseline by more than tolerance (a fraction)."""
+    regressions = []
+    for size, routes in report.items():
+        if size == "config" or size not in baseline:
+            continue
+        for route, result in routes.items():
+            before = baseline[size].get(route)
+            if route == "load_s" or not before:
+                continue
+            if result["requests_per_second"] < before["requests_per_second"] * (1 - tolerance):
+                regressions.append(
+                    f"{route} at {size} bookings: {result['requests_per_second']} req/s, "
+                    f"baseline {before['requests_per_second']}"
+                )
+            if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{route} at {size} bookings: p95 {result['p95_ms']}ms, baseline {before['p95_ms']}ms"
+                )
+            if result["errors"]:
+                regressions.append(f"{route} at {size} bookings: errors {result['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API route throughput and latency against a stored baseline")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="booking counts to measure at")
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per route, size and run")
+    parser.add_argument("--repeats", type=int, default=5, help="runs per route and size; the median is reported")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per route before timing")
+    parser.add_argument("--engine", default="memory", choices=["memory", "sqlite"], help="storage engine")
+    parser.add_argument("--seed", type=int, default=7, help="random seed (same requests on every run)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="stored baseline report")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--output", default="", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        write_report(report, args.output)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        write_report(report, args.output)
+        print(f"No baseline at {args.baseline}; run with --save-baseline to store one")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("config", {}).get("engine") != args.engine:
+        print(f"Baseline was measured on the {baseline['config'].get('engine')} engine")
+    if baseline.get("config", {}).get("repeats", 1) < 3:
+        print("Baseline is a single run per route; save it again with --repeats 3 or more for a stable check")
+    report["regressions"] = compare(report, baseline, args.tolerance)
+    write_report(report, args.output)
+    if report["regressions"]:
+        print("Regressed against the baseline:\n  " + "\n  ".join(report["regressions"]))
+        sys.exit(1)
+    print(f"No regressions beyond {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Name Lookup Benchmark - Guest-Name Search as the Bookings Collection Grows
+
+This file fills a benchmark bookings collection in steps (by default 10k, 100k and
+1M bookings) and, at each size, times the phonetic name lookup used by
+GET /bookings/search/by-name against the unanchored case-insensitive regex it
+replaced. Queries are names of stored guests respelled the way speech-to-text
+mishears them ('Jon Smyth' for 'John Smith'). Besides latency it reports how often
+the top result is the intended guest, and how many the regex finds at all.
+
+Needs MongoDB (MONGODB_URL); it works in a separate 'roomiai_bench' database.
+
+Example:
+    python -m benchmarks.name_lookup --sizes 10000,100000,1000000 --queries 200
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import time
+from datetime import datetime, timedelta
+
+from backend.database.connection import get_bookings_collection, get_database
+from backend.database.schemas import ensure_indexes
+from backend.services.name_search import name_index_fields, name_tokens, search_bookings_by_name
+from benchmarks.common import BENCH_MONGODB_URL, drop_bench_database, percentiles, use_bench_database, write_report
+
+FIRST_NAMES = [
+    "John", "Jane", "Michael", "Sarah", "David", "Emily", "James", "Jessica", "Robert", "Ashley",
+    "William", "Amanda", "Richard", "Stephanie", "Thomas", "Jennifer", "Christopher", "Elizabeth",
+    "Daniel", "Catherine", "Matthew", "Rachel", "Anthony", "Nicole", "Mark", "Megan", "Steven",
+    "Laura", "Philip", "Rebecca", "Brian", "Claire", "Kevin", "Sophie", "Mohammed", "Fatima",
+    "Ahmed", "Aisha", "Carlos", "Maria", "Jose", "Lucia", "Wei", "Mei", "Hiroshi", "Yuki",
+    "Raj", "Priya", "Sean", "Siobhan", "Lars", "Ingrid", "Pierre", "Camille", "Giovanni", "Chiara",
+]
+
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Miller", "Davis", "Garcia", "Rodriguez",
+    "Wilson", "Martinez", "Anderson", "Taylor", "Thomas", "Hernandez", "Moore", "Martin", "Jackson",
+    "Thompson", "White", "Lopez", "Lee", "Gonzalez", "Harris", "Clark", "Lewis", "Robinson",
+    "Walker", "Perez", "Hall", "Young", "Allen", "Sanchez", "Wright", "King", "Scott", "Green",
+    "Baker", "Adams", "Nelson", "Hill", "Ramirez", "Campbell", "Mitchell", "Roberts", "Carter",
+    "Phillips", "Evans", "Turner", "Torres", "Parker", "Collins", "Edwards", "Stewart", "Morris",
+    "Nguyen", "Murphy", "Rivera", "Cook", "Rogers", "Morgan", "Peterson", "Cooper", "Reed",
+    "Bailey", "Bell", "Gomez", "Kelly", "Howard", "Ward", "Cox", "Diaz", "Richardson", "Wood",
+    "Watson", "Brooks", "Bennett", "Gray", "James", "Reyes", "Schmidt", "Khan", "Patel", "Kowalski",
+]
+
+# Respellings speech-to-text produces for names that sound the same
+MISHEARINGS = [
+    ("ph", "f"), ("th", "t"), ("y", "i"), ("i", "y"), ("ck", "k"), ("c", "k"), ("k", "c"),
+    ("ee", "ea"), ("ie", "y"), ("oh", "o"), ("sch", "sh"), ("z", "s"), ("ll", "l"), ("tt", "t"),
+]
+
+
+def mishear(name: str) -> str:
+    """A plausible speech-to-text spelling of a name (one or two sound-alike changes)."""
+    spelled = name.lower()
+    for before, after in random.sample(MISHEARINGS, len(MISHEARINGS)):
+        if before in spelled and random.random() < 0.6:
+            spelled = spelled.replace(before, after, 1)
+    return spelled.title()
+
+
+def make_booking(index: int, created_at: datetime) -> dict:
+    guest_name = f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}"
+    return {
+        "confirmation_number": f"BENCH-{index:08d}",
+        "guest_name": guest_name,
+        **name_index_fields(guest_name),
+        "email": f"guest{index}@example.com",
+        "phone": f"+1-555-{index % 10000:04d}",
+        "room_type": "Deluxe Room",
+        "status": "confirmed",
+        "created_at": created_at,
+    }
+
+
+async def grow_to(size: int, batch_size: int) -> float:
+    """Insert bookings until the collection holds size of them; returns seconds taken."""
+    collection = get_bookings_collection()
+    start_count = await collection.estimated_document_count()
+    start = time.perf_counter()
+    now = datetime.utcnow()
+    for first in range(start_count, size, batch_size):
+        batch = [make_booking(i, now - timedelta(minutes=i)) for i in range(first, min(first + batch_size, size))]
+        await collection.insert_many(batch, ordered=False)
+    return time.perf_counter() - start
+
+
+async def regex_lookup(guest_name: str) -> list[dict]:
+    """The lookup the name index replaced: unanchored, case-insensitive regex over every booking."""
+    cursor = get_bookings_collection().find(
+        {"guest_name": {"$regex": re.escape(guest_name), "$options": "i"}}, {"_id": 0}
+    )
+    return await cursor.to_list(length=10)
+
+
+async def time_lookups(lookup, queries: list[tuple[str, str]]) -> dict:
+    latencies = []
+    top_hits = found = 0
+    for spoken, intended in queries:
+        start = time.perf_counter()
+        results = await lookup(spoken)
+        latencies.append(time.perf_counter() - start)
+        found += bool(results)
+        top_hits += bool(results) and name_tokens(results[0]["guest_name"]) == name_tokens(intended)
+    return {
+        "latency": percentiles(latencies),
+        "found_rate": round(found / len(queries), 3),
+        "top_match_rate": round(top_hits / len(queries), 3),
+    }
+
+
+async def run_benchmark(args) -> dict:
+    await use_bench_database(args.mongodb_url, args.database)
+    await ensure_indexes(get_database())
+
+    report = {"config": {"sizes": args.sizes, "queries": args.queries, "regex_queries": args.regex_queries}}
+    for size in [int(s) for s in args.sizes.split(",")]:
+        load_s = await grow_to(size, args.batch_size)
+
+        # Names of stored guests, as a caller's speech-to-text might spell them
+        sample = await get_bookings_collection().aggregate(
+            [{"$sample": {"size": args.queries}}, {"$project": {"_id": 0, "guest_name": 1}}]
+        ).to_list(length=args.queries)
+        queries = [(mishear(b["guest_name"]), b["guest_name"]) for b in sample]
+
+        report[str(size)] = {
+            "load_s": round(load_s, 2),
+            "phonetic_index": await time_lookups(search_bookings_by_name, queries),
+            "regex_scan": await time_lookups(regex_lookup, queries[:args.regex_queries]),
+        }
+        print(f"{size} bookings: {report[str(size)]['phonetic_index']['latency']}")
+
+    await drop_bench_database(args.database)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Guest-name lookup latency as the bookings collection grows")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="collection sizes to measure at")
+    parser.add_argument("--queries", type=int, default=200, help="name lookups per size")
+    parser.add_argument("--regex-queries", type=int, default=50, help="lookups per size for the (slow) regex scan")
+    parser.add_argument("--batch-size", type=int, default=10000, help="bookings per insert_many")
+    parser.add_argument("--database", default="roomiai_bench", help="benchmark database (dropped before and after)")
+    parser.add_argument("--mongodb-url", default=BENCH_MONGODB_URL, help="MongoDB server for the benchmark database")
+    parser.add_argument("--output", default="", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    write_report(asyncio.run(run_benchmark(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
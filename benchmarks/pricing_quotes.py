@@ -0,0 +1,110 @@
+"""
+Pricing Micro-Benchmark - Stay Quotes per Second
+
+This file measures how many stay quotes the pricing engine produces per second when
+quoting every room type for a date range in one vectorized pass over the rate
+calendar. It compares that to pricing the same stays night by night in plain Python,
+reports the largest difference between the two (float rounding, a few cents at most)
+and the cost of building the calendar. No database is needed.
+
+Example:
+    python -m benchmarks.pricing_quotes --stays 20000
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from backend.services.pricing_service import (
+    SEASONS,
+    STAY_DISCOUNTS,
+    TAX_RATE,
+    WEEKEND_MULTIPLIER,
+    WEEKEND_NIGHTS,
+    PricingEngine
+)
+from backend.services.room_service import DEFAULT_ROOM_TYPES
+from benchmarks.common import write_report
+
+
+def loop_quote(room: dict, arrival: date, departure: date) -> float:
+    """Reference grand total, one night at a time."""
+    subtotal = 0.0
+    night = arrival
+    while night < departure:
+        multiplier = 1.0
+        for (first_month, first_day), (last_month, last_day), season in SEASONS:
+            if (first_month, first_day) <= (night.month, night.day) <= (last_month, last_day):
+                multiplier = season
+        if night.weekday() in WEEKEND_NIGHTS:
+            multiplier *= WEEKEND_MULTIPLIER
+        subtotal += round(room["rate"] * multiplier, 2)
+        night += timedelta(days=1)
+
+    nights = (departure - arrival).days
+    discount = next((d for minimum, d in STAY_DISCOUNTS if nights >= minimum), 0.0)
+    room_total = round(subtotal - round(subtotal * discount, 2), 2)
+    return round(room_total + round(room_total * TAX_RATE, 2), 2)
+
+
+def random_stays(count: int, horizon_days: int, max_nights: int) -> list[tuple[date, date]]:
+    today = date.today()
+    stays = []
+    for _ in range(count):
+        arrival = today + timedelta(days=random.randrange(horizon_days))
+        stays.append((arrival, arrival + timedelta(days=random.randint(1, max_nights))))
+    return stays
+
+
+def run_benchmark(args) -> dict:
+    room_types = [dict(r) for r in DEFAULT_ROOM_TYPES]
+    stays = random_stays(args.stays, args.horizon, args.max_nights)
+
+    start = time.perf_counter()
+    engine = PricingEngine(room_types)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = [engine.quote_arrays(arrival, departure)["grand_total"] for arrival, departure in stays]
+    vectorized_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    looped = [[loop_quote(room, arrival, departure) for room in room_types] for arrival, departure in stays]
+    loop_s = time.perf_counter() - start
+
+    max_difference = max(
+        abs(float(a) - b) for quoted, expected in zip(vectorized, looped) for a, b in zip(quoted, expected)
+    )
+    room_quotes = args.stays * len(room_types)
+    return {
+        "config": {"stays": args.stays, "room_types": len(room_types), "horizon_days": args.horizon, "max_nights": args.max_nights},
+        "calendar_build_ms": round(build_s * 1000, 3),
+        "vectorized": {
+            "stays_per_s": round(args.stays / vectorized_s),
+            "room_quotes_per_s": round(room_quotes / vectorized_s),
+            "us_per_stay": round(vectorized_s / args.stays * 1e6, 2),
+        },
+        "per_night_loop": {
+            "stays_per_s": round(args.stays / loop_s),
+            "room_quotes_per_s": round(room_quotes / loop_s),
+            "us_per_stay": round(loop_s / args.stays * 1e6, 2),
+        },
+        "speedup": round(loop_s / vectorized_s, 1),
+        "max_difference": round(max_difference, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pricing engine quotes-per-second micro-benchmark")
+    parser.add_argument("--stays", type=int, default=20000, help="stays to quote (every room type each)")
+    parser.add_argument("--horizon", type=int, default=365, help="days ahead arrivals are drawn from")
+    parser.add_argument("--max-nights", type=int, default=14, help="longest stay")
+    parser.add_argument("--output", default="", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    write_report(run_benchmark(args), args.output)
+
+
+if __name__ == "__main__":
+    main()
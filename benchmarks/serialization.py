@@ -0,0 +1,138 @@
+"""
+Serialization Benchmark - Per-Request Cost of Encoding Response Bodies
+
+This file builds the bodies the hot read routes return (a booking, a name search, a
+page of the booking list, an availability answer and a booking confirmation) from
+the in-memory storage engine, then times turning each into response bytes three ways:
+
+    default  - what FastAPI does with a returned dict or model: re-validate against
+               the response model, walk it with jsonable_encoder, encode with json
+    orjson   - the same, but encoded by FastJSONResponse (the app's default class)
+    trusted  - trusted_response(): orjson encoding only, no validation or encoder walk
+
+For the single booking it also times the old read shape: the full stored document
+(with _id and the name index), _id popped in Python, then the default path.
+
+Needs no database. Example:
+    python -m benchmarks.serialization --iterations 5000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from backend.database.storage import close_storage, create_storage, set_storage
+from backend.models.booking import BookingResponse
+from backend.routers.responses import FastJSONResponse, trusted_response
+from backend.services import catalog_service, room_service
+from backend.services.booking_service import BOOKING_FIELDS, list_bookings_page
+from backend.services.name_search import search_bookings_by_name
+from benchmarks.common import percentiles, write_report
+from benchmarks.storage_engines import make_booking
+
+
+def default_body(content, model=None) -> bytes:
+    if model is not None:
+        content = model.model_validate(content if isinstance(content, dict) else content.model_dump())
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def orjson_body(content, model=None) -> bytes:
+    if model is not None:
+        content = model.model_validate(content if isinstance(content, dict) else content.model_dump())
+    return FastJSONResponse(jsonable_encoder(content)).body
+
+
+def trusted_body(content, model=None) -> bytes:
+    return trusted_response(content).body
+
+
+def full_document_body(stored: dict, model=None) -> bytes:
+    booking = dict(stored)
+    booking.pop("_id")
+    for field in ("name_tokens", "name_keys"):
+        booking.pop(field, None)
+    return default_body({"found": True, "booking": booking})
+
+
+def time_encoding(encode, content, model, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        encode(content, model)
+        samples.append(time.perf_counter() - start)
+    return {**percentiles(samples), "bytes": len(encode(content, model))}
+
+
+async def build_payloads(bookings: int) -> dict:
+    """Response bodies of the hot read routes, built by the real services."""
+    storage = create_storage("memory")
+    set_storage(storage)
+    await storage.open()
+    await catalog_service.seed_room_types()
+
+    now = datetime.utcnow()
+    for i in range(bookings):
+        await storage.bookings.insert(make_booking(i, now - timedelta(minutes=i)))
+
+    stored = await storage.bookings.get("BENCH-00000001")
+    projected = await storage.bookings.get("BENCH-00000001", BOOKING_FIELDS)
+    matches = await search_bookings_by_name(stored["guest_name"].split()[-1], limit=10, fields=BOOKING_FIELDS)
+    page = await list_bookings_page(limit=20)
+    check_in = date.today() + timedelta(days=14)
+    availability = await room_service.check_availability(check_in.isoformat(), (check_in + timedelta(days=3)).isoformat())
+    await close_storage()
+
+    confirmation = BookingResponse(
+        success=True, confirmation_number="ROOMI-20260101-1234", guest_name=stored["guest_name"],
+        check_in=stored["check_in"], check_out=stored["check_out"], nights=2, room_type=stored["room_type"],
+        rate_per_night=150.0, room_total=300.0, taxes=36.0, grand_total=336.0, status="confirmed",
+        message="Booking confirmed! Confirmation number is ROOMI-20260101-1234",
+    )
+    return {
+        "get_booking": ({"found": True, "booking": projected}, None),
+        "search_by_name": ({"found": bool(matches), "count": len(matches), "bookings": matches}, None),
+        "list_page": (page, None),
+        "availability": ({"available": bool(availability["rooms"]), **availability, "message": "..."}, None),
+        "create_booking": (confirmation, BookingResponse),
+        # As the document comes out of MongoDB without a projection
+        "stored_booking": ({**stored, "_id": ObjectId(), "name_tokens": ["x"], "name_keys": ["X"]}, None),
+    }
+
+
+async def run_benchmark(args) -> dict:
+    random.seed(args.seed)
+    payloads = await build_payloads(args.bookings)
+    report = {"config": {"iterations": args.iterations, "bookings": args.bookings}}
+    stored, _ = payloads.pop("stored_booking")
+    for name, (content, model) in payloads.items():
+        report[name] = {
+            "default": time_encoding(default_body, content, model, args.iterations),
+            "orjson": time_encoding(orjson_body, content, model, args.iterations),
+            "trusted": time_encoding(trusted_body, content, model, args.iterations),
+        }
+        print(f"{name}: p50 default {report[name]['default']['p50_ms']}ms, "
+              f"trusted {report[name]['trusted']['p50_ms']}ms")
+    report["get_booking"]["full_document"] = time_encoding(full_document_body, stored, None, args.iterations)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request cost of encoding response bodies")
+    parser.add_argument("--iterations", type=int, default=5000, help="encodings timed per body and path")
+    parser.add_argument("--bookings", type=int, default=2000, help="bookings stored to build the bodies from")
+    parser.add_argument("--seed", type=int, default=7, help="random seed")
+    parser.add_argument("--output", default="", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    write_report(asyncio.run(run_benchmark(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Storage Engine Benchmark - The Same Operations on Every Storage Engine
+
+This file runs one suite of reservation operations through the routers and services
+against each storage engine and reports per-operation latency side by side: creating,
+reading, searching, listing, cancelling and exporting bookings, checking availability,
+and placing and releasing holds. Each engine starts empty and is preloaded with the
+same number of bookings first, so lookups run against a realistic table.
+
+The memory and SQLite engines need nothing installed. MongoDB (MONGODB_URL) is
+measured when listed in --engines; it works in a separate 'roomiai_bench' database.
+
+Example:
+    python -m benchmarks.storage_engines --engines memory,sqlite,mongo --bookings 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from fastapi import HTTPException
+
+from backend.database.storage import StorageEngine, close_storage, create_storage, get_storage, set_storage
+from backend.models.booking import BookingCreate
+from backend.routers import booking as booking_router
+from backend.services import catalog_service, room_service
+from backend.services.booking_service import BOOKING_FIELDS, export_bookings, export_query
+from backend.services.name_search import name_index_fields
+from benchmarks.common import BENCH_MONGODB_URL, drop_bench_database, percentiles, use_bench_database, write_report
+from benchmarks.name_lookup import FIRST_NAMES, LAST_NAMES, mishear
+
+
+def make_booking(index: int, created_at: datetime) -> dict:
+    guest_name = f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}"
+    check_in = date.today() + timedelta(days=random.randint(1, 120))
+    return {
+        "confirmation_number": f"BENCH-{index:08d}",
+        "guest_name": guest_name,
+        **name_index_fields(guest_name),
+        "email": f"guest{index}@example.com",
+        "phone": f"+1-555-{index % 10000:04d}",
+        "check_in": check_in.isoformat(),
+        "check_out": (check_in + timedelta(days=2)).isoformat(),
+        "room_type": "Deluxe Room",
+        "status": random.choice(["confirmed", "confirmed", "confirmed", "cancelled"]),
+        "created_at": created_at,
+    }
+
+
+def random_stay() -> tuple[str, str]:
+    arrival = date.today() + timedelta(days=random.randint(1, 150))
+    return arrival.isoformat(), (arrival + timedelta(days=random.randint(1, 3))).isoformat()
+
+
+async def timed(samples: list[float], operation):
+    start = time.perf_counter()
+    try:
+        return await operation
+    finally:
+        samples.append(time.perf_counter() - start)
+
+
+async def open_engine(engine: str, args, workdir: str) -> StorageEngine:
+    """Make engine the process's storage engine, starting empty."""
+    if engine == "mongo":
+        await use_bench_database(args.mongodb_url, args.database)
+        return get_storage()
+    storage = create_storage(engine)
+    if engine == "sqlite":
+        storage.path = os.path.join(workdir, "bench.db")
+    set_storage(storage)
+    return storage
+
+
+async def run_suite(engine: str, args, workdir: str) -> dict:
+    storage = await open_engine(engine, args, workdir)
+    await storage.open()
+    await storage.ensure_indexes()
+    catalog_service.invalidate_catalog(f"{engine} benchmark")
+    await catalog_service.seed_room_types()
+
+    # Preload
+    start = time.perf_counter()
+    now = datetime.utcnow()
+    for i in range(args.bookings):
+        await storage.bookings.insert(make_booking(i, now - timedelta(minutes=i)))
+    load_s = time.perf_counter() - start
+
+    ops = {name: [] for name in (
+        "create_booking", "get_booking", "search_by_name", "list_first_page", "list_next_page",
+        "availability", "hold_and_release", "cancel_booking", "catalog_read",
+    )}
+    created, conflicts = [], 0
+    for _ in range(args.operations):
+        check_in, check_out = random_stay()
+        request = BookingCreate(
+            guest_name=f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}",
+            email="bench@example.com",
+            phone="+1-555-0000",
+            check_in=check_in,
+            check_out=check_out,
+            room_type=random.choice(["Standard Room", "Deluxe Room", "Junior Suite"]),
+            guests="2",
+        )
+        try:
+            response = await timed(ops["create_booking"], booking_router.create_booking(request))
+            # The routers return encoded responses; read the body back as the agent would
+            created.append(json.loads(response.body)["confirmation_number"])
+        except HTTPException:
+            conflicts += 1
+
+    for _ in range(args.operations):
+        await timed(ops["get_booking"], booking_router.get_booking(f"BENCH-{random.randrange(args.bookings):08d}"))
+        spoken = mishear(f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}")
+        await timed(ops["search_by_name"], booking_router.search_booking_by_name(spoken))
+        page = json.loads((await timed(ops["list_first_page"], booking_router.list_bookings(status="confirmed"))).body)
+        if page["next_cursor"]:
+            await timed(ops["list_next_page"], booking_router.list_bookings(status="confirmed", cursor=page["next_cursor"]))
+        check_in, check_out = random_stay()
+        await timed(ops["availability"], room_service.check_availability(check_in, check_out))
+
+        async def hold_and_release():
+            hold = await room_service.create_hold("STD", room_service.stay_nights(
+                date.fromisoformat(check_in), date.fromisoformat(check_out)), 20)
+            if hold:
+                await room_service.release_hold(hold["hold_id"])
+        await timed(ops["hold_and_release"], hold_and_release())
+        await timed(ops["catalog_read"], storage.room_types.list_all())
+
+    for confirmation_number in created:
+        await timed(ops["cancel_booking"], booking_router.cancel_booking(confirmation_number, reason="benchmark"))
+
+    # Full export, as the night audit would run it
+    start = time.perf_counter()
+    exported = 0
+    async for chunk in export_bookings(export_query(), BOOKING_FIELDS, "ndjson"):
+        exported += chunk.count("\n")
+    export_s = time.perf_counter() - start
+
+    report = {
+        "preload_s": round(load_s, 2),
+        "booking_conflicts": conflicts,
+        "operations": {name: percentiles(samples) for name, samples in ops.items()},
+        "export": {"bookings": exported, "seconds": round(export_s, 3),
+                   "per_second": round(exported / export_s) if export_s else None},
+    }
+
+    if engine == "mongo":
+        await drop_bench_database(args.database)
+    await close_storage()
+    return report
+
+
+def summary(report: dict, engines: list[str]) -> dict:
+    """p50 milliseconds per operation (rows) and engine (columns)."""
+    first = report[engines[0]]["operations"]
+    return {
+        name: {engine: report[engine]["operations"][name].get("p50_ms") for engine in engines}
+        for name in first
+    }
+
+
+async def run_benchmark(args) -> dict:
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    report = {"config": {"engines": engines, "bookings": args.bookings, "operations": args.operations}}
+    workdir = tempfile.mkdtemp(prefix="roomiai-bench-")
+    try:
+        for engine in engines:
+            random.seed(args.seed)
+            report[engine] = await run_suite(engine, args, workdir)
+            print(f"{engine}: {summary(report, [engine])}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    report["p50_ms"] = summary(report, engines)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-operation latency of each storage engine")
+    parser.add_argument("--engines", default="memory,sqlite", help="comma-separated: memory, sqlite, mongo")
+    parser.add_argument("--bookings", type=int, default=10000, help="bookings preloaded into each engine")
+    parser.add_argument("--operations", type=int, default=300, help="timed runs of each operation")
+    parser.add_argument("--seed", type=int, default=7, help="random seed (same workload on every engine)")
+    parser.add_argument("--database", default="roomiai_bench", help="MongoDB benchmark database (dropped before and after)")
+    parser.add_argument("--mongodb-url", default=BENCH_MONGODB_URL, help="MongoDB server for the benchmark database")
+    parser.add_argument("--output", default="", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    write_report(asyncio.run(run_benchmark(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
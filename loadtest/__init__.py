@@ -0,0 +1,11 @@
+"""
+Load Test Package - Offline Capacity Planning for the Agent Worker
+
+This package runs many concurrent HotelAssistant sessions from scripted caller
+transcripts without LiveKit, Deepgram, Groq or MongoDB. Speech-to-text, the LLM and
+text-to-speech are replaced by local stubs with configurable latency distributions,
+and the backend by an in-memory transport. The harness reports sessions per core,
+memory per session, event-loop lag and tool-call throughput for one worker process.
+
+Run with: python -m loadtest.harness --sessions 50
+"""
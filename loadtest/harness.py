@@ -0,0 +1,286 @@
+"""
+Load Test Harness - Concurrent Scripted Calls Against One Agent Worker
+
+This file runs N concurrent HotelAssistant sessions, each replaying a scripted caller
+transcript through stub STT, LLM and TTS stages and the in-memory backend. The real
+agent code path is exercised for every turn: context trimming, tool functions, the
+backend transport and latency tracing. At the end it reports sessions per core,
+memory per session, event-loop lag and tool-call throughput as JSON.
+
+Example:
+    python -m loadtest.harness --sessions 100 --ramp 10 --time-scale 0.2
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import resource
+import time
+
+from livekit.agents import llm
+
+from agent.direct_speak import direct_speak_stats
+from agent.llm_scheduler import LLMScheduler, estimate_request_tokens
+from agent.shaping import token_report
+from agent.tracing import CallTrace, export_histograms, observe_backend_request
+from backend.tools.transport import add_request_observer, set_transport
+from loadtest.memory_backend import InMemoryTransport
+from loadtest.stubs import Latency, StubLLM, StubRunContext, StubSession, StubSTT, StubTTS
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(__file__), "scripts")
+
+# Event loop lag is measured by how late a periodic timer fires
+LAG_PROBE_INTERVAL = 0.05
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is the peak in KB on Linux, which is close enough elsewhere
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentiles(samples: list[float]) -> dict:
+    """p50/p95/p99/max in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(pct: float) -> float:
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+    return {
+        "count": len(ordered),
+        "p50_ms": round(pick(50) * 1000, 2),
+        "p95_ms": round(pick(95) * 1000, 2),
+        "p99_ms": round(pick(99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+class LoadMonitor:
+    """Samples event-loop lag and memory while the sessions run."""
+
+    def __init__(self):
+        self.lag_samples: list[float] = []
+        self.peak_rss = current_rss_bytes()
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + LAG_PROBE_INTERVAL
+            await asyncio.sleep(LAG_PROBE_INTERVAL)
+            self.lag_samples.append(max(0.0, loop.time() - expected))
+            self.peak_rss = max(self.peak_rss, current_rss_bytes())
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+class ScriptedSession:
+    """One simulated call: the caller follows a script, the agent runs for real."""
+
+    def __init__(self, session_id: str, script: dict, stt: StubSTT, llm_stub: StubLLM, tts: StubTTS,
+                 caller_delay: Latency, time_scale: float, scheduler: LLMScheduler = None):
+        # Imported here so the worker's plugins are only loaded when the harness runs
+        from app import HotelAssistant
+
+        self.session_id = session_id
+        self.script = script
+        self.stt = stt
+        self.llm = llm_stub
+        self.tts = tts
+        self.caller_delay = caller_delay
+        self.time_scale = time_scale
+        self.scheduler = scheduler
+        self.trace = CallTrace(session_id)
+        self.agent = HotelAssistant(llm_scheduler=scheduler, session_id=session_id, trace=self.trace)
+        self.run_context = StubRunContext(StubSession())
+        self.chat_ctx = llm.ChatContext()
+        self.chat_ctx.add_message(role="system", content=self.agent.instructions)
+        self.tool_calls = 0
+        self.slots: dict[str, str] = {}
+
+    async def _llm(self, output: str) -> str:
+        """Run one stub LLM request on the trimmed context, through the scheduler if enabled."""
+        # Trim the context exactly as HotelAssistant.llm_node does
+        self.agent.context_manager.build(self.chat_ctx)
+        prompt_tokens = self.agent.context_manager.last_prompt_tokens
+        if self.scheduler is None:
+            result = await self.llm.generate(prompt_tokens, output)
+        else:
+            estimate = estimate_request_tokens(prompt_tokens)
+            async with self.scheduler.turn(self.session_id, estimate) as usage:
+                result = await self.llm.generate(prompt_tokens, output)
+                usage["prompt_tokens"] = prompt_tokens
+        self.trace.mark("first_llm_token")
+        return result
+
+    async def _call_tool(self, turn: dict) -> str | None:
+        """Run the turn's tool; returns the message if the agent spoke it directly."""
+        name = turn["tool"]
+        args = {key: str(value).format(**self.slots) for key, value in turn.get("args", {}).items()}
+        arguments = json.dumps(args)
+        await self._llm(arguments)
+
+        call_id = f"call_{self.tool_calls}"
+        self.chat_ctx.items.append(llm.FunctionCall(call_id=call_id, name=name, arguments=arguments))
+        result = await getattr(self.agent, name)(self.run_context, **args)
+        self.tool_calls += 1
+
+        spoken = None
+        if isinstance(result, llm.ToolResult):
+            if not result.reply_required:
+                spoken = self.run_context.session.spoken.pop()
+            result = result.output
+
+        # Tools return the shaped JSON that goes into the chat context
+        shaped = json.loads(result)
+        if shaped.get("conf"):
+            self.slots["confirmation_number"] = shaped["conf"]
+        self.chat_ctx.items.append(
+            llm.FunctionCallOutput(call_id=call_id, name=name, output=result, is_error=False)
+        )
+        return spoken
+
+    async def run(self):
+        self.slots.setdefault("confirmation_number", "ROOMI-PENDING")
+        for turn in self.script["turns"]:
+            # Caller speaks
+            await asyncio.sleep(self.caller_delay.sample() * self.time_scale)
+            self.trace.start_turn()
+            transcript = await self.stt.transcribe(turn["caller"])
+            self.trace.mark("final_transcript")
+            self.chat_ctx.add_message(role="user", content=transcript)
+
+            # Agent thinks, calls tools, replies
+            spoken = await self._call_tool(turn) if turn.get("tool") else None
+            # Directly spoken tool messages skip the second LLM pass
+            reply = spoken or await self._llm(turn["reply"].format(**self.slots))
+
+            audio = await self.tts.synthesize(reply)
+            self.trace.mark("first_tts_audio")
+            self.trace.mark("playout_start")
+            self.chat_ctx.add_message(role="assistant", content=reply)
+            await asyncio.sleep(self.tts.duration(audio) * self.time_scale)
+        self.trace.finish_turn()
+
+
+async def run_load_test(args) -> dict:
+    scripts = [json.load(open(path)) for path in sorted(glob.glob(os.path.join(SCRIPTS_DIR, "*.json")))]
+    if args.script:
+        scripts = [s for s in scripts if s["name"] == args.script]
+
+    backend = InMemoryTransport(Latency.parse(args.db_latency))
+    set_transport(backend)
+    add_request_observer(observe_backend_request)
+
+    stt = StubSTT(Latency.parse(args.stt_latency))
+    llm_stub = StubLLM(Latency.parse(args.llm_ttft), args.llm_tps)
+    tts = StubTTS(Latency.parse(args.tts_ttfb))
+    caller_delay = Latency.parse(args.caller_delay)
+    scheduler = LLMScheduler(args.tpm, args.rpm) if args.tpm else None
+
+    # Import the agent before measuring the memory baseline
+    import app  # noqa: F401
+
+    monitor = LoadMonitor()
+    baseline_rss = current_rss_bytes()
+    monitor.start()
+
+    sessions = [
+        ScriptedSession(f"load-{i}", random.choice(scripts), stt, llm_stub, tts,
+                        caller_delay, args.time_scale, scheduler)
+        for i in range(args.sessions)
+    ]
+
+    async def start_staggered(index: int, session: ScriptedSession):
+        await asyncio.sleep(args.ramp * index / max(args.sessions, 1))
+        await session.run()
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    results = await asyncio.gather(
+        *(start_staggered(i, s) for i, s in enumerate(sessions)), return_exceptions=True
+    )
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    await monitor.stop()
+
+    errors = [repr(r) for r in results if isinstance(r, Exception)]
+    tool_calls = sum(s.tool_calls for s in sessions)
+    cores_used = cpu / wall if wall else 0.0
+
+    return {
+        "config": {
+            "sessions": args.sessions,
+            "ramp_s": args.ramp,
+            "time_scale": args.time_scale,
+            "stt_latency": args.stt_latency,
+            "llm_ttft": args.llm_ttft,
+            "tts_ttfb": args.tts_ttfb,
+            "db_latency": args.db_latency,
+            "llm_scheduler": bool(scheduler),
+        },
+        "wall_s": round(wall, 2),
+        "cpu_s": round(cpu, 2),
+        "cores_used": round(cores_used, 3),
+        "sessions_per_core": round(args.sessions / cores_used, 1) if cores_used else None,
+        "memory_per_session_kb": round((monitor.peak_rss - baseline_rss) / args.sessions / 1024, 1),
+        "peak_rss_mb": round(monitor.peak_rss / 1024 / 1024, 1),
+        "event_loop_lag": percentiles(monitor.lag_samples),
+        "tool_calls": tool_calls,
+        "tool_calls_per_s": round(tool_calls / wall, 2) if wall else 0.0,
+        "backend_requests": backend.requests,
+        "llm_requests": llm_stub.requests,
+        "errors": errors[:10],
+        "error_count": len(errors),
+        "latency": export_histograms(),
+        "llm_scheduler": scheduler.metrics() if scheduler else None,
+        "direct_speak": direct_speak_stats(),
+        "tool_result_tokens": token_report(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the RoomiAI agent worker")
+    parser.add_argument("--sessions", type=int, default=20, help="concurrent calls")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which calls start")
+    parser.add_argument("--script", default="", help="only use this script (default: all in loadtest/scripts)")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="multiplier for caller speaking and playout time (0.1 = 10x faster calls)")
+    parser.add_argument("--caller-delay", default="lognormal:1500:4000", help="caller speaking time per turn (ms)")
+    parser.add_argument("--stt-latency", default="lognormal:250:600", help="end of speech to final transcript (ms)")
+    parser.add_argument("--llm-ttft", default="lognormal:350:900", help="LLM time to first token (ms)")
+    parser.add_argument("--llm-tps", type=float, default=250.0, help="LLM output tokens per second")
+    parser.add_argument("--tts-ttfb", default="lognormal:200:500", help="TTS time to first byte (ms)")
+    parser.add_argument("--db-latency", default="lognormal:5:20", help="backend request latency (ms)")
+    parser.add_argument("--tpm", type=int, default=0, help="enable the LLM scheduler with this TPM limit")
+    parser.add_argument("--rpm", type=int, default=30, help="RPM limit when the scheduler is enabled")
+    parser.add_argument("--output", default="", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load_test(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+In-Memory Backend - Backend Transport for Load Tests
+
+This file implements the backend transport with plain dictionaries and the same
+response shapes as the FastAPI routers, plus an optional simulated database latency.
+It lets the load test exercise the real tool functions without a server or MongoDB.
+"""
+
+import asyncio
+import random
+import string
+from datetime import datetime
+
+from backend.services.catalog_service import HOTEL_INFO, hotel_info_payload
+from backend.tools.transport import BackendResponse, BackendTransport
+from loadtest.stubs import Latency
+
+ROOM_TYPES = [
+    {"type": "Standard Room", "code": "STD", "rate": 120, "max_guests": 3, "total_rooms": 20},
+    {"type": "Deluxe Room", "code": "DLX", "rate": 150, "max_guests": 3, "total_rooms": 20},
+    {"type": "Junior Suite", "code": "STE-J", "rate": 220, "max_guests": 3, "total_rooms": 6},
+    {"type": "Executive Suite", "code": "STE-E", "rate": 350, "max_guests": 4, "total_rooms": 3},
+    {"type": "Family Room", "code": "FAM", "rate": 250, "max_guests": 5, "total_rooms": 1},
+]
+
+
+class InMemoryTransport(BackendTransport):
+    """Backend transport backed by dictionaries, with simulated database latency."""
+
+    name = "memory"
+
+    def __init__(self, db_latency: Latency):
+        self.db_latency = db_latency
+        self.bookings: dict[str, dict] = {}
+        self.requests = 0
+
+    async def _send(self, method, endpoint, path, params, json, headers=None):
+        self.requests += 1
+        await asyncio.sleep(self.db_latency.sample())
+        params = params or {}
+        last_segment = path.rstrip("/").rsplit("/", 1)[-1]
+
+        if endpoint == "availability":
+            return BackendResponse(200, {
+                "available": True,
+                "check_in": params["check_in"],
+                "check_out": params["check_out"],
+                "rooms": ROOM_TYPES,
+                "message": f"We have rooms available from {params['check_in']} to {params['check_out']}.",
+            })
+        if endpoint == "room_types":
+            rates = ", ".join(f"{r['type']} at ${r['rate']}" for r in ROOM_TYPES)
+            return BackendResponse(200, {"room_types": ROOM_TYPES, "count": len(ROOM_TYPES), "message": f"We have {rates} per night."})
+        if endpoint == "hotel_info":
+            return BackendResponse(200, hotel_info_payload(HOTEL_INFO, params.get("info_type", "all")))
+        if endpoint == "create_booking":
+            confirmation_number = f"ROOMI-{datetime.now():%Y%m%d}-{''.join(random.choices(string.digits, k=6))}"
+            booking = dict(json, confirmation_number=confirmation_number, status="confirmed")
+            self.bookings[confirmation_number] = booking
+            return BackendResponse(200, {
+                "success": True,
+                "confirmation_number": confirmation_number,
+                "guest_name": json["guest_name"],
+                "status": "confirmed",
+                "message": f"Booking confirmed! Confirmation number is {confirmation_number}",
+            })
+        if endpoint == "get_booking":
+            booking = self.bookings.get(last_segment)
+            if booking is None:
+                return BackendResponse(404, {"detail": "Booking not found"})
+            return BackendResponse(200, {"found": True, "booking": booking})
+        if endpoint == "search_booking":
+            name = params["guest_name"].lower()
+            matches = [b for b in self.bookings.values() if name in b["guest_name"].lower()][:10]
+            return BackendResponse(200, {"found": bool(matches), "count": len(matches), "bookings": matches})
+        if endpoint == "cancel_booking":
+            booking = self.bookings.get(last_segment)
+            if booking is None:
+                return BackendResponse(404, {"detail": "Booking not found"})
+            booking["status"] = "cancelled"
+            return BackendResponse(200, {
+                "success": True,
+                "confirmation_number": last_segment,
+                "cancellation_reference": f"CXL-{last_segment}",
+                "refund_eligible": True,
+                "message": f"Booking cancelled. Reference: CXL-{last_segment}.",
+            })
+        return BackendResponse(404, {"detail": f"Unknown endpoint {endpoint}"})
@@ -0,0 +1,119 @@
+"""
+Pipeline Stubs - Local Stand-ins for STT, LLM and TTS
+
+This file provides stub speech-to-text, LLM and text-to-speech stages for the load
+test, plus a stub session for tool messages the agent speaks directly. Each stub only waits for a latency drawn from a configurable distribution and
+produces output of a realistic size (transcripts, tokens, PCM audio), so the harness
+measures the agent's own overhead rather than the providers'.
+"""
+
+import asyncio
+import math
+import random
+
+from agent.context import estimate_tokens
+
+# Stub audio format (matches Deepgram Aura output)
+SAMPLE_RATE = 24000
+BYTES_PER_SAMPLE = 2
+
+# Speaking rate used to size synthesized audio
+CHARS_PER_SECOND = 15
+
+
+class Latency:
+    """
+    Latency distribution in milliseconds.
+
+    Spec strings: 'fixed:200', 'uniform:100:300' or 'lognormal:200:600'
+    (median and p95).
+    """
+
+    def __init__(self, kind: str, a: float, b: float = 0.0):
+        self.kind = kind
+        self.a = a
+        self.b = b
+        if kind == "lognormal":
+            self.mu = math.log(a)
+            self.sigma = math.log(b / a) / 1.645 if b > a else 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, *values = spec.split(":")
+        numbers = [float(v) for v in values]
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution '{spec}'")
+        return cls(kind, *numbers)
+
+    def sample(self) -> float:
+        """Draw one latency in seconds."""
+        if self.kind == "fixed":
+            ms = self.a
+        elif self.kind == "uniform":
+            ms = random.uniform(self.a, self.b)
+        else:
+            ms = random.lognormvariate(self.mu, self.sigma)
+        return ms / 1000
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{self.a:g}" + (f":{self.b:g}" if self.kind != "fixed" else "")
+
+
+class StubSTT:
+    """Returns the scripted caller utterance after the final-transcript latency."""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+
+    async def transcribe(self, utterance: str) -> str:
+        await asyncio.sleep(self.latency.sample())
+        return utterance
+
+
+class StubLLM:
+    """Replays scripted decisions with a time-to-first-token plus per-token latency."""
+
+    def __init__(self, ttft: Latency, tokens_per_second: float = 250.0):
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.requests = 0
+        self.prompt_tokens = 0
+
+    async def generate(self, prompt_tokens: int, output: str) -> str:
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        await asyncio.sleep(self.ttft.sample() + estimate_tokens(output) / self.tokens_per_second)
+        return output
+
+
+class StubTTS:
+    """Produces silent PCM sized like real speech after the first-byte latency."""
+
+    def __init__(self, ttfb: Latency):
+        self.ttfb = ttfb
+
+    async def synthesize(self, text: str) -> bytes:
+        await asyncio.sleep(self.ttfb.sample())
+        seconds = max(len(text) / CHARS_PER_SECOND, 0.2)
+        return bytes(int(seconds * SAMPLE_RATE) * BYTES_PER_SAMPLE)
+
+    @staticmethod
+    def duration(audio: bytes) -> float:
+        return len(audio) / (SAMPLE_RATE * BYTES_PER_SAMPLE)
+
+
+class StubSession:
+    """Records messages spoken with say(), in place of AgentSession."""
+
+    def __init__(self):
+        self.spoken: list[str] = []
+
+    def say(self, text: str, **kwargs):
+        self.spoken.append(text)
+
+
+class StubRunContext:
+    """The part of RunContext the tool functions use."""
+
+    def __init__(self, session: StubSession):
+        self.session = session
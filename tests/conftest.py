@@ -0,0 +1,55 @@
+"""
+Shared fixtures: the API on a fresh in-memory storage engine for every test.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.database.storage import create_storage, get_storage, set_storage
+from backend.main import app
+from backend.services import catalog_service
+
+
+@pytest.fixture
+def client():
+    """TestClient running the app's lifespan (indexes, seeded catalog) on an empty memory engine."""
+    set_storage(create_storage("memory"))
+    catalog_service.invalidate_catalog("test")
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def storage(client):
+    """The storage engine the client's app is using."""
+    return get_storage()
+
+
+def stay(days_ahead: int, nights: int = 2) -> tuple[str, str]:
+    """A stay starting days_ahead from today, as ISO dates."""
+    arrival = date.today() + timedelta(days=days_ahead)
+    return arrival.isoformat(), (arrival + timedelta(days=nights)).isoformat()
+
+
+def booking_request(days_ahead: int = 10, nights: int = 2, room_type: str = "Deluxe Room", **overrides) -> dict:
+    """A POST /bookings body."""
+    check_in, check_out = stay(days_ahead, nights)
+    return {
+        "guest_name": "Ann Lee",
+        "check_in": check_in,
+        "check_out": check_out,
+        "room_type": room_type,
+        "phone": "+1-555-0100",
+        "email": "ann@example.com",
+        "guests": "2",
+        **overrides,
+    }
+
+
+def booked_nights(client, storage, code: str, check_in: str, check_out: str) -> dict[str, int]:
+    """Booked counter per night of the stay for a room type code."""
+    last_night = (date.fromisoformat(check_out) - timedelta(days=1)).isoformat()
+    counters = client.portal.call(storage.inventory.booked_by_night, [code], check_in, last_night)
+    return {night: booked for _, night, booked in counters}
@@ -0,0 +1,59 @@
+"""
+Date-aware availability: the per-night inventory decides which rooms are free.
+"""
+
+from datetime import date, timedelta
+
+from tests.conftest import booked_nights, booking_request, stay
+
+
+def available_codes(client, check_in: str, check_out: str, **params) -> list[str]:
+    response = client.get("/api/v1/rooms/availability", params={"check_in": check_in, "check_out": check_out, **params})
+    assert response.status_code == 200
+    return [room["code"] for room in response.json()["rooms"]]
+
+
+def test_booking_takes_its_nights_only(client):
+    client.post("/api/v1/bookings/", json=booking_request(days_ahead=10, nights=2, room_type="Family Room"))
+
+    assert "FAM" not in available_codes(client, *stay(11, nights=3))
+    assert "FAM" in available_codes(client, *stay(12, nights=2))
+    assert "FAM" in available_codes(client, *stay(7, nights=3))
+
+
+def test_party_size_filters_room_types(client):
+    codes = available_codes(client, *stay(10), guests="5")
+
+    assert codes == ["FAM"]
+
+
+def test_available_rooms_are_quoted_for_the_stay(client):
+    check_in, check_out = stay(10, nights=3)
+
+    response = client.get("/api/v1/rooms/availability", params={"check_in": check_in, "check_out": check_out})
+
+    for room in response.json()["rooms"]:
+        assert room["available"] > 0
+        assert room["grand_total"] > room["rate_per_night"] * 3
+
+
+def test_past_dates_are_not_available(client):
+    past = date.today() - timedelta(days=30)
+
+    response = client.get("/api/v1/rooms/availability", params={
+        "check_in": past.isoformat(), "check_out": (past + timedelta(days=2)).isoformat(),
+    })
+
+    assert response.status_code == 200
+    assert response.json()["available"] is False
+    assert "past" in response.json()["message"]
+
+
+def test_past_check_in_is_rejected(client, storage):
+    past = date.today() - timedelta(days=30)
+    request = booking_request(check_in=past.isoformat(), check_out=(past + timedelta(days=2)).isoformat())
+
+    response = client.post("/api/v1/bookings/", json=request)
+
+    assert response.status_code == 400
+    assert not any(booked_nights(client, storage, "DLX", request["check_in"], request["check_out"]).values())
@@ -0,0 +1,110 @@
+"""
+Keyset paging of GET /bookings without gaps or repeats, and the streaming export.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+
+def insert_bookings(client, storage, count: int, created_at: datetime, prefix: str = "P", status: str = "confirmed"):
+    for i in range(count):
+        client.portal.call(storage.bookings.insert, {
+            "confirmation_number": f"{prefix}{i:04d}",
+            "guest_name": "Page Guest",
+            "status": status,
+            "check_in": "2099-01-01",
+            "check_out": "2099-01-02",
+            # Bookings share created_at in threes, so the _id tie-break decides their order
+            "created_at": created_at - timedelta(seconds=i - i % 3),
+        })
+
+
+def all_pages(client, limit: int, **params) -> list[list[str]]:
+    pages, cursor = [], None
+    while True:
+        query = {"limit": limit, **params, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/bookings/", params=query).json()
+        pages.append([b["confirmation_number"] for b in page["bookings"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_pages_cover_every_booking_once_newest_first(client, storage):
+    insert_bookings(client, storage, 47, datetime(2026, 1, 1))
+
+    pages = all_pages(client, limit=10)
+    seen = [number for page in pages for number in page]
+
+    assert [len(page) for page in pages] == [10, 10, 10, 10, 7]
+    assert sorted(seen) == sorted(f"P{i:04d}" for i in range(47))
+    assert len(set(seen)) == 47
+    created = [client.get(f"/api/v1/bookings/{n}").json()["booking"]["created_at"] for n in seen]
+    assert created == sorted(created, reverse=True)
+
+
+def test_cursor_holds_its_place_while_bookings_are_added(client, storage):
+    insert_bookings(client, storage, 25, datetime(2026, 1, 1))
+    everything = client.get("/api/v1/bookings/", params={"limit": 100}).json()["bookings"]
+    first = client.get("/api/v1/bookings/", params={"limit": 10}).json()
+
+    # Newer bookings arrive between the two page requests
+    insert_bookings(client, storage, 5, datetime(2026, 2, 1), prefix="N")
+    second = client.get("/api/v1/bookings/", params={"limit": 10, "cursor": first["next_cursor"]}).json()
+
+    first_numbers = [b["confirmation_number"] for b in first["bookings"]]
+    second_numbers = [b["confirmation_number"] for b in second["bookings"]]
+    assert not set(first_numbers) & set(second_numbers)
+    assert not any(number.startswith("N") for number in second_numbers)
+    assert first_numbers + second_numbers == [b["confirmation_number"] for b in everything[:20]]
+
+
+def test_status_filter_pages_only_that_status(client, storage):
+    insert_bookings(client, storage, 12, datetime(2026, 1, 1))
+    insert_bookings(client, storage, 8, datetime(2026, 1, 1), prefix="C", status="cancelled")
+
+    pages = all_pages(client, limit=5, status="cancelled")
+
+    assert sorted(number for page in pages for number in page) == [f"C{i:04d}" for i in range(8)]
+
+
+def test_invalid_cursor_is_a_bad_request(client):
+    assert client.get("/api/v1/bookings/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def export(client, **params):
+    response = client.get("/api/v1/bookings/export", params=params)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_export_streams_the_range_oldest_first(client, storage):
+    insert_bookings(client, storage, 6, datetime(2026, 1, 10))
+    insert_bookings(client, storage, 3, datetime(2026, 3, 1), prefix="M")
+
+    response = export(client, start="2026-01-01", end="2026-01-31")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="bookings-2026-01-01-2026-01-31.ndjson"' in response.headers["content-disposition"]
+    assert sorted(b["confirmation_number"] for b in lines) == [f"P{i:04d}" for i in range(6)]
+    assert [b["created_at"] for b in lines] == sorted(b["created_at"] for b in lines)
+    assert not any("name_keys" in b or "_id" in b for b in lines)
+
+
+def test_csv_export_has_the_requested_columns(client, storage):
+    insert_bookings(client, storage, 4, datetime(2026, 1, 10))
+    insert_bookings(client, storage, 2, datetime(2026, 1, 10), prefix="C", status="cancelled")
+
+    response = export(client, format="csv", status="cancelled", fields="confirmation_number,status")
+    rows = list(csv.reader(io.StringIO(response.text)))
+
+    assert rows[0] == ["confirmation_number", "status"]
+    assert sorted(rows[1:]) == [["C0000", "cancelled"], ["C0001", "cancelled"]]
+
+
+def test_unknown_export_format_is_a_bad_request(client):
+    assert client.get("/api/v1/bookings/export", params={"format": "xml"}).status_code == 400
+    assert client.get("/api/v1/bookings/export", params={"by": "guest_name"}).status_code == 400
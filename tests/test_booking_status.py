@@ -0,0 +1,90 @@
+"""
+Booking status transitions: the guarded single-write moves and the sweeps.
+"""
+
+from datetime import date, datetime
+
+from tests.conftest import booked_nights, booking_request
+
+
+def create(client, **overrides) -> str:
+    response = client.post("/api/v1/bookings/", json=booking_request(**overrides))
+    assert response.status_code == 200, response.text
+    return response.json()["confirmation_number"]
+
+
+def status_of(client, confirmation_number: str) -> str:
+    return client.get(f"/api/v1/bookings/{confirmation_number}").json()["booking"]["status"]
+
+
+def test_check_in_then_check_out(client):
+    confirmation_number = create(client)
+
+    checked_in = client.post(f"/api/v1/bookings/{confirmation_number}/check-in")
+    assert checked_in.status_code == 200
+    assert status_of(client, confirmation_number) == "checked_in"
+
+    checked_out = client.post(f"/api/v1/bookings/{confirmation_number}/check-out")
+    assert checked_out.status_code == 200
+    assert status_of(client, confirmation_number) == "checked_out"
+
+
+def test_check_in_of_cancelled_booking_is_refused(client):
+    confirmation_number = create(client)
+    assert client.delete(f"/api/v1/bookings/{confirmation_number}").status_code == 200
+
+    response = client.post(f"/api/v1/bookings/{confirmation_number}/check-in")
+
+    assert response.status_code == 409
+    assert status_of(client, confirmation_number) == "cancelled"
+
+
+def test_check_out_before_check_in_is_refused(client):
+    confirmation_number = create(client)
+
+    assert client.post(f"/api/v1/bookings/{confirmation_number}/check-out").status_code == 409
+    assert status_of(client, confirmation_number) == "confirmed"
+
+
+def test_cancel_of_checked_in_booking_is_refused(client):
+    confirmation_number = create(client)
+    client.post(f"/api/v1/bookings/{confirmation_number}/check-in")
+
+    assert client.delete(f"/api/v1/bookings/{confirmation_number}").status_code == 409
+    assert status_of(client, confirmation_number) == "checked_in"
+
+
+def test_repeat_cancel_is_a_no_op(client, storage):
+    request = booking_request(room_type="Family Room")
+    confirmation_number = create(client, room_type="Family Room")
+    assert set(booked_nights(client, storage, "FAM", request["check_in"], request["check_out"]).values()) == {1}
+
+    first = client.delete(f"/api/v1/bookings/{confirmation_number}")
+    second = client.delete(f"/api/v1/bookings/{confirmation_number}")
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert status_of(client, confirmation_number) == "cancelled"
+    # The room was given back once, not once per cancel
+    assert set(booked_nights(client, storage, "FAM", request["check_in"], request["check_out"]).values()) == {0}
+
+
+def test_unknown_booking_is_not_found(client):
+    assert client.delete("/api/v1/bookings/ROOMI-NOPE").status_code == 404
+    assert client.post("/api/v1/bookings/ROOMI-NOPE/check-in").status_code == 404
+
+
+def test_check_in_sweep_moves_only_confirmed_arrivals(client, storage):
+    today = date.today().isoformat()
+    for number, status in (("A1", "confirmed"), ("A2", "confirmed"), ("A3", "pending"), ("A4", "cancelled")):
+        client.portal.call(storage.bookings.insert, {
+            "confirmation_number": number, "guest_name": "Sweep Guest", "status": status,
+            "check_in": today, "check_out": "2099-01-01", "created_at": datetime.utcnow(),
+        })
+
+    first = client.post("/api/v1/bookings/sweeps/check-in").json()
+    second = client.post("/api/v1/bookings/sweeps/check-in").json()
+
+    assert first["moved"] == 2
+    assert second["moved"] == 0
+    assert [status_of(client, n) for n in ("A1", "A2", "A3", "A4")] == ["checked_in", "checked_in", "pending", "cancelled"]
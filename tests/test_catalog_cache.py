@@ -0,0 +1,76 @@
+"""
+Cached room catalog: ETag/304 revalidation and invalidation on writes.
+"""
+
+
+def get_types(client, etag: str = None, **params):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get("/api/v1/rooms/types", params=params, headers=headers)
+
+
+def stats(client) -> dict:
+    return client.get("/api/v1/rooms/cache-stats").json()
+
+
+def test_unchanged_catalog_is_not_modified(client):
+    first = get_types(client)
+    etag = first.headers["ETag"]
+
+    again = get_types(client, etag)
+
+    assert first.status_code == 200 and first.json()["room_types"]
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.content == b""
+
+
+def test_etag_matching_accepts_lists_and_weak_tags(client):
+    etag = get_types(client).headers["ETag"]
+
+    assert get_types(client, f'"stale", W/{etag}').status_code == 304
+    assert get_types(client, '"stale"').status_code == 200
+
+
+def test_filters_have_their_own_etag(client):
+    all_types = get_types(client)
+    premium = get_types(client, filter_type="premium")
+
+    assert all_types.headers["ETag"] != premium.headers["ETag"]
+    assert get_types(client, all_types.headers["ETag"], filter_type="premium").status_code == 200
+
+
+def test_update_invalidates_the_catalog(client):
+    etag = get_types(client).headers["ETag"]
+    version = stats(client)["version"]
+
+    response = client.patch("/api/v1/rooms/types/dlx", json={"rate": 175})
+    changed = get_types(client, etag)
+
+    assert response.status_code == 200
+    assert stats(client)["version"] == version + 1
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    deluxe = next(r for r in changed.json()["room_types"] if r["code"] == "DLX")
+    assert deluxe["rate"] == 175
+
+
+def test_repeat_reads_are_served_from_the_cache(client):
+    get_types(client)
+    before = stats(client)
+
+    get_types(client)
+    get_types(client, filter_type="budget")
+
+    after = stats(client)
+    assert after["hits"] == before["hits"] + 2
+    assert after["misses"] == before["misses"]
+
+
+def test_unknown_room_type_update_is_not_found(client):
+    assert client.patch("/api/v1/rooms/types/PENT", json={"rate": 900}).status_code == 404
+
+
+def test_hotel_info_is_not_modified(client):
+    etag = client.get("/api/v1/rooms/info").headers["ETag"]
+
+    assert client.get("/api/v1/rooms/info", headers={"If-None-Match": etag}).status_code == 304
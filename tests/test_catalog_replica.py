@@ -0,0 +1,79 @@
+"""
+Agent-side catalog replica: ETag refreshes, and the offline answers built from it.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from backend.services.pricing_service import get_pricing_engine
+from backend.tools import booking_tools
+from backend.tools.catalog_replica import CatalogReplica
+from backend.tools.transport import InProcessTransport, set_transport
+from tests.conftest import stay
+
+
+@pytest.fixture
+def replica(client, monkeypatch):
+    """A fresh replica reaching the test app's routes in-process."""
+    transport = InProcessTransport()
+    # The client fixture has already opened the storage engine
+    transport._connected = True
+    set_transport(transport)
+    replica = CatalogReplica()
+    monkeypatch.setattr(booking_tools, "get_catalog_replica", lambda: replica)
+    yield replica
+    set_transport(None)
+
+
+def test_refresh_loads_then_revalidates(client, replica):
+    assert client.portal.call(replica.refresh) == 2
+    assert client.portal.call(replica.refresh) == 0
+
+    stats = replica.stats()
+    assert stats["synced"]
+    assert stats["updated"] == 2 and stats["not_modified"] == 2
+
+
+def test_refresh_picks_up_catalog_changes(client, replica):
+    client.portal.call(replica.refresh)
+    client.patch("/api/v1/rooms/types/DLX", json={"rate": 175})
+
+    assert client.portal.call(replica.refresh) == 1
+    room_types = client.portal.call(replica.room_types)["room_types"]
+    assert next(r for r in room_types if r["code"] == "DLX")["rate"] == 175
+
+
+def test_offline_availability_quotes_the_replicated_catalog(client, replica):
+    client.patch("/api/v1/rooms/types/DLX", json={"rate": 175})
+    client.portal.call(replica.refresh)
+    arrival = date.today() + timedelta(days=30)
+    departure = arrival + timedelta(days=3)
+    catalog = client.portal.call(replica.room_types)["room_types"]
+    quote = get_pricing_engine(catalog).quote("DLX", arrival, departure)
+
+    result = client.portal.call(
+        booking_tools._fallback_availability, arrival.isoformat(), departure.isoformat(), "deluxe", "2"
+    )
+
+    # Prices only: whether a room is free can't be checked without the backend
+    assert result["available"] is None
+    assert [room["code"] for room in result["rooms"]] == ["DLX"]
+    assert result["rooms"][0]["grand_total"] == quote["grand_total"]
+    assert "available" not in result["rooms"][0]
+    assert "can't check" in result["message"]
+
+
+def test_offline_availability_fits_the_party(client, replica):
+    check_in, check_out = stay(5)
+
+    result = client.portal.call(booking_tools._fallback_availability, check_in, check_out, "any", "5")
+
+    assert [room["code"] for room in result["rooms"]] == ["FAM"]
+
+
+def test_offline_availability_quotes_nothing_for_bad_dates(client, replica):
+    result = client.portal.call(booking_tools._fallback_availability, "yesterday-ish", "later", "any", "2")
+
+    assert result["available"] is False
+    assert result["rooms"] == []
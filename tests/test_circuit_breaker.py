@@ -0,0 +1,119 @@
+"""
+Circuit breaker: opening on failures and slow calls, the shared state file, the probe.
+"""
+
+import asyncio
+
+from backend.tools.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+
+
+async def healthy() -> bool:
+    return True
+
+
+async def down() -> bool:
+    return False
+
+
+def breaker(state_file=None, probe=healthy, **settings) -> CircuitBreaker:
+    settings = {"failure_threshold": 3, "latency_slo": 1.0, "reset_timeout": 0.01, "probe_interval": 0.01, **settings}
+    return CircuitBreaker("room_types", probe, state_file=state_file, **settings)
+
+
+def fail(circuit: CircuitBreaker, times: int):
+    for _ in range(times):
+        circuit.record_failure()
+
+
+def test_opens_after_consecutive_failures():
+    async def scenario():
+        circuit = breaker(reset_timeout=60)
+        fail(circuit, 2)
+        assert circuit.allow_request()
+
+        fail(circuit, 1)
+        assert circuit.state == OPEN
+        assert not circuit.allow_request()
+        assert circuit.snapshot()["rejected"] == 1
+        circuit.cancel_probe()
+
+    asyncio.run(scenario())
+
+
+def test_success_resets_the_failure_streak():
+    async def scenario():
+        circuit = breaker()
+        fail(circuit, 2)
+        circuit.record_success(0.1)
+        fail(circuit, 2)
+        assert circuit.state == CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_slow_calls_count_as_failures():
+    async def scenario():
+        circuit = breaker(reset_timeout=60)
+        for _ in range(3):
+            circuit.record_success(5.0)
+        assert circuit.state == OPEN
+        assert circuit.snapshot()["slow_calls"] == 3
+        circuit.cancel_probe()
+
+    asyncio.run(scenario())
+
+
+def test_probe_closes_the_breaker_once_healthy():
+    async def scenario():
+        circuit = breaker()
+        fail(circuit, 3)
+        await asyncio.sleep(0.1)
+        assert circuit.allow_request()
+
+    asyncio.run(scenario())
+
+
+def test_probe_keeps_the_breaker_open_while_down():
+    async def scenario():
+        circuit = breaker(probe=down)
+        fail(circuit, 3)
+        await asyncio.sleep(0.1)
+        assert not circuit.allow_request()
+        circuit.cancel_probe()
+
+    asyncio.run(scenario())
+
+
+def test_state_file_shares_an_open_circuit(tmp_path):
+    state_file = str(tmp_path / "breakers.json")
+
+    async def scenario():
+        opener = breaker(state_file, probe=down, reset_timeout=60)
+        fail(opener, 3)
+        opener.cancel_probe()
+
+        # Another call process: fails fast from its first request
+        other = breaker(state_file, probe=down, reset_timeout=60)
+        assert not other.allow_request()
+        assert other.snapshot()["state"] == OPEN
+        other.cancel_probe()
+
+    asyncio.run(scenario())
+
+
+def test_any_process_closes_a_shared_circuit(tmp_path):
+    state_file = str(tmp_path / "breakers.json")
+
+    async def scenario():
+        opener = breaker(state_file, probe=down)
+        fail(opener, 3)
+        # The call that opened the circuit ends before the backend recovers
+        opener.cancel_probe()
+
+        other = breaker(state_file)
+        assert not other.allow_request()
+        await asyncio.sleep(0.1)
+        assert other.allow_request()
+        assert opener.allow_request()
+
+    asyncio.run(scenario())
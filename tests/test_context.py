@@ -0,0 +1,89 @@
+"""
+Bounded conversation context: trimming to the token budget and the booking slot summary.
+"""
+
+import json
+
+from livekit.agents import llm
+
+from agent.context import ConversationContextManager, parse_output
+
+
+def tool_turn(chat_ctx: llm.ChatContext, n: int, name: str, arguments: dict, result: dict, padding: int = 0):
+    """A user turn that calls one tool and gets its result back."""
+    chat_ctx.add_message(role="user", content=f"turn {n} " + "x" * padding)
+    chat_ctx.items.append(llm.FunctionCall(call_id=f"call-{n}", name=name, arguments=json.dumps(arguments)))
+    chat_ctx.items.append(llm.FunctionCallOutput(call_id=f"call-{n}", name=name, output=str(result), is_error=False))
+    chat_ctx.add_message(role="assistant", content=result.get("message", "ok"))
+
+
+def conversation(turns: int, padding: int = 0) -> llm.ChatContext:
+    chat_ctx = llm.ChatContext()
+    chat_ctx.add_message(role="system", content="You are the hotel receptionist.")
+    for n in range(turns):
+        tool_turn(
+            chat_ctx, n, "check_room_availability",
+            {"check_in": "2026-12-01", "check_out": "2026-12-03", "room_type": "Deluxe Room", "guests": "2"},
+            {"success": True, "message": f"Deluxe rooms are available ({n}).", "rooms": ["DLX"] * 20},
+            padding,
+        )
+    return chat_ctx
+
+
+def user_texts(chat_ctx: llm.ChatContext) -> list[str]:
+    return [item.text_content for item in chat_ctx.items if item.type == "message" and item.role == "user"]
+
+
+def test_parse_output_reads_json_and_python_literals():
+    assert parse_output('{"success": true}') == {"success": True}
+    assert parse_output(str({"success": True, "message": "Booked."})) == {"success": True, "message": "Booked."}
+    assert parse_output("Booking failed") is None
+
+
+def test_short_conversation_is_unchanged():
+    chat_ctx = conversation(2)
+
+    built = ConversationContextManager(token_budget=3000, keep_turns=4).build(chat_ctx)
+
+    assert [item.id for item in built.items] == [item.id for item in chat_ctx.items]
+
+
+def test_old_turns_are_replaced_by_a_summary():
+    built = ConversationContextManager(token_budget=3000, keep_turns=2).build(conversation(6))
+
+    assert built.items[0].text_content == "You are the hotel receptionist."
+    assert built.items[1].role == "system"
+    summary = built.items[1].text_content
+    assert "check-in: 2026-12-01" in summary and "room type: Deluxe Room" in summary
+    assert [text.split()[1] for text in user_texts(built)] == ["4", "5"]
+
+
+def test_prompt_stays_within_the_token_budget():
+    manager = ConversationContextManager(token_budget=1000, keep_turns=4)
+
+    built = manager.build(conversation(6, padding=1200))
+
+    assert manager.last_prompt_tokens <= 1000
+    # The latest turn is always kept
+    assert user_texts(built)[-1].startswith("turn 5")
+
+
+def test_older_tool_results_in_kept_turns_keep_only_their_message():
+    built = ConversationContextManager(token_budget=3000, keep_turns=2).build(conversation(2))
+
+    outputs = [item.output for item in built.items if item.type == "function_call_output"]
+    assert json.loads(outputs[0]) == {"message": "Deluxe rooms are available (0)."}
+    assert "rooms" in outputs[1]
+
+
+def test_slots_come_from_successful_results_only():
+    chat_ctx = llm.ChatContext()
+    tool_turn(chat_ctx, 0, "create_booking", {"guest_name": "Ann Lee", "phone": "unknown"},
+              {"success": True, "conf": "HTL-1234", "total": "$300.00"})
+    tool_turn(chat_ctx, 1, "cancel_booking", {"confirmation_number": "null"},
+              {"success": False, "confirmation_number": "HTL-9999"})
+    manager = ConversationContextManager()
+
+    manager.update_slots(chat_ctx.items)
+
+    assert manager.slots == {"guest_name": "Ann Lee", "confirmation_number": "HTL-1234", "grand_total": "$300.00"}
@@ -0,0 +1,71 @@
+"""
+Flexible-date search: the sliding-window arithmetic and the ranked stays it returns.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from backend.services.room_service import top_windows, window_stats
+from tests.conftest import booking_request
+
+
+def search(client, **params):
+    response = client.get("/api/v1/rooms/flexible-search", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_window_stats_slide_minimum_and_sum():
+    free = np.array([[2, 0, 3, 1, 4]])
+    rates = np.array([[100.0, 110.0, 120.0, 130.0, 140.0]])
+
+    min_free, totals = window_stats(free, rates, 2)
+
+    assert min_free.tolist() == [[0, 0, 1, 1]]
+    assert totals.tolist() == [[210.0, 230.0, 250.0, 270.0]]
+
+
+def test_window_stats_of_a_horizon_shorter_than_the_stay():
+    min_free, totals = window_stats(np.ones((2, 2), dtype=np.int32), np.ones((2, 2)), 3)
+
+    assert min_free.shape == totals.shape == (2, 0)
+
+
+def test_top_windows_skip_full_windows_and_rank():
+    min_free = np.array([[1, 0, 2], [3, 1, 0]])
+    totals = np.array([[300.0, 100.0, 250.0], [400.0, 250.0, 50.0]])
+
+    by_price = top_windows(min_free, totals, "price", top_k=3)
+    by_date = top_windows(min_free, totals, "date", top_k=2)
+
+    # Equal prices go by date
+    assert by_price == [(1, 1, 1, 250.0), (0, 2, 2, 250.0), (0, 0, 1, 300.0)]
+    assert by_date == [(0, 0, 1, 300.0), (1, 0, 3, 400.0)]
+
+
+def test_search_skips_nights_that_are_booked(client):
+    # The only Family Room is taken on nights 1 and 2 of the horizon
+    start = date.today() + timedelta(days=30)
+    client.post("/api/v1/bookings/", json=booking_request(days_ahead=31, nights=2, room_type="Family Room"))
+
+    result = search(client, nights=2, room_type="Family Room", start=start.isoformat(), horizon_days=6, sort="date", top_k=10)
+
+    arrivals = [date.fromisoformat(w["check_in"]) - start for w in result["options"]]
+    assert [a.days for a in arrivals] == [3, 4]
+    assert all(w["left"] == 1 for w in result["options"])
+
+
+def test_search_ranks_every_room_type(client):
+    result = search(client, nights=3, horizon_days=14)
+
+    totals = [w["total"] for w in result["options"]]
+    assert result["found"] and totals == sorted(totals)
+    assert set(result["by_room_type"]) == {"Standard Room", "Deluxe Room", "Junior Suite", "Executive Suite", "Family Room"}
+
+
+def test_search_cannot_start_in_the_past(client):
+    result = search(client, nights=2, start=(date.today() - timedelta(days=10)).isoformat())
+
+    assert result["found"] is False
+    assert "past" in result["message"]
@@ -0,0 +1,101 @@
+"""
+Idempotent booking creation: repeats of an Idempotency-Key replay the first booking.
+"""
+
+from datetime import date
+
+from backend.services.idempotency import booking_identity
+from tests.conftest import booked_nights, booking_request
+
+
+def post(client, body: dict, key: str):
+    return client.post("/api/v1/bookings/", json=body, headers={"Idempotency-Key": key})
+
+
+def booking_count(client) -> int:
+    return client.get("/api/v1/bookings/", params={"limit": 100}).json()["count"]
+
+
+def test_repeat_replays_the_first_booking(client, storage):
+    body = booking_request(room_type="Family Room")
+
+    first = post(client, body, "call-1")
+    repeat = post(client, body, "call-1")
+
+    assert first.status_code == repeat.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert repeat.headers["Idempotent-Replayed"] == "true"
+    assert repeat.json() == first.json()
+    assert booking_count(client) == 1
+    assert set(booked_nights(client, storage, "FAM", body["check_in"], body["check_out"]).values()) == {1}
+
+
+def test_repeat_worded_differently_replays(client):
+    body = booking_request()
+    arrival, departure = date.fromisoformat(body["check_in"]), date.fromisoformat(body["check_out"])
+    reworded = {
+        **body,
+        "guest_name": "  ann   LEE ",
+        "check_in": f"{arrival:%b} {arrival.day}",
+        "check_out": f"{departure:%B} {departure.day}",
+        "room_type": "deluxe",
+        "phone": "1 555 0100",
+    }
+
+    first = post(client, body, "call-1")
+    repeat = post(client, reworded, "call-1")
+
+    assert repeat.status_code == 200
+    assert repeat.json()["confirmation_number"] == first.json()["confirmation_number"]
+    assert booking_count(client) == 1
+
+
+def test_key_reused_for_other_details_is_refused(client):
+    post(client, booking_request(), "call-1")
+
+    response = post(client, booking_request(room_type="Standard Room"), "call-1")
+
+    assert response.status_code == 422
+    assert booking_count(client) == 1
+
+
+def test_failed_request_releases_its_key(client):
+    assert post(client, booking_request(room_type="Family Room", guest_name="Bo Ng"), "other").status_code == 200
+    body = booking_request(room_type="Family Room")
+
+    # No room left: the key is given up, not kept with the failure
+    assert post(client, body, "call-1").status_code == 409
+    client.delete(f"/api/v1/bookings/{client.get('/api/v1/bookings/').json()['bookings'][0]['confirmation_number']}")
+    retry = post(client, body, "call-1")
+
+    assert retry.status_code == 200
+    assert "Idempotent-Replayed" not in retry.headers
+
+
+def test_requests_without_a_key_are_not_deduplicated(client):
+    body = booking_request()
+
+    first = client.post("/api/v1/bookings/", json=body)
+    second = client.post("/api/v1/bookings/", json=body)
+
+    assert first.json()["confirmation_number"] != second.json()["confirmation_number"]
+    assert booking_count(client) == 2
+
+
+def test_overlong_key_is_a_bad_request(client):
+    assert post(client, booking_request(), "k" * 500).status_code == 400
+
+
+def test_identity_normalizes_how_the_booking_is_said():
+    room_types = [{"code": "DLX", "type": "Deluxe Room"}]
+    booking = {"check_in": "Dec 5", "check_out": "December 8", "room_type": "deluxe", "phone": "+1 (555) 0100"}
+
+    identity = booking_identity(booking, room_types, today=date(2027, 11, 1))
+
+    assert identity == {"check_in": "2027-12-05", "check_out": "2027-12-08", "room_type": "DLX", "phone": "15550100"}
+
+
+def test_identity_keeps_details_it_cannot_read():
+    booking = {"check_in": "soon", "check_out": "later", "room_type": "penthouse", "phone": ""}
+
+    assert booking_identity(booking, [{"code": "DLX", "type": "Deluxe Room"}]) == booking
@@ -0,0 +1,69 @@
+"""
+Per-night room inventory: all-or-nothing reservations under contention.
+"""
+
+import asyncio
+from datetime import date
+
+from backend.services import room_service
+from tests.conftest import booked_nights, booking_request, stay
+
+
+def nights_of(check_in: str, check_out: str) -> list[str]:
+    return room_service.stay_nights(date.fromisoformat(check_in), date.fromisoformat(check_out))
+
+
+def test_reservation_takes_every_night(client, storage):
+    check_in, check_out = stay(20, nights=3)
+
+    taken = client.portal.call(room_service.reserve_inventory, "STE-E", nights_of(check_in, check_out), 3, "BOOK-1")
+
+    assert taken
+    assert booked_nights(client, storage, "STE-E", check_in, check_out) == {n: 1 for n in nights_of(check_in, check_out)}
+
+
+def test_partial_reservation_is_rolled_back(client, storage):
+    check_in, check_out = stay(20, nights=3)
+    nights = nights_of(check_in, check_out)
+    # Another caller has the only Family Room on the middle night
+    assert client.portal.call(room_service.reserve_inventory, "FAM", nights[1:2], 1, "OTHER")
+
+    taken = client.portal.call(room_service.reserve_inventory, "FAM", nights, 1, "BOOK-1")
+
+    assert not taken
+    # The nights this attempt could take were given back; the other caller keeps theirs
+    assert booked_nights(client, storage, "FAM", check_in, check_out) == {nights[0]: 0, nights[1]: 1, nights[2]: 0}
+
+
+def test_released_reservation_frees_the_nights(client, storage):
+    check_in, check_out = stay(20, nights=2)
+    nights = nights_of(check_in, check_out)
+    client.portal.call(room_service.reserve_inventory, "FAM", nights, 1, "BOOK-1")
+
+    client.portal.call(room_service.release_inventory, "FAM", nights, "BOOK-1")
+
+    assert client.portal.call(room_service.reserve_inventory, "FAM", nights, 1, "BOOK-2")
+
+
+def test_full_room_type_is_a_conflict(client):
+    assert client.post("/api/v1/bookings/", json=booking_request(room_type="Family Room")).status_code == 200
+
+    response = client.post("/api/v1/bookings/", json=booking_request(room_type="Family Room", guest_name="Bo Ng"))
+
+    assert response.status_code == 409
+
+
+
+def test_concurrent_reservations_never_overbook(client, storage):
+    check_in, check_out = stay(20, nights=2)
+    nights = nights_of(check_in, check_out)
+
+    async def race():
+        return await asyncio.gather(*(
+            room_service.reserve_inventory("STE-E", nights, 3, f"BOOK-{i}") for i in range(8)
+        ))
+
+    taken = client.portal.call(race)
+
+    assert sum(taken) == 3
+    assert booked_nights(client, storage, "STE-E", check_in, check_out) == {n: 3 for n in nights}
@@ -0,0 +1,50 @@
+"""
+LLM scheduler: per-session token accounting and the host-wide Prometheus counters.
+"""
+
+import asyncio
+
+from agent.llm_scheduler import LLMScheduler
+
+
+def run_call(session_id: str, turns: list[tuple[int, int]]) -> LLMScheduler:
+    """One call process's scheduler after its turns of (prompt, completion) tokens."""
+    scheduler = LLMScheduler(tpm_limit=12000, rpm_limit=30)
+
+    async def call():
+        for prompt_tokens, completion_tokens in turns:
+            async with scheduler.turn(session_id, 1000) as usage:
+                usage["prompt_tokens"] = prompt_tokens
+                usage["completion_tokens"] = completion_tokens
+
+    asyncio.run(call())
+    return scheduler
+
+
+def read_counters(path) -> dict[str, float]:
+    lines = [line for line in open(path).read().splitlines() if not line.startswith("#")]
+    return {name: float(value) for name, value in (line.split() for line in lines)}
+
+
+def test_usage_is_recorded_per_session_and_turn():
+    scheduler = run_call("room-1", [(800, 40), (900, 60)])
+
+    usage = scheduler.session_usage("room-1")
+
+    assert usage["turns"] == 2
+    assert (usage["prompt_tokens"], usage["completion_tokens"]) == (1700, 100)
+    assert [turn["turn"] for turn in usage["per_turn"]] == [1, 2]
+
+
+def test_counters_of_every_call_add_up(tmp_path):
+    path = str(tmp_path / "llm.prom")
+
+    run_call("room-1", [(800, 40), (900, 60)]).write_prometheus(path)
+    run_call("room-2", [(500, 20)]).write_prometheus(path)
+
+    counters = read_counters(path)
+    assert counters["roomi_llm_sessions_total"] == 2
+    assert counters["roomi_llm_turns_total"] == 3
+    assert counters["roomi_llm_prompt_tokens_total"] == 2200
+    assert counters["roomi_llm_completion_tokens_total"] == 120
+    assert counters["roomi_llm_admitted_total"] == 3
@@ -0,0 +1,79 @@
+"""
+Phonetic guest-name lookup: sound-alike keys, ranked search, re-keying old bookings.
+"""
+
+import pytest
+
+from backend.services.name_search import backfill_name_index, name_tokens, phonetic_key
+from tests.conftest import booking_request
+
+
+@pytest.mark.parametrize("spoken, booked", [
+    ("Jon", "John"),
+    ("Smyth", "Smith"),
+    ("Steven", "Stephen"),
+    ("Kathryn", "Catherine"),
+    ("Filip", "Philip"),
+    ("Tomson", "Thompson"),
+    ("Tomas", "Thomas"),
+    ("Sean", "Shawn"),
+    ("Shaun", "Sean"),
+])
+def test_sound_alikes_share_a_key(spoken, booked):
+    assert phonetic_key(spoken) == phonetic_key(booked)
+
+
+@pytest.mark.parametrize("first, second", [("Smith", "Smart"), ("Theodore", "Todd"), ("Mark", "Mike")])
+def test_different_names_keep_different_keys(first, second):
+    assert phonetic_key(first) != phonetic_key(second)
+
+
+def test_name_tokens_are_plain_ascii():
+    assert name_tokens("Zoë O'Brien-Smith") == ["zoe", "obrien", "smith"]
+
+
+def book(client, guest_name: str, days_ahead: int) -> str:
+    response = client.post("/api/v1/bookings/", json=booking_request(days_ahead=days_ahead, guest_name=guest_name))
+    assert response.status_code == 200, response.text
+    return response.json()["confirmation_number"]
+
+
+def search(client, guest_name: str) -> list[str]:
+    response = client.get("/api/v1/bookings/search/by-name", params={"guest_name": guest_name})
+    return [booking["guest_name"] for booking in response.json()["bookings"]]
+
+
+def test_misheard_name_finds_the_booking(client):
+    book(client, "Thomas Thompson", 10)
+    book(client, "Sean Murphy", 12)
+    book(client, "Jane Smith", 14)
+
+    assert search(client, "Tomas Tomson") == ["Thomas Thompson"]
+    assert search(client, "Shawn Murphy") == ["Sean Murphy"]
+    assert search(client, "Bob Jones") == []
+
+
+def test_closer_spelling_ranks_first(client):
+    book(client, "Jane Smith", 10)
+    book(client, "John Smith", 12)
+
+    assert search(client, "Jon Smith")[0] == "John Smith"
+
+
+def test_bookings_keyed_by_older_rules_are_rekeyed(client, storage):
+    # Stored before the TH rule: 'Thompson' keyed as 0MPSN, and no key version
+    client.portal.call(storage.bookings.insert, {
+        "confirmation_number": "OLD-0001",
+        "guest_name": "Ann Thompson",
+        "status": "confirmed",
+        "check_in": "2099-01-01",
+        "check_out": "2099-01-02",
+        "name_tokens": ["ann", "thompson"],
+        "name_keys": ["AN", "0MPSN"],
+    })
+    assert search(client, "Tomson") == []
+
+    assert client.portal.call(backfill_name_index) == 1
+
+    assert search(client, "Tomson") == ["Ann Thompson"]
+    assert client.portal.call(backfill_name_index) == 0
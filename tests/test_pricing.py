@@ -0,0 +1,49 @@
+"""
+Pricing engine: the rate calendar and stay quotes.
+"""
+
+from datetime import date
+
+import pytest
+
+from backend.services.pricing_service import PricingEngine, night_multipliers, stay_discount
+
+ROOM_TYPES = [{"code": "STD", "rate": 100}, {"code": "STE", "rate": 300}]
+
+
+def engine(calendar_start: date = date(2027, 1, 1)) -> PricingEngine:
+    return PricingEngine(ROOM_TYPES, calendar_start=calendar_start, calendar_days=400)
+
+
+def test_seasons_and_weekends_apply_per_night():
+    # Wednesday to Saturday nights in March, then a summer Thursday and a holiday Friday
+    assert night_multipliers(date(2027, 3, 3), 4).tolist() == pytest.approx([1.0, 1.0, 1.15, 1.15])
+    assert night_multipliers(date(2027, 7, 1), 1).tolist() == pytest.approx([1.25])
+    assert night_multipliers(date(2027, 12, 24), 1).tolist() == pytest.approx([1.3 * 1.15])
+
+
+def test_longer_stays_are_discounted():
+    assert [stay_discount(n) for n in (1, 3, 4, 6, 7, 14)] == [0.0, 0.0, 0.05, 0.05, 0.10, 0.10]
+
+
+def test_quote_sums_nights_then_discounts_and_taxes():
+    quote = engine().quote("STD", date(2027, 3, 3), date(2027, 3, 7))
+
+    # 100 + 100 + 115 + 115, less 5% for four nights, plus 12.5% tax
+    assert quote["nights"] == 4
+    assert quote["discount"] == 21.5
+    assert quote["room_total"] == 408.5
+    assert quote["taxes"] == 51.06
+    assert quote["grand_total"] == 459.56
+    assert quote["rate_per_night"] == 107.5
+
+
+def test_quotes_outside_the_calendar_match_quotes_inside():
+    arrival, departure = date(2027, 3, 3), date(2027, 3, 10)
+
+    inside = engine().quote_all(arrival, departure)
+    outside = engine(calendar_start=date(2028, 1, 1)).quote_all(arrival, departure)
+
+    assert inside == outside
+    assert inside["STE"]["room_total"] == pytest.approx(3 * inside["STD"]["room_total"])
+
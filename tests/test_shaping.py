@@ -0,0 +1,72 @@
+"""
+Response shaping: compact tool results keep what the LLM needs and drop the rest.
+"""
+
+import json
+
+from agent.shaping import _sample_payloads, round_amount, shape_result, token_report
+
+
+def shaped(tool: str, result: dict, args: dict | None = None) -> dict:
+    return json.loads(shape_result(tool, result, args))
+
+
+def sample(tool: str) -> tuple[dict, dict]:
+    return next((payload, args) for name, payload, args in _sample_payloads() if name == tool)
+
+
+def test_amounts_are_rounded_to_cents_or_dollars():
+    assert round_amount(843.749) == 843.75
+    assert round_amount(150.0) == 150
+    assert round_amount(True) is True
+    assert round_amount("n/a") == "n/a"
+
+
+def test_availability_keeps_rooms_that_fit_the_party():
+    payload, args = sample("check_availability")
+
+    result = shaped("check_availability", payload, args)
+
+    assert result["available"] is True
+    assert result["msg"] == payload["message"]
+    assert result["rooms"]
+    assert all(room["max"] >= 4 for room in result["rooms"])
+    assert all(set(room) <= {"name", "rate", "max", "left", "total"} for room in result["rooms"])
+
+
+def test_booking_drops_contact_and_audit_fields():
+    payload, args = sample("get_booking")
+
+    booking = shaped("get_booking", payload, args)["booking"]
+
+    assert booking["conf"] == "ROOMI-20260120-4821"
+    assert booking["total"] == 843.75
+    assert not {"email", "phone", "created_at", "req"} & set(booking)
+
+
+def test_cancellation_keeps_reference_and_refund():
+    payload, args = sample("cancel_booking")
+
+    result = shaped("cancel_booking", payload, args)
+
+    assert result == {
+        "success": True,
+        "msg": payload["message"],
+        "ref": "CXL-ROOMI-20260120-4821",
+        "refund": True,
+    }
+
+
+def test_unknown_tools_and_non_dict_results_pass_through():
+    assert shaped("transfer_call", {"success": True, "note": "x"}) == {"success": True, "note": "x"}
+    assert shape_result("get_booking", "Booking service unavailable") == '"Booking service unavailable"'
+
+
+def test_shaped_results_are_smaller():
+    for tool, payload, args in _sample_payloads():
+        shape_result(tool, payload, args)
+
+    report = token_report()
+
+    for tool in ("check_availability", "get_room_types", "get_booking", "create_booking"):
+        assert report[tool]["shaped_tokens"] < report[tool]["raw_tokens"], tool
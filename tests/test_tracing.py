@@ -0,0 +1,43 @@
+"""
+Turn tracing: stage durations per turn and the host-wide latency summary.
+"""
+
+import json
+
+from agent import tracing
+from agent.tracing import CallTrace
+
+
+def traced_call(call_id: str, eos_to_playout: float) -> CallTrace:
+    trace = CallTrace(call_id)
+    trace.start_turn(100.0)
+    trace.mark("final_transcript", 100.2)
+    trace.mark("first_llm_token", 100.5)
+    trace.mark("playout_start", 100.0 + eos_to_playout)
+    return trace
+
+
+def test_turn_durations_are_measured_between_marks():
+    trace = traced_call("room-1", 1.0)
+    trace.finish_turn()
+
+    durations = trace.turns[0].to_dict()["durations_ms"]
+
+    assert durations["eos_to_final_transcript"] == 200.0
+    assert durations["transcript_to_first_llm_token"] == 300.0
+    assert durations["eos_to_playout_start"] == 1000.0
+
+
+def test_summary_covers_every_call(tmp_path, monkeypatch):
+    # Each call runs in a fresh process with its own histograms
+    for n, seconds in enumerate([1.0, 2.0, 3.0]):
+        monkeypatch.setattr(tracing, "_histograms", {})
+        monkeypatch.setattr(tracing, "_unmerged", {})
+        traced_call(f"room-{n}", seconds).write(str(tmp_path))
+
+    summary = json.loads((tmp_path / "latency_summary.json").read_text())
+
+    assert summary["eos_to_playout_start"]["count"] == 3
+    assert summary["eos_to_playout_start"]["p50_ms"] == 2000.0
+    assert summary["eos_to_playout_start"]["max_ms"] == 3000.0
+    assert len(list(tmp_path.glob("room-*.json"))) == 3